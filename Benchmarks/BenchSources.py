@@ -0,0 +1,140 @@
+# Benchmarks/BenchSources.py
+"""Offline fetch-layer benchmark: every Source's Fetch against a local stub server.
+
+The payloads are SYNTHETIC (see Payloads.py): generated pages that mimic each API's
+envelope, field names and paging, not recorded responses. Real pages differ in
+size, field mix and markup, so use the numbers to compare revisions of the fetch
+layer against each other, not as a forecast of live throughput.
+
+    python -m Benchmarks.BenchSources --records 2000 --repeat 3
+    python -m Benchmarks.BenchSources --sources arxiv,openalex --latency 0.05 --rate429 0.1 --slow-body 0.01
+
+Per source it reports pages/s and records/s (wall clock), the client-side CPU time
+(parsing plus request handling, across all threads; the stub server runs in its
+own process) and the peak Python heap during one Fetch (tracemalloc, measured in a
+separate run so it does not skew the timings). Pages, bytes and retries come from
+the run metrics the shared HTTP client records. The HTTP response cache is
+disabled, so every page really goes over the socket.
+"""
+import sys
+import time
+import json
+import argparse
+import statistics
+import tracemalloc
+from datetime import date, timedelta
+
+from Sources.HttpClient import http
+from Sources.Metrics import metrics, Scope
+from Sources.FetchPaper.ArxivSource import ArxivSource
+from Sources.FetchPaper.CrossrefSource import CrossrefSource
+from Sources.FetchPaper.OpenAlexSource import OpenAlexSource
+from Sources.FetchPaper.PubMedSource import PubMedSource
+from Sources.FetchPaper.EuropePMCSource import EuropePMCSource
+from Sources.FetchPaper.OpenReviewSource import OpenReviewSource
+from Sources.FetchPaper.NasaADSSource import NASAADSSource
+from Sources.FetchPaper.DBLPSource import DBLPSource
+from Sources.FetchPaper.DOAJSource import DOAJSource
+from Sources.FetchPaper.CORESource import CORESource
+from Sources.FetchPaper.SemanticScholarSource import SemanticScholarSource
+from Sources.FetchPaper.IEEEXploreSource import IEEEXploreSource
+from Sources.FetchPaper.OpenAIRESouce import OpenAIRESouce
+
+from .StubServer import StubServer
+
+# stub key -> (Source class, Fetch kwargs for a corpus of n records)
+BENCHMARKS = {
+    "arxiv"           : (ArxivSource,           lambda n: {"perPage": 200, "maxPages": n // 200 + 2}),
+    "crossref"        : (CrossrefSource,        lambda n: {"rows": 200, "maxPages": n // 200 + 2}),
+    "openalex"        : (OpenAlexSource,        lambda n: {"perPage": 200, "maxPages": n // 200 + 2}),
+    "pubmed"          : (PubMedSource,          lambda n: {"retmax": 200, "maxPages": n // 200 + 2}),
+    "europepmc"       : (EuropePMCSource,       lambda n: {"page_size": 100, "max_pages": n // 100 + 2}),
+    "openreview"      : (OpenReviewSource,      lambda n: {"page_size": 100, "max_pages": n // 100 + 2}),
+    "nasaads"         : (NASAADSSource,         lambda n: {"api_key": "bench", "page_size": 200, "max_pages": n // 200 + 2}),
+    "dblp"            : (DBLPSource,            lambda n: {"query": "learning", "page_size": 200, "max_pages": n // 200 + 2}),
+    "doaj"            : (DOAJSource,            lambda n: {"query": "learning", "page_size": 100, "max_pages": n // 100 + 2}),
+    "core"            : (CORESource,            lambda n: {"api_key": "bench", "page_size": 100, "max_pages": n // 100 + 2}),
+    "semanticscholar" : (SemanticScholarSource, lambda n: {"page_size": 100, "max_pages": n // 100 + 2}),
+    "ieeexplore"      : (IEEEXploreSource,      lambda n: {"api_key": "bench", "page_size": 200, "max_records": n}),
+    "openaire"        : (OpenAIRESouce,         lambda n: {"page_size": 100, "maxPages": n // 100 + 2}),
+}
+
+def RunOne(stub: StubServer, key: str, *, day: str, nextDay: str, records: int, repeat: int) -> dict:
+    cls, kwargsOf = BENCHMARKS[key]
+    source = cls(base = stub.Base(key))
+    kwargs = kwargsOf(records)
+
+    source.Fetch(day = day, nextDay = nextDay, **kwargs)            # warm-up: renders and memoizes the pages
+    walls, cpus, out = [], [], []
+    for _ in range(repeat):
+        metrics.Reset()
+        wall, cpu = time.perf_counter(), time.process_time()
+        with Scope(source.name):
+            out = source.Fetch(day = day, nextDay = nextDay, **kwargs)
+        cpus.append(time.process_time() - cpu)
+        walls.append(time.perf_counter() - wall)
+    counters = metrics.Report()["counters"].get(source.name, {})
+    pages, size, retries = counters.get("pages", 0), counters.get("bytes", 0), counters.get("retries", 0)
+
+    tracemalloc.start()
+    source.Fetch(day = day, nextDay = nextDay, **kwargs)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    wall, cpu = statistics.median(walls), statistics.median(cpus)
+    return {
+        "source"    : source.name,
+        "pages"     : pages,
+        "records"   : len(out),
+        "bytes"     : size,
+        "retries"   : retries,
+        "wall_s"    : wall,
+        "cpu_s"     : cpu,
+        "pages_per_s"   : pages / wall if wall else 0.0,
+        "records_per_s" : len(out) / wall if wall else 0.0,
+        "cpu_ms_per_page": 1000 * cpu / pages if pages else 0.0,
+        "peak_mb"   : peak / 2**20,
+    }
+
+def PrintTable(rows: list[dict], records: int):
+    print(f"Synthetic payloads: {records} generated records per source from a local stub server (not recorded API responses).")
+    header = f"{'source':<18}{'pages':>7}{'records':>9}{'MB':>8}{'retry':>6}{'wall s':>9}{'pages/s':>10}{'rec/s':>10}{'cpu s':>8}{'cpu ms/pg':>11}{'peak MB':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in rows:
+        print(f"{r['source']:<18}{r['pages']:>7}{r['records']:>9}{r['bytes'] / 2**20:>8.1f}{r['retries']:>6}{r['wall_s']:>9.3f}"
+              f"{r['pages_per_s']:>10.1f}{r['records_per_s']:>10.0f}{r['cpu_s']:>8.3f}{r['cpu_ms_per_page']:>11.2f}{r['peak_mb']:>9.1f}")
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description = "Benchmark every Source against a local stub server serving synthetic pages.")
+    parser.add_argument("--sources",   default = ",".join(BENCHMARKS), help = "comma-separated stub keys (default: all)")
+    parser.add_argument("--records",   type = int,   default = 2000, help = "papers each source serves for the day")
+    parser.add_argument("--repeat",    type = int,   default = 3,    help = "timed runs per source; the median is reported")
+    parser.add_argument("--day",       default = "2025-10-23")
+    parser.add_argument("--latency",   type = float, default = 0.0,  help = "seconds of server latency per request")
+    parser.add_argument("--rate429",   type = float, default = 0.0,  help = "probability that a request is answered 429")
+    parser.add_argument("--slow-body", type = float, default = 0.0,  help = "seconds between 16 KB body chunks")
+    parser.add_argument("--seed",      type = int,   default = 0)
+    parser.add_argument("--json",      default = "", help = "also write the results to this file")
+    args = parser.parse_args(argv)
+
+    keys = [k.strip() for k in args.sources.split(",") if k.strip()]
+    unknown = [k for k in keys if k not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown sources {unknown}; choose from {sorted(BENCHMARKS)}")
+    nextDay = (date.fromisoformat(args.day) + timedelta(days = 1)).isoformat()
+
+    http.Configure(cacheDir = "")
+    rows = []
+    with StubServer(args.records, args.day, latency = args.latency, rate429 = args.rate429, slowBody = args.slow_body, seed = args.seed) as stub:
+        for key in keys:
+            rows.append(RunOne(stub, key, day = args.day, nextDay = nextDay, records = args.records, repeat = max(1, args.repeat)))
+
+    PrintTable(rows, args.records)
+    if args.json:
+        with open(args.json, "w", encoding = "utf-8") as f:
+            json.dump({"payloads": "synthetic", "args": vars(args), "results": rows}, f, indent = 2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
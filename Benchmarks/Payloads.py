@@ -0,0 +1,254 @@
+# Benchmarks/Payloads.py
+"""Synthetic API pages shaped like each source's real responses.
+
+Every source gets the same deterministic corpus of papers dated on the benchmark
+day; Render() turns one request (path + query) into the page the real API would
+return for it, with the source's own envelope, field names and pagination, so
+each Fetch runs its full parser and paging logic against the stub server.
+
+Nothing here is a recorded response: titles and abstracts are drawn from a fixed
+word list and every optional field is filled in, so pages are more uniform than
+live ones (no missing abstracts, no HTML/JATS markup in text fields, no oversized
+author lists). Parser timings are comparable between revisions, not with the
+live APIs.
+"""
+import json
+import random
+from datetime import datetime, timezone
+from urllib.parse import parse_qs
+from xml.sax.saxutils import escape
+
+WORDS = (
+    "adaptive attention bayesian benchmark calibration contrastive convolutional dataset diffusion "
+    "distillation efficient embedding estimation evaluation few-shot framework generalization graph "
+    "hierarchical inference kernel language latent learning likelihood multimodal network neural "
+    "optimization perception pretraining probabilistic quantization reasoning recurrent representation "
+    "retrieval robust sampling segmentation self-supervised sensor sparse spectral stochastic structured "
+    "temporal transformer uncertainty unsupervised variational vision"
+).split()
+
+VENUES = ["Nature Communications", "IEEE Transactions on Image Processing", "NeurIPS", "Physical Review D",
+          "The Lancet", "Journal of Machine Learning Research", "ACM Computing Surveys", "Bioinformatics"]
+
+ARXIV_CATEGORIES = ["cs.CV", "cs.LG", "cs.CL", "eess.IV", "physics.optics", "q-bio.NC", "stat.ML", "astro-ph.IM"]
+
+class Corpus:
+    """`count` papers published on `day`, with ~1 KB abstracts, reproducible from `seed`."""
+    def __init__(self, count: int, day: str, seed: int = 0):
+        rng = random.Random(seed)
+        self.day = day
+        self.papers = []
+        for i in range(count):
+            title    = " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 14))).capitalize()
+            abstract = ". ".join(" ".join(rng.choice(WORDS) for _ in range(rng.randint(12, 24))).capitalize() for _ in range(rng.randint(6, 10))) + "."
+            self.papers.append({
+                "n"       : i,
+                "title"   : title,
+                "abstract": abstract,
+                "doi"     : f"10.5555/bench.{seed}.{i:06d}",
+                "venue"   : VENUES[i % len(VENUES)],
+                "category": ARXIV_CATEGORIES[i % len(ARXIV_CATEGORIES)],
+                "authors" : [f"Author {rng.randint(1, 9999)}" for _ in range(rng.randint(2, 8))],
+                "second"  : rng.randint(0, 86399),
+            })
+
+    def Slice(self, start: int, size: int) -> list[dict]:
+        return self.papers[max(0, start) : max(0, start) + max(0, size)]
+
+    def Stamp(self, p: dict) -> datetime:
+        base = datetime.strptime(self.day, "%Y-%m-%d").replace(tzinfo = timezone.utc)
+        return datetime.fromtimestamp(base.timestamp() + p["second"], tz = timezone.utc)
+
+def _int(query: dict, name: str, default: int) -> int:
+    try:
+        return int(query.get(name, [default])[0])
+    except (TypeError, ValueError):
+        return default
+
+def _json(obj) -> tuple[bytes, str]:
+    return json.dumps(obj).encode("utf-8"), "application/json"
+
+# ---- one renderer per source: (corpus, path, query) -> (body, content type) ----
+def ArxivPage(c: Corpus, path: str, q: dict):
+    start, size = _int(q, "start", 0), _int(q, "max_results", 10)
+    entries = []
+    for p in c.Slice(start, size):
+        stamp = c.Stamp(p).strftime("%Y-%m-%dT%H:%M:%SZ")
+        authors = "".join(f"<author><name>{escape(a)}</name></author>" for a in p["authors"])
+        entries.append(
+            f"<entry><id>http://arxiv.org/abs/2510.{p['n']:05d}v1</id><updated>{stamp}</updated><published>{stamp}</published>"
+            f"<title>{escape(p['title'])}</title><summary>{escape(p['abstract'])}</summary>{authors}"
+            f"<arxiv:doi>{p['doi']}</arxiv:doi>"
+            f"<link href=\"http://arxiv.org/abs/2510.{p['n']:05d}v1\" rel=\"alternate\" type=\"text/html\"/>"
+            f"<link title=\"pdf\" href=\"http://arxiv.org/pdf/2510.{p['n']:05d}v1\" rel=\"related\" type=\"application/pdf\"/>"
+            f"<arxiv:primary_category term=\"{p['category']}\" scheme=\"http://arxiv.org/schemas/atom\"/>"
+            f"<category term=\"{p['category']}\" scheme=\"http://arxiv.org/schemas/atom\"/></entry>"
+        )
+    feed = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<feed xmlns="http://www.w3.org/2005/Atom" xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/" xmlns:arxiv="http://arxiv.org/schemas/atom">'
+        f"<title>arXiv Query</title><opensearch:totalResults>{len(c.papers)}</opensearch:totalResults>"
+        f"<opensearch:startIndex>{start}</opensearch:startIndex><opensearch:itemsPerPage>{size}</opensearch:itemsPerPage>"
+        + "".join(entries) + "</feed>"
+    )
+    return feed.encode("utf-8"), "application/atom+xml"
+
+def _date_parts(c: Corpus) -> dict:
+    y, m, d = map(int, c.day.split("-"))
+    return {"date-parts": [[y, m, d]]}
+
+def CrossrefPage(c: Corpus, path: str, q: dict):
+    start, rows = int(q.get("cursor", ["*"])[0].replace("*", "0") or 0), _int(q, "rows", 20)
+    items = [{
+        "DOI": p["doi"], "URL": f"https://doi.org/{p['doi']}", "type": "journal-article",
+        "title": [p["title"]], "abstract": f"<jats:p>{p['abstract']}</jats:p>", "container-title": [p["venue"]],
+        "author": [{"given": a.split()[0], "family": a.split()[-1], "sequence": "additional"} for a in p["authors"]],
+        "published-online": _date_parts(c), "issued": _date_parts(c), "reference-count": 40,
+    } for p in c.Slice(start, rows)]
+    nextCursor = str(start + rows) if start + rows < len(c.papers) else None
+    return _json({"status": "ok", "message-type": "work-list", "message": {
+        "total-results": len(c.papers), "items-per-page": rows, "items": items, "next-cursor": nextCursor}})
+
+def OpenAlexPage(c: Corpus, path: str, q: dict):
+    start, per = int(q.get("cursor", ["*"])[0].replace("*", "0") or 0), _int(q, "per-page", 25)
+    results = []
+    for p in c.Slice(start, per):
+        inverted: dict[str, list[int]] = {}
+        for pos, word in enumerate(p["abstract"].split()):
+            inverted.setdefault(word, []).append(pos)
+        results.append({
+            "id": f"https://openalex.org/W{4000000000 + p['n']}", "doi": f"https://doi.org/{p['doi']}",
+            "title": p["title"], "display_name": p["title"], "publication_date": c.day,
+            "abstract_inverted_index": inverted, "host_venue": {"display_name": p["venue"]},
+            "primary_location": {"landing_page_url": f"https://example.org/{p['n']}"},
+            "authorships": [{"author": {"display_name": a}} for a in p["authors"]],
+        })
+    nextCursor = str(start + per) if start + per < len(c.papers) else None
+    return _json({"meta": {"count": len(c.papers), "per_page": per, "next_cursor": nextCursor}, "results": results})
+
+def PubMedPage(c: Corpus, path: str, q: dict):
+    if path.endswith("esummary.fcgi"):
+        uids = [u for u in q.get("id", [""])[0].split(",") if u]
+        result = {"uids": uids}
+        for uid in uids:
+            p = c.papers[int(uid) - 30000000]
+            result[uid] = {
+                "uid": uid, "pubdate": c.day.replace("-", " "), "source": p["venue"][:20], "fulljournalname": p["venue"],
+                "title": p["title"], "elocationid": f"doi: {p['doi']}",
+                "authors": [{"name": a, "authtype": "Author"} for a in p["authors"]],
+                "articleids": [{"idtype": "pubmed", "value": uid}, {"idtype": "doi", "value": p["doi"]}],
+            }
+        return _json({"header": {"type": "esummary", "version": "0.3"}, "result": result})
+    start, size = _int(q, "retstart", 0), _int(q, "retmax", 20)
+    ids = [str(30000000 + p["n"]) for p in c.Slice(start, size)]
+    return _json({"header": {"type": "esearch"}, "esearchresult": {
+        "count": str(len(c.papers)), "retmax": str(len(ids)), "retstart": str(start), "idlist": ids}})
+
+def EuropePMCPage(c: Corpus, path: str, q: dict):
+    start, size = int(q.get("cursorMark", ["*"])[0].replace("*", "0") or 0), _int(q, "pageSize", 25)
+    result = [{
+        "id": str(40000000 + p["n"]), "source": "MED", "doi": p["doi"], "title": p["title"], "abstractText": p["abstract"],
+        "journalTitle": p["venue"], "firstPublicationDate": c.day, "pubYear": c.day[:4],
+        "authorString": ", ".join(p["authors"]),
+        "fullTextUrlList": {"fullTextUrl": [{"url": f"https://europepmc.org/article/MED/{40000000 + p['n']}"}]},
+    } for p in c.Slice(start, size)]
+    nextCursor = str(start + size) if start + size < len(c.papers) else q.get("cursorMark", ["*"])[0]
+    return _json({"hitCount": len(c.papers), "nextCursorMark": nextCursor, "resultList": {"result": result}})
+
+def OpenReviewPage(c: Corpus, path: str, q: dict):
+    start, size = _int(q, "offset", 0), _int(q, "limit", 100)
+    notes = [{
+        "id": f"bench{p['n']:06d}", "forum": f"bench{p['n']:06d}", "invitation": "Bench.cc/2025/Conference/-/Submission",
+        "cdate": int(c.Stamp(p).timestamp() * 1000), "tcdate": int(c.Stamp(p).timestamp() * 1000),
+        "content": {"title": p["title"], "abstract": p["abstract"], "authors": p["authors"], "keywords": p["title"].split()[:5]},
+    } for p in c.Slice(start, size)]
+    return _json({"notes": notes, "count": len(c.papers)})
+
+def NasaADSPage(c: Corpus, path: str, q: dict):
+    start, rows = _int(q, "start", 0), _int(q, "rows", 10)
+    docs = [{
+        "id": str(50000000 + p["n"]), "bibcode": f"2025Bench{p['n']:09d}", "title": [p["title"]], "abstract": p["abstract"],
+        "doi": [p["doi"]], "pub": p["venue"], "pubdate": c.day, "year": c.day[:4], "author": p["authors"],
+    } for p in c.Slice(start, rows)]
+    return _json({"responseHeader": {"status": 0}, "response": {"numFound": len(c.papers), "start": start, "docs": docs}})
+
+def DBLPPage(c: Corpus, path: str, q: dict):
+    start, size = _int(q, "f", 0), _int(q, "h", 30)
+    hits = [{"@score": "1", "@id": str(p["n"]), "info": {
+        "authors": {"author": [{"text": a} for a in p["authors"]]}, "title": p["title"], "venue": p["venue"],
+        "year": c.day[:4], "date": c.day, "type": "Journal Articles", "key": f"journals/bench/P{p['n']}",
+        "doi": p["doi"], "ee": f"https://doi.org/{p['doi']}", "url": f"https://dblp.org/rec/journals/bench/P{p['n']}",
+    }} for p in c.Slice(start, size)]
+    return _json({"result": {"hits": {"@total": str(len(c.papers)), "@sent": str(len(hits)), "@first": str(start), "hit": hits}}})
+
+def DOAJPage(c: Corpus, path: str, q: dict):
+    page, size = _int(q, "page", 1), _int(q, "pageSize", 10)
+    results = [{"id": f"doaj{p['n']:08d}", "created_date": f"{c.day}T00:00:00Z", "bibjson": {
+        "title": p["title"], "abstract": p["abstract"], "created_date": c.day,
+        "identifier": [{"type": "doi", "id": p["doi"]}, {"type": "eissn", "id": "1234-5678"}],
+        "link": [{"type": "fulltext", "url": f"https://doaj.org/article/{p['n']}", "content_type": "HTML"}],
+        "journal": {"title": p["venue"], "publisher": "Bench Press"}, "author": [{"name": a} for a in p["authors"]],
+    }} for p in c.Slice((page - 1) * size, size)]
+    return _json({"total": len(c.papers), "page": page, "pageSize": size, "results": results})
+
+def COREPage(c: Corpus, path: str, q: dict):
+    start, size = _int(q, "offset", 0), _int(q, "limit", 10)
+    results = [{
+        "id": 60000000 + p["n"], "title": p["title"], "abstract": p["abstract"], "doi": p["doi"],
+        "downloadUrl": f"https://core.ac.uk/download/{60000000 + p['n']}.pdf", "publisher": p["venue"],
+        "publishedDate": f"{c.day}T00:00:00", "authors": [{"name": a} for a in p["authors"]],
+    } for p in c.Slice(start, size)]
+    return _json({"totalHits": len(c.papers), "limit": size, "offset": start, "results": results})
+
+def SemanticScholarPage(c: Corpus, path: str, q: dict):
+    start, size = _int(q, "offset", 0), _int(q, "limit", 10)
+    data = [{
+        "paperId": f"{p['n']:040x}", "title": p["title"], "abstract": p["abstract"], "venue": p["venue"],
+        "publicationDate": c.day, "year": int(c.day[:4]), "externalIds": {"DOI": p["doi"]},
+        "url": f"https://www.semanticscholar.org/paper/{p['n']:040x}",
+    } for p in c.Slice(start, size)]
+    body = {"total": len(c.papers), "offset": start, "data": data}
+    if start + size < len(c.papers):
+        body["next"] = start + size
+    return _json(body)
+
+def IEEEXplorePage(c: Corpus, path: str, q: dict):
+    start, size = _int(q, "start_record", 1) - 1, _int(q, "max_records", 25)
+    articles = [{
+        "article_number": str(70000000 + p["n"]), "title": p["title"], "abstract": p["abstract"], "doi": p["doi"],
+        "publication_title": p["venue"], "publication_date": c.day, "publication_year": c.day[:4],
+        "html_url": f"https://ieeexplore.ieee.org/document/{70000000 + p['n']}/",
+        "authors": {"authors": [{"full_name": a} for a in p["authors"]]},
+    } for p in c.Slice(start, size)]
+    return _json({"total_records": len(c.papers), "total_searched": len(c.papers), "articles": articles})
+
+def OpenAIREPage(c: Corpus, path: str, q: dict):
+    page, size = _int(q, "page", 1), _int(q, "size", 10)
+    result = [{"header": {"dri:objIdentifier": {"$": f"bench::{p['n']}"}}, "metadata": {"oaf:entity": {"oaf:result": {
+        "title": {"@classid": "main title", "$": p["title"]}, "description": {"$": p["abstract"]},
+        "pid": [{"@classid": "doi", "@type": "doi", "$": p["doi"]}],
+        "originalId": [{"$": f"oai:bench:{p['n']}"}, {"$": f"https://example.org/record/{p['n']}"}],
+        "publisher": {"$": p["venue"]}, "dateofacceptance": {"$": c.day},
+        "creator": [{"@rank": str(r + 1), "$": a} for r, a in enumerate(p["authors"])],
+    }}}} for p in c.Slice((page - 1) * size, size)]
+    return _json({"response": {"header": {"total": {"$": len(c.papers)}, "page": {"$": page}, "size": {"$": size}},
+                               "results": {"result": result} if result else None}})
+
+RENDERERS = {
+    "arxiv"           : ArxivPage,
+    "crossref"        : CrossrefPage,
+    "openalex"        : OpenAlexPage,
+    "pubmed"          : PubMedPage,
+    "europepmc"       : EuropePMCPage,
+    "openreview"      : OpenReviewPage,
+    "nasaads"         : NasaADSPage,
+    "dblp"            : DBLPPage,
+    "doaj"            : DOAJPage,
+    "core"            : COREPage,
+    "semanticscholar" : SemanticScholarPage,
+    "ieeexplore"      : IEEEXplorePage,
+    "openaire"        : OpenAIREPage,
+}
+
+def Render(corpus: Corpus, key: str, path: str, rawQuery: str) -> tuple[bytes, str]:
+    return RENDERERS[key](corpus, path, parse_qs(rawQuery, keep_blank_values = True))
@@ -0,0 +1,98 @@
+# Benchmarks/StubServer.py
+import time
+import random
+import multiprocessing
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit
+
+from .Payloads import Corpus, Render
+
+CHUNK = 16 * 1024
+
+class StubServer:
+    """Local HTTP server that answers /<source key>/... with that source's synthetic pages.
+
+    It runs in a child process, so the benchmark's process CPU time and tracemalloc
+    peak cover only the client side (including sources that fetch on thread pools).
+    Faults are injected per request:
+      latency  - seconds to wait before answering
+      rate429  - probability of a 429 with Retry-After: 0 (the client's retry path runs)
+      slowBody - seconds to pause between 16 KB body chunks
+    Rendered pages are memoized in the server, so a warm-up pass moves payload
+    generation out of the measured runs.
+    """
+    def __init__(self, records: int, day: str, *, latency: float = 0.0, rate429: float = 0.0, slowBody: float = 0.0, seed: int = 0):
+        self._args = (records, day, seed, float(latency), float(rate429), float(slowBody))
+        self._process = None
+        self.port = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def Base(self, key: str, suffix: str = "") -> str:
+        return f"{self.url}/{key}{suffix}"
+
+    def __enter__(self) -> "StubServer":
+        ready = multiprocessing.Queue()
+        self._process = multiprocessing.Process(target = _Serve, args = (*self._args, ready), name = "stub-server", daemon = True)
+        self._process.start()
+        self.port = ready.get(timeout = 30)
+        return self
+
+    def __exit__(self, *exc):
+        self._process.terminate()
+        self._process.join()
+
+def _Serve(records: int, day: str, seed: int, latency: float, rate429: float, slowBody: float, ready):
+    corpus = Corpus(records, day, seed = seed)
+    rng    = random.Random(seed)
+    pages: dict[tuple[str, str, str], tuple[bytes, str]] = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_HEAD(self):
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            key, _, rest = parts.path.lstrip("/").partition("/")
+            if latency:
+                time.sleep(latency)
+            if rng.random() < rate429:
+                self.send_response(429)
+                self.send_header("Retry-After", "0")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            cacheKey = (key, rest, parts.query)
+            try:
+                if cacheKey not in pages:
+                    pages[cacheKey] = Render(corpus, key, rest, parts.query)
+                body, contentType = pages[cacheKey]
+            except KeyError:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", contentType)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if slowBody:
+                for i in range(0, len(body), CHUNK):
+                    self.wfile.write(body[i : i + CHUNK])
+                    self.wfile.flush()
+                    time.sleep(slowBody)
+            else:
+                self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    ready.put(server.server_port)
+    server.serve_forever()
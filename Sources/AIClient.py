@@ -1,4 +1,7 @@
-import json, requests, re
+import json, re
+
+from .HttpClient import http
+from .Metrics import metrics, Scope
 
 class GeminiClient:
     def __init__(self, ZOTERO_KEY:str, model:str):
@@ -10,7 +13,9 @@ class GeminiClient:
         url = f"{self.base}/{self.model}:generateContent?key={self.key}"
         body = {"contents":[{"role":"user","parts":[{"text":prompt}]}],
                 "generationConfig":{"temperature":temperature}}
-        r = requests.post(url, json=body, timeout=180)
+        with Scope("ai"), metrics.Timer("ai.call_seconds", sample=True):
+            r = http.Post(url, json=body, timeout=180)
+        metrics.Count("ai", "calls")
         r.raise_for_status()
         data = r.json()
         try:
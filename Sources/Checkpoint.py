@@ -0,0 +1,82 @@
+# Sources/Checkpoint.py
+import os
+import json
+import time
+import shutil
+import pickle
+import hashlib
+import logging
+import dataclasses
+
+log = logging.getLogger(__name__)
+
+CHECKPOINT_VERSION = 1
+
+def ValueFingerprint(value) -> str:
+    """Content hash of a stage value (anything picklable)."""
+    return hashlib.sha1(pickle.dumps(value, protocol = pickle.HIGHEST_PROTOCOL)).hexdigest()
+
+def ConfigHash(config) -> str:
+    settings = dataclasses.asdict(config) if dataclasses.is_dataclass(config) else config
+    return hashlib.sha1(json.dumps(settings, sort_keys = True, default = str).encode("utf-8")).hexdigest()
+
+class Checkpoints:
+    """Per-stage artifacts of one run, so a retry resumes after the last finished stage.
+
+    Each stage's outputs are pickled to <root>/<scope>/<stage>.pkl together with
+      key          - sha1 of (stage, scope, config hash, fingerprint of every input)
+      fingerprints - content hash of every output, which feeds the keys downstream
+    A checkpoint is valid only while its key matches, so a changed config or an upstream
+    stage that produced something different re-runs everything after it. Checkpoints
+    are always written; they are read back only with resume=True. Scopes (days) older
+    than `retentionDays` are deleted when the store is opened.
+    """
+    def __init__(self, root: str, *, scope: str, config, resume: bool = False, retentionDays: float = 7.0):
+        self.root       = root
+        self.scope      = scope
+        self.dir        = os.path.join(root, scope)
+        self.resume     = resume
+        self.configHash = ConfigHash(config)
+        self.restored: list[str] = []
+        os.makedirs(self.dir, exist_ok = True)
+        self._Purge(retentionDays)
+
+    def Key(self, stage: str, fingerprints: dict[str, str]) -> str:
+        parts = [CHECKPOINT_VERSION, stage, self.scope, self.configHash, sorted(fingerprints.items())]
+        return hashlib.sha1(json.dumps(parts).encode("utf-8")).hexdigest()
+
+    def Load(self, stage: str, key: str) -> tuple[dict, dict] | None:
+        """(outputs, output fingerprints) of a valid checkpoint, or None."""
+        path = self._Path(stage)
+        if not self.resume or not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as f:
+                stored = pickle.load(f)
+        except Exception as e:
+            log.warning(f"Ignoring unreadable checkpoint {path}: {e}")
+            return None
+        if stored.get("key") != key:
+            log.info(f"Checkpoint of stage {stage} is stale; re-running it.")
+            return None
+        self.restored.append(stage)
+        return stored["outputs"], stored["fingerprints"]
+
+    def Save(self, stage: str, key: str, outputs: dict) -> dict[str, str]:
+        """Write the stage's outputs; returns their fingerprints."""
+        fingerprints = {name: ValueFingerprint(value) for name, value in outputs.items()}
+        path = self._Path(stage)
+        with open(path + ".tmp", "wb") as f:
+            pickle.dump({"key": key, "outputs": outputs, "fingerprints": fingerprints, "time": time.time()}, f, protocol = pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".tmp", path)
+        return fingerprints
+
+    def _Path(self, stage: str) -> str:
+        return os.path.join(self.dir, f"{stage}.pkl")
+
+    def _Purge(self, retentionDays: float):
+        cutoff = time.time() - retentionDays * 86400
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if name != self.scope and os.path.isdir(path) and os.path.getmtime(path) < cutoff:
+                shutil.rmtree(path, ignore_errors = True)
@@ -1,5 +1,5 @@
 # actions/src/config_loader.py
-import os, yaml
+import os, re, yaml
 from dataclasses import dataclass
 from typing import Any, Callable, Dict, List, TypeVar
 import logging
@@ -30,6 +30,41 @@ def ReadConfig(configDict: Dict[str, Any], configKeys: List[str], default: Confi
             return default
     return currentDict if isinstance(currentDict, type(default)) else default
 
+@dataclass
+class ProfileSettings:
+    """One recipient of a multi-profile run: whose Zotero libraries to match and where to mail the digest."""
+    NAME        : str
+    ZOTERO_USER : str
+    ZOTERO_GROUP: str
+    ZOTERO_KEY  : str
+    EMAIL_TO    : str
+    TOP_K       : int
+
+# NAME becomes part of output and cache file names (daily_<day>_<NAME>.md, centroids_<NAME>.npz)
+_PROFILE_NAME = re.compile(r"[A-Za-z0-9_-]+")
+
+def ReadProfiles(entries: Any, topK: int) -> List[ProfileSettings]:
+    """profiles: list of mappings; NAME is required, unique and made of [A-Za-z0-9_-]; TOP_K defaults to run.TOP_K."""
+    if not isinstance(entries, list):
+        raise ValueError("profiles must be a list")
+    profiles, names = [], set()
+    for entry in entries:
+        name = ReadConfig(entry, ["NAME"], "", str).strip()
+        if not name or name in names:
+            raise ValueError(f"profiles: every entry needs a unique NAME (got {name!r})")
+        if not _PROFILE_NAME.fullmatch(name):
+            raise ValueError(f"profiles: NAME may only contain letters, digits, '_' and '-' (got {name!r})")
+        names.add(name)
+        profiles.append(ProfileSettings(
+            NAME         = name,
+            ZOTERO_USER  = ReadConfig(entry, ["ZOTERO_USER" ],   "",  str),
+            ZOTERO_GROUP = ReadConfig(entry, ["ZOTERO_GROUP"],   "",  str),
+            ZOTERO_KEY   = ReadConfig(entry, ["ZOTERO_KEY"  ],   "",  str),
+            EMAIL_TO     = ReadConfig(entry, ["EMAIL_TO"    ],   "",  str),
+            TOP_K        = ReadConfig(entry, ["TOP_K"       ], topK,  int),
+        ))
+    return profiles
+
 @dataclass
 class Settings:
     # run
@@ -37,11 +72,16 @@ class Settings:
     TOP_K       : int
     EMBEDDING_MODEL   : str
     AI_ENABLE   : bool
+    BACKFILL_WORKERS: int
 
     # zotero
     ZOTERO_USER : str
     ZOTERO_GROUP: str
     ZOTERO_KEY  : str
+    ZOTERO_CACHE_DIR: str
+
+    # profiles
+    PROFILES    : List[ProfileSettings]
 
     # email
     EMAIL_SERVER: str
@@ -50,22 +90,91 @@ class Settings:
     # ai
     GEMINI_MODEL: str
 
+    # fetch
+    FETCH_CONCURRENT: bool
+    FETCH_WORKERS   : int
+    FETCH_TIMEOUT   : float
+    FETCH_ASYNC     : bool
+    FETCH_HOST_LIMIT: int
+    ARXIV_CATEGORIES: str
+    DEDUP_NEAR_THRESHOLD: float
+    DEDUP_NUM_PERM  : int
+
+    # prefilter
+    PREFILTER_TOP_M       : int
+    PREFILTER_MARGIN      : float
+    PREFILTER_VENUE_WEIGHT: float
+    PREFILTER_ALLOW       : str
+    PREFILTER_DENY        : str
+
+    # http
+    HTTP_POOL_SIZE  : int
+    HTTP_RETRIES    : int
+    HTTP_BACKOFF    : float
+
+    # embedding
+    EMBEDDING_BACKEND     : str
+    EMBEDDING_LEXICAL_DIMENSIONS: int
+    EMBEDDING_LEXICAL_STATS: str
+    EMBEDDING_CONCURRENCY : int
+    EMBEDDING_BATCH_SIZE  : int
+    EMBEDDING_BATCH_CHARS : int
+    EMBEDDING_RETRIES     : int
+    EMBEDDING_BREAKER     : int
+
+    # profile
+    PROFILE_MODE        : str
+    PROFILE_CLUSTERS    : int
+    PROFILE_REDUCE      : str
+    PROFILE_TEMPERATURE : float
+    RANK_CHUNK_SIZE     : int
+    RANK_COARSE_DIMENSIONS: int
+    RANK_COARSE_TOP_M   : int
+
+    # index
+    INDEX_DIR         : str
+    INDEX_DTYPE       : str
+    INDEX_MAX_SEGMENTS: int
+    INDEX_NPROBE      : int
+    INDEX_RELATED     : int
+    INDEX_RELATED_DAYS: int
+
+    # cache
+    EMBEDDING_CACHE_DIR     : str
+    EMBEDDING_CACHE_MAX_ROWS: int
+    EMBEDDING_CACHE_RESET   : bool
+    EMBEDDING_CACHE_DTYPE   : str
+    EMBEDDING_CACHE_MAX_AGE_DAYS: float
+    CHECKPOINT_DIR          : str
+    CHECKPOINT_RETENTION_DAYS: float
+    PAPER_STORE_DIR         : str
+    PAPER_STORE_DTYPE       : str
+    HTTP_CACHE_DIR          : str
+    HTTP_CACHE_TTL          : float
+    HTTP_CACHE_RETENTION_DAYS: float
+
 def ParserConfig() -> Settings:
     log.info("Loading configuration from Config.yaml...")
     
     config = LoadConfig("Config.yaml")
+    topK   = ReadConfig(config, ["run","TOP_K"], 100, int)
 
     return Settings(
         # ---- run ----
         TARGET_DATE  = ReadConfig(config, ["run","TARGET_DATE"    ],                                       "",  str),
         TOP_K        = ReadConfig(config, ["run","TOP_K"          ],                                      100,  int),
-        EMBEDDING_MODEL    = ReadConfig(config, ["run","EMBEDDING_MODEL"      ], "sentence-transformers/all-MiniLM-L6-v2",  str),
+        EMBEDDING_MODEL    = ReadConfig(config, ["run","EMBEDDING_MODEL"      ],          "models/gemini-embedding-001",  str),
         AI_ENABLE    = ReadConfig(config, ["run","AI_ENABLE"      ],                                     True, bool),
+        BACKFILL_WORKERS = ReadConfig(config, ["run","BACKFILL_WORKERS"],                                     4,  int),
 
         # ---- zotero ----
         ZOTERO_USER  = ReadConfig(config, ["zotero","ZOTERO_USER" ],                                       "",  str),
         ZOTERO_GROUP = ReadConfig(config, ["zotero","ZOTERO_GROUP"],                                       "",  str),
         ZOTERO_KEY   = ReadConfig(config, ["zotero","ZOTERO_KEY"  ],                                       "",  str),
+        ZOTERO_CACHE_DIR = ReadConfig(config, ["zotero","ZOTERO_CACHE_DIR"],                       ".cache/zotero",  str),
+
+        # ---- profiles ----
+        PROFILES     = ReadProfiles(config.get("profiles") or [], topK),
 
         # ---- email ----
         EMAIL_SERVER  = ReadConfig(config, ["email","EMAIL_SERVER"  ],                                       "",  str),
@@ -73,4 +182,67 @@ def ParserConfig() -> Settings:
         
         # ---- ai (Gemini) ----
         GEMINI_MODEL  = ReadConfig(config, ["ai","GEMINI_MODEL"    ],                  "models/gemini-2.5-pro",  str),
+
+        # ---- fetch ----
+        FETCH_CONCURRENT = ReadConfig(config, ["fetch","FETCH_CONCURRENT"],                                True, bool),
+        FETCH_WORKERS    = ReadConfig(config, ["fetch","FETCH_WORKERS"   ],                                   8,  int),
+        FETCH_TIMEOUT    = ReadConfig(config, ["fetch","FETCH_TIMEOUT"   ],                               300.0, float),
+        FETCH_ASYNC      = ReadConfig(config, ["fetch","FETCH_ASYNC"     ],                               False, bool),
+        FETCH_HOST_LIMIT = ReadConfig(config, ["fetch","FETCH_HOST_LIMIT"],                                   4,  int),
+        ARXIV_CATEGORIES = ReadConfig(config, ["fetch","ARXIV_CATEGORIES"],                                  "",  str),
+        DEDUP_NEAR_THRESHOLD = ReadConfig(config, ["fetch","DEDUP_NEAR_THRESHOLD"],                          0.8, float),
+        DEDUP_NUM_PERM   = ReadConfig(config, ["fetch","DEDUP_NUM_PERM"  ],                                 128,  int),
+
+        # ---- prefilter ----
+        PREFILTER_TOP_M        = ReadConfig(config, ["prefilter","PREFILTER_TOP_M"       ],                3000,  int),
+        PREFILTER_MARGIN       = ReadConfig(config, ["prefilter","PREFILTER_MARGIN"      ],                10.0, float),
+        PREFILTER_VENUE_WEIGHT = ReadConfig(config, ["prefilter","PREFILTER_VENUE_WEIGHT"],                 0.5, float),
+        PREFILTER_ALLOW        = ReadConfig(config, ["prefilter","PREFILTER_ALLOW"       ],                  "",  str),
+        PREFILTER_DENY         = ReadConfig(config, ["prefilter","PREFILTER_DENY"        ],                  "",  str),
+
+        # ---- http ----
+        HTTP_POOL_SIZE   = ReadConfig(config, ["http","HTTP_POOL_SIZE"   ],                                  16,  int),
+        HTTP_RETRIES     = ReadConfig(config, ["http","HTTP_RETRIES"     ],                                   4,  int),
+        HTTP_BACKOFF     = ReadConfig(config, ["http","HTTP_BACKOFF"     ],                                 0.5, float),
+
+        # ---- embedding ----
+        EMBEDDING_BACKEND     = ReadConfig(config, ["embedding","EMBEDDING_BACKEND"    ],                 "auto",  str),
+        EMBEDDING_LEXICAL_DIMENSIONS = ReadConfig(config, ["embedding","EMBEDDING_LEXICAL_DIMENSIONS"],     4096,  int),
+        EMBEDDING_LEXICAL_STATS = ReadConfig(config, ["embedding","EMBEDDING_LEXICAL_STATS"], ".cache/lexical/stats.npz",  str),
+        EMBEDDING_CONCURRENCY = ReadConfig(config, ["embedding","EMBEDDING_CONCURRENCY"],                      4,  int),
+        EMBEDDING_BATCH_SIZE  = ReadConfig(config, ["embedding","EMBEDDING_BATCH_SIZE" ],                     64,  int),
+        EMBEDDING_BATCH_CHARS = ReadConfig(config, ["embedding","EMBEDDING_BATCH_CHARS"],                 200000,  int),
+        EMBEDDING_RETRIES     = ReadConfig(config, ["embedding","EMBEDDING_RETRIES"    ],                      2,  int),
+        EMBEDDING_BREAKER     = ReadConfig(config, ["embedding","EMBEDDING_BREAKER"    ],                      3,  int),
+
+        # ---- profile ----
+        PROFILE_MODE        = ReadConfig(config, ["profile","PROFILE_MODE"       ],                      "mean",  str),
+        PROFILE_CLUSTERS    = ReadConfig(config, ["profile","PROFILE_CLUSTERS"   ],                           8,  int),
+        PROFILE_REDUCE      = ReadConfig(config, ["profile","PROFILE_REDUCE"     ],                       "max",  str),
+        PROFILE_TEMPERATURE = ReadConfig(config, ["profile","PROFILE_TEMPERATURE"],                        0.05, float),
+        RANK_CHUNK_SIZE     = ReadConfig(config, ["profile","RANK_CHUNK_SIZE"    ],                        4096,  int),
+        RANK_COARSE_DIMENSIONS = ReadConfig(config, ["profile","RANK_COARSE_DIMENSIONS"],                   256,  int),
+        RANK_COARSE_TOP_M   = ReadConfig(config, ["profile","RANK_COARSE_TOP_M"  ],                        1000,  int),
+
+        # ---- index ----
+        INDEX_DIR          = ReadConfig(config, ["index","INDEX_DIR"         ],                   ".cache/index",  str),
+        INDEX_DTYPE        = ReadConfig(config, ["index","INDEX_DTYPE"       ],                          "int8",  str),
+        INDEX_MAX_SEGMENTS = ReadConfig(config, ["index","INDEX_MAX_SEGMENTS"],                               8,  int),
+        INDEX_NPROBE       = ReadConfig(config, ["index","INDEX_NPROBE"      ],                               8,  int),
+        INDEX_RELATED      = ReadConfig(config, ["index","INDEX_RELATED"     ],                               3,  int),
+        INDEX_RELATED_DAYS = ReadConfig(config, ["index","INDEX_RELATED_DAYS"],                             180,  int),
+
+        # ---- cache ----
+        EMBEDDING_CACHE_DIR      = ReadConfig(config, ["cache","EMBEDDING_CACHE_DIR"     ],      ".cache/embeddings",  str),
+        EMBEDDING_CACHE_MAX_ROWS = ReadConfig(config, ["cache","EMBEDDING_CACHE_MAX_ROWS"],                 200000,  int),
+        EMBEDDING_CACHE_RESET    = ReadConfig(config, ["cache","EMBEDDING_CACHE_RESET"   ],                  False, bool),
+        EMBEDDING_CACHE_DTYPE    = ReadConfig(config, ["cache","EMBEDDING_CACHE_DTYPE"   ],              "float16",  str),
+        EMBEDDING_CACHE_MAX_AGE_DAYS = ReadConfig(config, ["cache","EMBEDDING_CACHE_MAX_AGE_DAYS"],           90.0, float),
+        CHECKPOINT_DIR           = ReadConfig(config, ["cache","CHECKPOINT_DIR"          ],     ".cache/checkpoints",  str),
+        CHECKPOINT_RETENTION_DAYS= ReadConfig(config, ["cache","CHECKPOINT_RETENTION_DAYS"],                   7.0, float),
+        PAPER_STORE_DIR          = ReadConfig(config, ["cache","PAPER_STORE_DIR"         ],           ".cache/store",  str),
+        PAPER_STORE_DTYPE        = ReadConfig(config, ["cache","PAPER_STORE_DTYPE"       ],              "float16",  str),
+        HTTP_CACHE_DIR           = ReadConfig(config, ["cache","HTTP_CACHE_DIR"          ],            ".cache/http",  str),
+        HTTP_CACHE_TTL           = ReadConfig(config, ["cache","HTTP_CACHE_TTL"          ],                  900.0, float),
+        HTTP_CACHE_RETENTION_DAYS= ReadConfig(config, ["cache","HTTP_CACHE_RETENTION_DAYS"],                  14.0, float),
     )
@@ -1,46 +1,271 @@
 # Sources/Embedder.py
-import os
+import re
+import time
 import numpy as np
 from typing import Optional
-from google import genai
-from google.genai.types import EmbedContentConfig
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import logging
 
+from .EmbeddingBackend import EmbeddingBackend, GeminiBackend
+from .EmbeddingCache import EmbeddingCache, TextKey
+from .Quantize import Quantized, Quantize
+from .HttpClient import http
+from .Metrics import metrics
+from .StageGraph import CheckAbort
+
+_PAYLOAD_ERROR = re.compile(r"payload|too large|request size|token limit|413", re.I)
+
+class MisalignedBatch(ValueError):
+    """The backend returned a different number (or width) of vectors than texts it was given."""
+
+def PayloadRejected(error: BaseException) -> bool:
+    """Errors that retrying the same batch cannot fix: 400/413 responses, size-limit
+    messages of errors that carry no status, and misaligned results. The batch is split
+    instead. Any other status (429 "Quota exceeded", 5xx) is transient: it is retried
+    with backoff and counts toward the breaker."""
+    if isinstance(error, MisalignedBatch):
+        return True
+    status = getattr(error, "code", None) or getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status in (400, 413)
+    return bool(_PAYLOAD_ERROR.search(str(error)))
+
 class Embedder:
     def __init__(
         self,
         modelName: str = "models/gemini-embedding-001",
         apiKey: Optional[str] = None, #"",
-        dimensions: int = 3072
+        dimensions: int = 3072,
+        cacheDir: str = "",
+        cacheMaxRows: int = 200_000,
+        cacheDtype: str = "float32",
+        cacheMaxAgeDays: float = 90.0,
+        concurrency: int = 4,
+        batchSize: int = 64,
+        maxBatchChars: int = 200_000,
+        backend: Optional[EmbeddingBackend] = None,
+        retries: int = 2,
+        breaker: int = 3,
     ):
-        self.model      = modelName
-        self.apiKey     = os.getenv("GEMINI_KEY")
-        self.dimensions = dimensions
+        """backend: where vectors come from (see EmbeddingBackend.OpenBackend); defaults to
+        Gemini `modelName`. This class adds the cache, batching and concurrency around it.
+        cacheDtype: how cached vectors are stored - "float32", "float16" or "int8".
+        cacheMaxAgeDays: drop cache namespaces (of any model) unused for this long.
+        retries: extra attempts per batch (with backoff) before it is given up on.
+        breaker: consecutive failed batches after which the rest of the work is given up on."""
+        self.backend    = backend or GeminiBackend(modelName, dimensions, apiKey)
+        self.model      = self.backend.name
+        self.space      = self.backend.space
+        self.dimensions = self.backend.dimensions
+        self.taskType   = self.backend.taskType
+        self.cache      = EmbeddingCache(cacheDir, model = self.model, dimensions = self.dimensions, taskType = self.taskType, maxRows = cacheMaxRows, dtype = cacheDtype, maxAgeDays = cacheMaxAgeDays) if cacheDir else None
+
+        # throughput mode: batches in flight at once, and a per-request payload budget
+        self.concurrency   = max(1, min(int(concurrency), self.backend.concurrency))
+        self.batchSize     = max(1, int(batchSize))
+        self.maxBatchChars = max(1, int(maxBatchChars))
+        self.retries       = max(0, int(retries))
+        self.breaker       = max(1, int(breaker))
+        self._failures     = 0          # consecutive failed batches, across calls (see _EmbedMissing)
+        self._counted: set[bytes] = set()   # keys already in this run's embedding metrics (see _Count)
+        self._batchSize    = None       # adaptive; starts at Encode's batchSize
 
         logging.info(f"Embedder initialized with model: {self.model}")
-        
-    def Encode(self, texts, batchSize: int = 64, normalize: bool = True) -> np.ndarray:
+
+    def Encode(self, texts, batchSize: Optional[int] = None, normalize: bool = True) -> np.ndarray:
+        """One row per text; rows that could not be embedded are all-zero (see EncodeMasked)."""
+        return self.EncodeMasked(texts, batchSize, normalize)[0]
+
+    def EncodeMasked(self, texts, batchSize: Optional[int] = None, normalize: bool = True) -> tuple[np.ndarray, np.ndarray]:
+        """(embeddings, mask): row i belongs to texts[i] and is valid where mask[i] is True.
+        Failed rows are all-zero; callers drop them rather than rank on them."""
+        batchSize = batchSize or self.batchSize
         logging.info(f"Embedding {len(texts)} texts in batches of {batchSize}...")
 
         if not texts:
-            return np.zeros((0, self.dimensions), dtype = np.float32)
+            return np.zeros((0, self.dimensions), dtype = np.float32), np.zeros((0, ), dtype = bool)
 
-        embeddingValues = []
-        config = EmbedContentConfig(task_type = "SEMANTIC_SIMILARITY", output_dimensionality = self.dimensions)
-        with genai.Client(api_key = self.apiKey) as aiClient:
-            try:
-                for i in range(0, len(texts), batchSize):
-                    batch = texts[i : i + batchSize]
-                    response = aiClient.models.embed_content(model = self.model, contents = batch, config = config)
-                    embeddingValues.extend(e.values for e in response.embeddings)
-            except Exception as e:
-                    logging.error(f"An error occurred during embedding a batch: {e}")
+        embeddings = np.zeros((len(texts), self.dimensions), dtype = np.float32)
+        keys = [TextKey(t) for t in texts]
+        if self.cache is not None:
+            hit, cached = self.cache.Lookup(keys)
+            embeddings[hit] = cached
+        else:
+            hit = np.zeros(len(texts), dtype = bool)
 
-        embeddings = np.array(embeddingValues, dtype = np.float32)
+        # Embed each distinct missing text once, then scatter back to every row that wants it
+        missRows: dict[bytes, list[int]] = {}
+        for i in np.flatnonzero(~hit).tolist():
+            missRows.setdefault(keys[i], []).append(i)
+        missKeys  = list(missRows.keys())
+        missTexts = [texts[rows[0]] for rows in missRows.values()]
+        logging.info(f"Embedding cache: {int(hit.sum())} hits, {len(missTexts)} distinct misses.")
+        self._Count(keys, hit)
+
+        embedded, mask = 0, hit.copy()
+        if missTexts:
+            values, done = self._EmbedMissing(missTexts, batchSize)
+            for j in np.flatnonzero(done).tolist():
+                embeddings[missRows[missKeys[j]]] = values[j]
+                mask[missRows[missKeys[j]]] = True
+            embedded = int(done.sum())
+            if self.cache is not None and embedded:
+                self.cache.Put([missKeys[j] for j in np.flatnonzero(done).tolist()], values[done])
 
         if normalize and embeddings.size > 0:
             norms = np.linalg.norm(embeddings, axis = 1, keepdims = True)
             embeddings /= (norms + 1e-9)
-        logging.info(f"Successfully created {embeddings.shape[0]} embeddings of dimension {embeddings.shape[1]}.")
+        logging.info(f"Successfully created {int(hit.sum()) + embedded} embeddings of dimension {embeddings.shape[1]}.")
+        if not mask.all():
+            logging.warning(f"{int((~mask).sum())} of {len(texts)} texts could not be embedded; their rows are masked out.")
+
+        return embeddings, mask
+
+    def EncodeChunks(self, texts, chunkSize: int = 4096, normalize: bool = True):
+        """Yield (offset, embeddings, mask) for consecutive slices of texts, so callers can
+        consume and drop each chunk instead of holding the full N x d matrix."""
+        chunkSize = max(1, int(chunkSize))
+        for offset in range(0, len(texts), chunkSize):
+            yield offset, *self.EncodeMasked(texts[offset : offset + chunkSize], normalize = normalize)
+
+    def EncodeQuantized(self, texts, dimensions: Optional[int] = None) -> Quantized:
+        """The leading `dimensions` components of each text's vector, in the cache's storage
+        form (codes + per-vector scales) - the cheap first pass of coarse-to-fine ranking.
+
+        It saves cache reads and scoring, not embedding calls, so callers pass cached
+        texts (see Cached). Any that are missing (e.g. evicted meanwhile) are embedded at
+        full resolution and cached first. Prefixes are not renormalized; Quantize.Dot
+        does that while scoring. Rows that could not be embedded are all-zero.
+        """
+        dimensions = min(int(dimensions or self.dimensions), self.dimensions)
+        if self.cache is None:
+            return Quantize(self.Encode(texts, normalize = False)[:, :dimensions], "float32")
+        keys = [TextKey(t) for t in texts]
+        cached = self.cache.Contains(keys)
+        self._Count(keys, cached)       # first touch of these texts; the fine pass re-reads them uncounted
+        missing = np.flatnonzero(~cached)
+        if missing.size:
+            self.Encode([texts[i] for i in missing.tolist()])
+        hit, found = self.cache.Lookup(keys, dimensions, quantized = True)
+        codes  = np.zeros((len(texts), dimensions), dtype = found.codes.dtype)
+        scales = np.ones((len(texts), ), dtype = np.float32)
+        codes[hit], scales[hit] = found.codes, found.scales
+        metrics.Count("embedding", "coarse_rows", len(texts))
+        return Quantized(codes, scales)
+
+    def Cached(self, texts) -> np.ndarray:
+        """Mask of the texts whose vectors are already in the cache (embedding them is free)."""
+        if self.cache is None:
+            return np.zeros((len(texts), ), dtype = bool)
+        return self.cache.Contains([TextKey(t) for t in texts])
+
+    def ResetCounts(self) -> None:
+        """Start a new run's embedding metrics (call alongside metrics.Reset)."""
+        self._counted = set()
+
+    def _Count(self, keys: list[bytes], hit: np.ndarray) -> None:
+        """Book embedding.texts / cache_hits / cache_misses for keys not counted yet this run.
+        A text passes through several reads per run (coarse, fine, archive, related
+        papers); only its first one counts, so the hit rate reflects real cache use."""
+        fresh = [i for i, k in enumerate(keys) if k not in self._counted]
+        if not fresh:
+            return
+        self._counted.update(keys[i] for i in fresh)
+        metrics.Count("embedding", "texts", len(fresh))
+        metrics.Count("embedding", "cache_hits", int(hit[fresh].sum()))
+        metrics.Count("embedding", "cache_misses", len({keys[i] for i in fresh if not hit[i]}))
+
+    def Fit(self, texts) -> None:
+        """Let the backend learn corpus statistics from profile texts (lexical backend only)."""
+        self.backend.Fit(texts)
+
+    def _NextBatchEnd(self, texts, start: int, batchSize: int) -> int:
+        """End of the batch starting at `start`: at most batchSize texts and maxBatchChars characters."""
+        end, chars = start, 0
+        while end < len(texts) and end - start < batchSize:
+            chars += len(texts[end])
+            if end > start and chars > self.maxBatchChars:
+                break
+            end += 1
+        return end
+
+    def _EmbedBatch(self, batch) -> np.ndarray:
+        """Embed one batch, retrying transient errors with backoff; payload rejections and
+        misaligned results are raised at once, since retrying the same batch cannot help."""
+        for attempt in range(self.retries + 1):
+            try:
+                with metrics.Timer("embedding.batch_seconds", sample = True):
+                    values = np.asarray(self.backend.Embed(batch), dtype = np.float32)
+                if values.shape != (len(batch), self.dimensions):
+                    raise MisalignedBatch(f"got {values.shape} vectors for {len(batch)} texts of dimension {self.dimensions}")
+                metrics.Count("embedding", "batches")
+                metrics.Count("embedding", "embedded", len(batch))
+                return values
+            except Exception as e:
+                if attempt == self.retries or PayloadRejected(e):
+                    raise
+                metrics.Count("embedding", "retries")
+                delay = http.Backoff(attempt)
+                logging.warning(f"Embedding batch of {len(batch)} failed ({e}); retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+    def _EmbedMissing(self, texts, batchSize: int) -> tuple[np.ndarray, np.ndarray]:
+        """Raw (unnormalized) vectors for texts plus a mask of the rows that were embedded.
+
+        Up to `concurrency` batches are in flight at once; each result is written into a
+        preallocated float32 matrix at its batch offset, so rows never shift. A batch the
+        backend rejects for its size (PayloadRejected) is split in half and both halves
+        are requeued ahead of new work, down to single texts; any other failure that
+        outlasts the batch's retries masks the batch out. After `breaker` consecutive such
+        failures the backend is taken to be down: the remaining texts are given up on, and
+        later calls send a single probe batch until one succeeds. The batch size adapts:
+        it halves after a rejected payload and creeps back up (to batchSize) after
+        successful requests.
+        """
+        values = np.zeros((len(texts), self.dimensions), dtype = np.float32)
+        done   = np.zeros((len(texts), ), dtype = bool)
+        size   = min(self._batchSize or batchSize, batchSize)
 
-        return embeddings
+        pending, pos, requeued, down = {}, 0, deque(), False
+        with ThreadPoolExecutor(max_workers = self.concurrency, thread_name_prefix = "embed") as pool:
+            while pending or (not down and (requeued or pos < len(texts))):
+                CheckAbort()
+                limit = self.concurrency if self._failures < self.breaker else 1
+                while not down and (requeued or pos < len(texts)) and len(pending) < limit:
+                    if requeued:
+                        start, end = requeued.popleft()
+                    else:
+                        start, end = pos, self._NextBatchEnd(texts, pos, size)
+                        pos = end
+                    pending[pool.submit(self._EmbedBatch, texts[start : end])] = (start, end)
+                finished, _ = wait(pending, return_when = FIRST_COMPLETED)
+                for fut in finished:
+                    start, end = pending.pop(fut)
+                    try:
+                        values[start : end] = fut.result()
+                        done[start : end] = True
+                        self._failures = 0
+                        size = min(batchSize, size + max(1, size // 4))
+                    except Exception as e:
+                        metrics.Count("embedding", "failed_batches")
+                        if PayloadRejected(e) and end - start > 1:
+                            size = max(1, size // 2)
+                            mid = (start + end) // 2
+                            requeued.extendleft([(mid, end), (start, mid)])
+                            metrics.Count("embedding", "split_batches")
+                            logging.error(f"Embedding batch [{start}, {end}) rejected: {e}; splitting it, batch size now {size}")
+                            continue
+                        if not PayloadRejected(e):
+                            self._failures += 1
+                        metrics.Count("embedding", "failed_rows", end - start)
+                        logging.error(f"Embedding texts [{start}, {end}) failed: {e}; giving up on them")
+                        if self._failures >= self.breaker and not down:
+                            down = True
+                            metrics.Count("embedding", "breaker_trips")
+                            logging.error(f"{self._failures} embedding batches failed in a row; giving up on the texts not sent yet")
+        left = len(texts) - pos + sum(end - start for start, end in requeued)
+        if left:
+            metrics.Count("embedding", "failed_rows", left)
+        self._batchSize = size
+        return values, done
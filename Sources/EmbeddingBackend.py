@@ -0,0 +1,195 @@
+# Sources/EmbeddingBackend.py
+import os
+import re
+import math
+import zlib
+import logging
+import threading
+import numpy as np
+from abc import ABC, abstractmethod
+
+from .HttpClient import http, RETRY_STATUS
+from .EmbeddingCache import TextKey, KEY_BYTES
+
+log = logging.getLogger(__name__)
+
+class EmbeddingBackend(ABC):
+    """Turns a batch of texts into raw (unnormalized) vectors for Embedder.
+
+    `name` identifies the exact vectors: it keys the embedding cache namespace and the
+    Zotero profile vectors, so it must change whenever vectors stop being comparable.
+    `space` keys the long-lived archives (paper store, index), which outlive `name`
+    changes that leave vectors close enough to search across.
+    """
+    name        : str
+    dimensions  : int
+    taskType    : str = ""
+    concurrency : int = 1           # batches worth running at once (remote APIs: many)
+    nested      : bool = False      # Matryoshka-trained: a renormalized prefix is itself a usable embedding
+
+    @abstractmethod
+    def Embed(self, texts: list[str]) -> np.ndarray:
+        ...
+
+    @property
+    def space(self) -> str:
+        return self.name
+
+    def Fit(self, texts: list[str]) -> None:
+        """Learn corpus statistics from profile texts (no-op for pretrained models)."""
+
+class GeminiBackend(EmbeddingBackend):
+    """google.genai embed_content; one client for the life of the backend, so its connections stay warm."""
+    concurrency = 64
+    nested      = True
+
+    def __init__(self, modelName: str = "models/gemini-embedding-001", dimensions: int = 3072, apiKey: str | None = None, taskType: str = "SEMANTIC_SIMILARITY"):
+        self.name       = modelName
+        self.dimensions = int(dimensions)
+        self.apiKey     = apiKey or os.getenv("GEMINI_KEY")
+        self.taskType   = taskType
+        self._client    = None
+        self._config    = None
+        self._lock      = threading.Lock()
+
+    def _Client(self):
+        with self._lock:
+            if self._client is None:
+                from google import genai
+                from google.genai.types import EmbedContentConfig, HttpOptions, HttpRetryOptions
+                # genai talks to the API over its own httpx transport, so it cannot share the
+                # requests pool; give it the same retry/backoff policy instead.
+                httpOptions = HttpOptions(retry_options = HttpRetryOptions(
+                    attempts      = http.retries + 1,
+                    initial_delay = http.backoffBase,
+                    max_delay     = http.backoffCap,
+                    jitter        = 1.0,
+                    http_status_codes = list(RETRY_STATUS),
+                ))
+                self._client = genai.Client(api_key = self.apiKey, http_options = httpOptions)
+                self._config = EmbedContentConfig(task_type = self.taskType, output_dimensionality = self.dimensions)
+            return self._client
+
+    def Embed(self, texts: list[str]) -> np.ndarray:
+        response = self._Client().models.embed_content(model = self.name, contents = texts, config = self._config)
+        return np.asarray([e.values for e in response.embeddings], dtype = np.float32)
+
+_TOKENS = re.compile(r"\w+")
+
+class HashedBm25Backend(EmbeddingBackend):
+    """Offline lexical embeddings: BM25-weighted unigrams and bigrams, hashed into `dimensions` buckets.
+
+    Each feature lands in bucket crc32 % dimensions with a sign from another crc32 bit,
+    so collisions cancel out on average instead of piling up. Document frequencies are
+    kept per bucket and fit incrementally on the profile corpus (Fit skips texts it has
+    already seen), persisted at `statsPath`:
+      n, totalLength - documents fitted and their summed length in features
+      df             - per-bucket document frequency
+      keys           - TextKey of every fitted text
+    The BM25 weights are frozen when the backend is opened, so all vectors of one run
+    share one space. `name` carries a generation that steps each time the fitted corpus
+    doubles; caches keyed by it are rebuilt then (cheap, everything is local). `space`
+    leaves the generation out: successive generations hash into the same signed buckets
+    and differ only by idf drift, so the paper store and index keep one namespace.
+    """
+    def __init__(self, statsPath: str = "", dimensions: int = 4096, *, k1: float = 1.2, b: float = 0.75):
+        self.dimensions = int(dimensions)
+        self.statsPath  = statsPath
+        self.k1, self.b = float(k1), float(b)
+        self._lock      = threading.Lock()
+
+        self.n, self.totalLength = 0, 0.0
+        self.df   = np.zeros((self.dimensions, ), dtype = np.float64)
+        self.keys = set()
+        self._Load()
+        self.name = f"hashed-bm25-{self.dimensions}-g{int(math.log2(self.n + 1))}"
+        self._idf    = np.log1p((self.n - self.df + 0.5) / (self.df + 0.5)).astype(np.float32)
+        self._avgLen = self.totalLength / self.n if self.n else 0.0
+
+    @property
+    def space(self) -> str:
+        return f"hashed-bm25-{self.dimensions}"
+
+    def _Features(self, text: str) -> tuple[np.ndarray, np.ndarray]:
+        """(bucket, sign) of every unigram and bigram occurrence in the text."""
+        words = _TOKENS.findall((text or "").lower())
+        feats = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        hashes = np.fromiter((zlib.crc32(f.encode("utf-8")) for f in feats), dtype = np.uint32, count = len(feats))
+        return (hashes % self.dimensions).astype(np.int64), np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+
+    def Embed(self, texts: list[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dimensions), dtype = np.float32)
+        for i, text in enumerate(texts):
+            buckets, signs = self._Features(text)
+            if buckets.size == 0:
+                continue
+            # term frequency per signed bucket: features of opposite sign in one bucket cancel
+            tf = np.zeros((self.dimensions, ), dtype = np.float32)
+            np.add.at(tf, buckets, signs)
+            used = np.flatnonzero(tf)
+            counts = np.abs(tf[used])
+            norm = self.k1 * (1 - self.b + self.b * buckets.size / self._avgLen) if self._avgLen else self.k1
+            out[i, used] = np.sign(tf[used]) * self._idf[used] * counts * (self.k1 + 1) / (counts + norm)
+        return out
+
+    def Fit(self, texts: list[str]) -> None:
+        with self._lock:
+            fresh = 0
+            for text in texts:
+                key = TextKey(text)
+                if key in self.keys:
+                    continue
+                self.keys.add(key)
+                buckets, _ = self._Features(text)
+                self.df[np.unique(buckets)] += 1
+                self.n += 1
+                self.totalLength += buckets.size
+                fresh += 1
+            if fresh:
+                self._Save()
+                log.info(f"Lexical embedding statistics: fitted {fresh} new texts ({self.n} in total).")
+
+    def _Load(self):
+        if not (self.statsPath and os.path.exists(self.statsPath)):
+            return
+        stats = np.load(self.statsPath)
+        if stats["df"].shape != (self.dimensions, ):
+            log.info("Lexical embedding dimensions changed; refitting the statistics.")
+            return
+        self.n, self.totalLength = int(stats["n"]), float(stats["totalLength"])
+        self.df   = stats["df"].astype(np.float64)
+        self.keys = {bytes(k) for k in stats["keys"]}
+
+    def _Save(self):
+        if not self.statsPath:
+            return
+        os.makedirs(os.path.dirname(self.statsPath) or ".", exist_ok = True)
+        keys = np.frombuffer(b"".join(self.keys), dtype = np.uint8).reshape(-1, KEY_BYTES)
+        tmp = self.statsPath + ".tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, n = self.n, totalLength = self.totalLength, df = self.df, keys = keys)
+        os.replace(tmp, self.statsPath)
+
+def OpenBackend(kind: str, *, modelName: str, dimensions: int = 3072, lexicalDimensions: int = 4096, lexicalStats: str = "", probe: bool = True) -> EmbeddingBackend:
+    """kind: "gemini", "lexical", or "auto" - Gemini when a key is set and a probe request
+    succeeds, otherwise the lexical backend (degraded mode: no network, no quota).
+    probe=False trusts the key without a request (offline runs that read stored vectors)."""
+    kind = (kind or "auto").lower()
+    if kind == "lexical":
+        return HashedBm25Backend(lexicalStats, lexicalDimensions)
+    gemini = GeminiBackend(modelName, dimensions)
+    if kind == "gemini":
+        return gemini
+    if kind != "auto":
+        raise ValueError(f"Unknown embedding backend {kind!r}; expected gemini, lexical or auto")
+    if not gemini.apiKey:
+        log.warning("No GEMINI_KEY set; using the offline lexical embedding backend.")
+        return HashedBm25Backend(lexicalStats, lexicalDimensions)
+    if not probe:
+        return gemini
+    try:
+        gemini.Embed(["PaperLens"])
+    except Exception as e:
+        log.warning(f"Gemini embeddings unreachable ({e}); using the offline lexical embedding backend.")
+        return HashedBm25Backend(lexicalStats, lexicalDimensions)
+    return gemini
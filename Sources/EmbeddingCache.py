@@ -0,0 +1,216 @@
+# Sources/EmbeddingCache.py
+import os
+import re
+import json
+import time
+import shutil
+import hashlib
+import logging
+import threading
+import numpy as np
+
+from .Quantize import Quantized, Quantize, Dequantize, DTYPES
+
+log = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+KEY_BYTES     = 16
+
+def NormalizeText(text: str) -> str:
+    return re.sub(r"\s+", " ", text or "").strip()
+
+def TextKey(text: str) -> bytes:
+    return hashlib.blake2b(NormalizeText(text).encode("utf-8"), digest_size = KEY_BYTES).digest()
+
+class EmbeddingCache:
+    """Persistent content-addressed embedding cache.
+
+    One directory per (model, output_dimensionality, task_type, storage dtype) namespace under `root`:
+      meta.json    - namespace description, capacity, LRU clock
+      keys.bin     - capacity x 16-byte text hashes (all-zero row = free slot)
+      stamps.bin   - capacity x int64 last-use clock, for LRU eviction
+      vectors.f32  - capacity x dimensions matrix in the storage dtype
+                     (vectors.f16 for float16, vectors.i8 for int8)
+      scales.f32   - capacity float32 per-vector scales (int8 only)
+    All arrays are memory-mapped; opening the cache reads only the key column,
+    and lookups touch only the vector rows that hit (and, for a Matryoshka prefix,
+    only their leading columns).
+    Namespaces of different models live side by side, so a run that falls back to
+    another backend leaves the others intact; a namespace is dropped only when it has
+    not been opened for `maxAgeDays` (or was written by another cache version).
+    """
+    def __init__(self, root: str, *, model: str, dimensions: int, taskType: str, maxRows: int = 200_000, dtype: str = "float32", maxAgeDays: float = 90.0):
+        if dtype not in DTYPES:
+            raise ValueError(f"Unknown embedding cache dtype {dtype!r}; expected one of {', '.join(DTYPES)}")
+        self.model      = model
+        self.dimensions = int(dimensions)
+        self.taskType   = taskType
+        self.maxRows    = max(1, int(maxRows))
+        self.dtype      = dtype
+        self.maxAgeDays = float(maxAgeDays)
+        self.meta       = {"version": CACHE_VERSION, "model": model, "dimensions": self.dimensions, "taskType": taskType}
+        if dtype != "float32":
+            self.meta["dtype"] = dtype      # float32 namespaces keep the hash they had before dtypes existed
+
+        namespace = hashlib.sha1(json.dumps(self.meta, sort_keys = True).encode("utf-8")).hexdigest()[:16]
+        self.root = root
+        self.dir  = os.path.join(root, namespace)
+        self._lock = threading.Lock()
+
+        self._PurgeStale(namespace)
+        self._Open()
+
+    # ---- public ----
+    def Lookup(self, keys: list[bytes], dimensions: int | None = None, quantized: bool = False) -> tuple[np.ndarray, np.ndarray | Quantized]:
+        """Return (hitMask, vectors) where vectors holds one row per hit, in key order.
+
+        dimensions: read only each vector's leading components (a Matryoshka prefix).
+        quantized:  return the stored codes and scales instead of float32 rows.
+        """
+        with self._lock:
+            rows = np.fromiter((self._index.get(k, -1) for k in keys), dtype = np.int64, count = len(keys))
+            hit  = rows >= 0
+            if hit.any():
+                # LRU bump only: the stamps land in the shared mapping and reach the file
+                # with the next Put or on exit; no msync or meta rewrite per lookup
+                self._clock += 1
+                self._stamps[rows[hit]] = self._clock
+            found = Quantized(np.array(self._vectors[rows[hit], :dimensions]), self._Scales(rows[hit]))
+            return hit, (found if quantized else Dequantize(found))
+
+    def Contains(self, keys: list[bytes]) -> np.ndarray:
+        """Mask of the keys that are cached; unlike Lookup it reads no vectors and leaves LRU stamps alone."""
+        with self._lock:
+            return np.fromiter((k in self._index for k in keys), dtype = bool, count = len(keys))
+
+    def Put(self, keys: list[bytes], vectors: np.ndarray) -> None:
+        if not keys:
+            return
+        with self._lock:
+            fresh = {}
+            for k, v in zip(keys, vectors):
+                if k not in self._index:
+                    fresh[k] = v
+            if not fresh:
+                return
+            newKeys = list(fresh.keys())[-self.maxRows:]
+            rows = self._Allocate(len(newKeys))
+            self._clock += 1
+            codes, scales = Quantize(np.asarray([fresh[k] for k in newKeys], dtype = np.float32), self.dtype)
+            self._vectors[rows] = codes
+            if self._scales is not None:
+                self._scales[rows] = scales
+            self._keys[rows]    = np.frombuffer(b"".join(newKeys), dtype = np.uint8).reshape(-1, KEY_BYTES)
+            self._stamps[rows]  = self._clock
+            for r, k in zip(rows.tolist(), newKeys):
+                self._index[k] = r
+            self._Flush()
+
+    def Invalidate(self) -> None:
+        """Drop every cached vector of this namespace."""
+        with self._lock:
+            self._Close()
+            shutil.rmtree(self.dir, ignore_errors = True)
+            self._Open()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    # ---- storage ----
+    def _PurgeStale(self, namespace: str):
+        """Drop namespaces unused for maxAgeDays (meta.json is rewritten on every open and
+        write) or of another cache version. Other models are kept: they are what a run
+        falls back from, and re-embedding them costs quota."""
+        if not os.path.isdir(self.root):
+            return
+        cutoff = time.time() - self.maxAgeDays * 86400
+        for name in os.listdir(self.root):
+            metaPath = os.path.join(self.root, name, "meta.json")
+            if name == namespace or not os.path.exists(metaPath):
+                continue
+            try:
+                with open(metaPath, "r", encoding = "utf-8") as f:
+                    other = json.load(f)
+            except (OSError, ValueError):
+                other = {}
+            if other.get("version") != CACHE_VERSION or os.path.getmtime(metaPath) < cutoff:
+                log.info(f"Dropping stale embedding cache {name} (model {other.get('model')}).")
+                shutil.rmtree(os.path.join(self.root, name), ignore_errors = True)
+
+    def _Open(self):
+        os.makedirs(self.dir, exist_ok = True)
+        metaPath = os.path.join(self.dir, "meta.json")
+        capacity, self._clock = 0, 0
+        if os.path.exists(metaPath):
+            with open(metaPath, "r", encoding = "utf-8") as f:
+                stored = json.load(f)
+            capacity, self._clock = int(stored.get("capacity", 0)), int(stored.get("clock", 0))
+        self._Map(capacity)
+        # lookups bump stamps without rewriting meta.json, so the stored clock may lag them
+        self._clock = max(self._clock, int(self._stamps.max(initial = 0)))
+        used = np.flatnonzero(self._keys.any(axis = 1))
+        self._index = {self._keys[r].tobytes(): int(r) for r in used}
+        self._WriteMeta()       # marks the namespace as in use for _PurgeStale
+        log.info(f"Embedding cache {self.dir}: {len(self._index)} vectors.")
+
+    def _Scales(self, rows: np.ndarray) -> np.ndarray:
+        if self._scales is None:
+            return np.ones((len(rows), ), dtype = np.float32)
+        return np.array(self._scales[rows], dtype = np.float32)
+
+    def _Map(self, capacity: int):
+        self.capacity = capacity
+        vectorType = DTYPES[self.dtype]
+        vectorFile = {"float32": "vectors.f32", "float16": "vectors.f16", "int8": "vectors.i8"}[self.dtype]
+        shapes = {"keys.bin": KEY_BYTES, "stamps.bin": 8, vectorFile: np.dtype(vectorType).itemsize * self.dimensions}
+        if self.dtype == "int8":
+            shapes["scales.f32"] = 4
+        for name, rowBytes in shapes.items():
+            path = os.path.join(self.dir, name)
+            with open(path, "ab") as f:
+                if f.tell() < capacity * rowBytes:
+                    f.truncate(capacity * rowBytes)
+        if capacity == 0:
+            self._keys    = np.zeros((0, KEY_BYTES), dtype = np.uint8)
+            self._stamps  = np.zeros((0, ), dtype = np.int64)
+            self._vectors = np.zeros((0, self.dimensions), dtype = vectorType)
+            self._scales  = np.zeros((0, ), dtype = np.float32) if self.dtype == "int8" else None
+            return
+        self._keys    = np.memmap(os.path.join(self.dir, "keys.bin"),    dtype = np.uint8,   mode = "r+", shape = (capacity, KEY_BYTES))
+        self._stamps  = np.memmap(os.path.join(self.dir, "stamps.bin"),  dtype = np.int64,   mode = "r+", shape = (capacity, ))
+        self._vectors = np.memmap(os.path.join(self.dir, vectorFile),    dtype = vectorType, mode = "r+", shape = (capacity, self.dimensions))
+        self._scales  = np.memmap(os.path.join(self.dir, "scales.f32"),  dtype = np.float32, mode = "r+", shape = (capacity, )) if self.dtype == "int8" else None
+
+    def _Allocate(self, n: int) -> np.ndarray:
+        """Pick n slots: free ones first, then grow the files, then evict least-recently-used."""
+        free = np.flatnonzero(~self._keys.any(axis = 1))[:n]
+        if len(free) < n and self.capacity < self.maxRows:
+            old = self.capacity
+            self._Close()
+            self._Map(min(self.maxRows, max(old * 2, old + n - len(free), 1024)))
+            free = np.flatnonzero(~self._keys.any(axis = 1))[:n]
+        if len(free) < n:
+            need  = n - len(free)
+            taken = np.ones(self.capacity, dtype = bool)
+            taken[free] = False
+            candidates = np.flatnonzero(taken)
+            victims = candidates[np.argpartition(self._stamps[candidates], need - 1)[:need]] if need < len(candidates) else candidates
+            for r in victims.tolist():
+                self._index.pop(self._keys[r].tobytes(), None)
+            self._keys[victims] = 0
+            free = np.concatenate([free, victims])
+        return free[:n]
+
+    def _Flush(self):
+        for arr in (self._keys, self._stamps, self._vectors, self._scales):
+            if isinstance(arr, np.memmap):
+                arr.flush()
+        self._WriteMeta()
+
+    def _WriteMeta(self):
+        with open(os.path.join(self.dir, "meta.json"), "w", encoding = "utf-8") as f:
+            json.dump({**self.meta, "capacity": self.capacity, "clock": self._clock}, f)
+
+    def _Close(self):
+        self._Flush()
+        self._keys = self._stamps = self._vectors = self._scales = None
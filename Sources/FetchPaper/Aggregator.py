@@ -1,25 +1,115 @@
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
 from .Source import Source
+from .NearDuplicate import NearDuplicates
+from .RecordMerge import MergeIndex
+from ..Metrics import metrics, Scope
+from ..StageGraph import CheckAbort
+
+log = logging.getLogger(__name__)
+
+ABORT_POLL = 0.5
 
 class Aggregator:
-    def __init__(self, sources:list[Source]):
+    def __init__(self, sources:list[Source], *, concurrent:bool=False, maxWorkers:int=8, timeout:float=300.0, nearThreshold:float=0.0, nearNumPerm:int=128):
+        """concurrent: run sources on a bounded thread pool instead of one after another.
+        maxWorkers: pool size; timeout: per-source wall-clock deadline in seconds (concurrent mode only).
+        nearThreshold: estimated title+abstract Jaccard similarity above which records from
+        different sources count as the same paper and are fused (0 disables near-duplicate merging);
+        nearNumPerm: MinHash signature length.
+        """
         self.sources = sources
+        self.concurrent = concurrent
+        self.maxWorkers = max(1, int(maxWorkers))
+        self.timeout = float(timeout)
+        self.nearDuplicates = NearDuplicates(nearThreshold, nearNumPerm) if nearThreshold > 0 else None
 
     def fetch_all(self, *, day:str, nextDay:str, **kwargs) -> list[dict]:
+        if self.concurrent and len(self.sources) > 1:
+            piles = self._fetch_concurrent(day=day, nextDay=nextDay, **kwargs)
+        else:
+            piles = self._fetch_sequential(day=day, nextDay=nextDay, **kwargs)
+        return self._merge(piles)
+
+    def _fetch_sequential(self, *, day:str, nextDay:str, **kwargs) -> list[list[dict]]:
         piles=[]
         for s in self.sources:
+            CheckAbort()
             try:
-                piles.append(s.Fetch(day=day, nextDay=nextDay, **kwargs.get(s.name, {})))
+                piles.append(self._run(s, day=day, nextDay=nextDay, **kwargs.get(s.name, {})))
             except Exception as e:
-                print(f"[Aggregator] {s.name} error:", e)
-        # 去重
-        seen=set(); merged=[]
-        def key_of(x):
-            if x.get("doi"): return "doi:"+x["doi"].lower()
-            if x.get("id"):  return x["id"]
-            return "t:"+x.get("title","")[:120].lower()+"|d:"+x.get("date","")
+                self._failed(s, e)
+        return piles
+
+    def _fetch_concurrent(self, *, day:str, nextDay:str, **kwargs) -> list[list[dict]]:
+        """Run every source on the pool; each gets its own deadline counted from when it starts.
+
+        Piles are collected in completion order but returned in source order, so the
+        dedup in _merge keeps the same winners no matter which host answers first.
+        A source that overruns its deadline is abandoned (its thread is left to finish
+        in the background) and contributes nothing.
+        """
+        started: dict[int, float] = {}
+        def run(idx:int, s:Source) -> list[dict]:
+            started[idx] = time.monotonic()
+            return self._run(s, day=day, nextDay=nextDay, **kwargs.get(s.name, {}))
+
+        results: dict[int, list[dict]] = {}
+        pool = ThreadPoolExecutor(max_workers=min(self.maxWorkers, len(self.sources)), thread_name_prefix="fetch")
+        try:
+            pending = {pool.submit(run, i, s): i for i, s in enumerate(self.sources)}
+            while pending:
+                now = time.monotonic()
+                deadlines = [started[i] + self.timeout for i in pending.values() if i in started]
+                waitFor = max(0.0, min(deadlines) - now) if deadlines else self.timeout
+                # wake up at least every ABORT_POLL seconds, so a failed pipeline stage stops the fetch
+                done, _ = wait(pending, timeout=min(waitFor, ABORT_POLL), return_when=FIRST_COMPLETED)
+                CheckAbort()
+                for fut in done:
+                    i = pending.pop(fut)
+                    try:
+                        results[i] = fut.result()
+                    except Exception as e:
+                        self._failed(self.sources[i], e)
+                now = time.monotonic()
+                for fut, i in list(pending.items()):
+                    if i in started and now - started[i] >= self.timeout:
+                        fut.cancel()
+                        pending.pop(fut)
+                        self._failed(self.sources[i], f"timed out after {self.timeout:.0f}s", "timeouts")
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+        return [results[i] for i in sorted(results)]
+
+    def _run(self, s:Source, **kwargs) -> list[dict]:
+        """s.Fetch with its HTTP traffic, wall time and record count booked under s.name."""
+        with Scope(s.name), metrics.Timer(f"source.{s.name}"):
+            pile = s.Fetch(**kwargs)
+        metrics.Count(s.name, "records", len(pile))
+        return pile
+
+    def _failed(self, s:Source, e, kind:str="errors"):
+        """Book a failed source; its records are skipped and the other sources go on."""
+        metrics.Count(s.name, kind)
+        log.warning(f"{s.name} failed: {e}", exc_info = e if isinstance(e, BaseException) else None)
+
+    def _merge(self, piles:list[list[dict]]) -> list[dict]:
+        # 去重：规范化 DOI/arXiv/PMID/OpenAlex 标识，共享任一标识的记录合并为一条，按字段择优
+        index=MergeIndex()
         for lst in piles:
             for it in lst:
-                k=key_of(it)
-                if k in seen: continue
-                seen.add(k); merged.append(it)
+                index.Add(it)
+        merged=index.Merged()
+        metrics.Count("dedup", "fused", sum(len(r["sources"]) > 1 for r in merged))
+        # 近似重复：同一论文在不同来源的标题/摘要略有出入
+        if self.nearDuplicates is not None:
+            exact=len(merged)
+            with metrics.Timer("dedup.near"):
+                merged=self.nearDuplicates.Filter(merged)
+            metrics.Count("dedup", "near_duplicates", exact-len(merged))
+        total=sum(len(lst) for lst in piles)
+        metrics.Count("dedup", "input", total)
+        metrics.Count("dedup", "duplicates", total-len(merged))
         return merged
@@ -1,10 +1,12 @@
-import requests
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from xml.etree import ElementTree as ET
 
+from ..HttpClient import http
 from .Source import Source
 
 ATOM_NS = {"atom": "http://www.w3.org/2005/Atom", "arxiv": "http://arxiv.org/schemas/atom"}
+ENTRY_TAG = "{http://www.w3.org/2005/Atom}entry"
+TOTAL_TAG = "{http://a9.com/-/spec/opensearch/1.1/}totalResults"
 
 def _parse_atom_date(s: str) -> str:
     # arXiv uses RFC3339/ATOM format, e.g., "2025-10-23T17:31:15Z"
@@ -21,85 +23,131 @@ def _parse_atom_date(s: str) -> str:
 class ArxivSource(Source):
     name = "arXiv"
 
-    def Fetch(self, *, day: str, nextDay: str, **kwargs) -> list[dict]:
-        """Fetch arXiv entries submitted between [day, nextDay).
+    BASE = "https://export.arxiv.org/api/query"
+    WINDOWED = True
 
-        arXiv API (Atom feed) does not support an explicit date range filter,
-        so we fetch pages by submittedDate (desc) and stop when entries fall before 'day'.
-        """
-        perPage = int(kwargs.get("perPage", 200))
-        maxPages = int(kwargs.get("maxPages", 6))
-
-        # Construct base query: everything, sorted by submitted date desc
-        # Doc: https://info.arxiv.org/help/api/user-manual.html
-        base_url = "https://export.arxiv.org/api/query"
-        params = {
-            "search_query": "all",
-            "sortBy": "submittedDate",
-            "sortOrder": "descending",
-            "start": 0,
-            "max_results": perPage,
-        }
+    def _window(self, day: str, nextDay: str) -> str:
+        """submittedDate range covering [day, nextDay): YYYYMMDD0000 TO <last day>2359."""
+        last = (datetime.strptime(nextDay, "%Y-%m-%d") - timedelta(days=1)).strftime("%Y%m%d")
+        return f"submittedDate:[{day.replace('-', '')}0000 TO {max(last, day.replace('-', ''))}2359]"
 
-        out: list[dict] = []
-        for _ in range(maxPages):
-            r = requests.get(base_url, params=params, timeout=60)
-            r.raise_for_status()
-            feed = ET.fromstring(r.text)
+    def _parse_feed(self, chunks, day: str, nextDay: str) -> tuple[list[dict], int]:
+        """Stream-parse one Atom page from an iterable of byte chunks (e.g. a stream=True
+        response's iter_content): (normalized entries, opensearch:totalResults).
 
-            entries = feed.findall("atom:entry", ATOM_NS)
-            if not entries:
+        Chunks are fed to a pull parser as they arrive, and each <entry> is turned into
+        a record on its end event and then cleared, so neither the page body nor a
+        page-sized tree is ever held in memory.
+        """
+        out: list[dict] = []
+        total = 0
+        parser = ET.XMLPullParser(events=("end",))
+        def drain():
+            nonlocal total
+            for _, elem in parser.read_events():
+                if elem.tag == TOTAL_TAG:
+                    total = int((elem.text or "0").strip() or 0)
+                elif elem.tag == ENTRY_TAG:
+                    item = self._parse_entry(elem)
+                    if item["date"] and not (day <= item["date"] < nextDay):
+                        self._Dropped("date")
+                    else:
+                        out.append(item)
+                    elem.clear()
+        for chunk in chunks:
+            parser.feed(chunk)
+            drain()
+        parser.close()
+        drain()
+        return out, total
+
+    def _parse_entry(self, e) -> dict:
+        # id / link
+        id_text = (e.findtext("atom:id", default="", namespaces=ATOM_NS) or "").strip()
+
+        # title / summary
+        title = (e.findtext("atom:title", default="", namespaces=ATOM_NS) or "").strip()
+        abstract = (e.findtext("atom:summary", default="", namespaces=ATOM_NS) or "").strip()
+
+        # published date
+        published_raw = (e.findtext("atom:published", default="", namespaces=ATOM_NS) or "").strip()
+        pub_date = _parse_atom_date(published_raw)
+
+        # doi (optional)
+        doi = (e.findtext("arxiv:doi", default="", namespaces=ATOM_NS) or "").strip()
+
+        # url: prefer alternate link
+        url = ""
+        for link in e.findall("atom:link", ATOM_NS):
+            if link.get("rel") == "alternate" and link.get("href"):
+                url = link.get("href")
                 break
+        if not url:
+            url = id_text
+
+        # venue: use primary category if available
+        primary_cat = e.find("arxiv:primary_category", ATOM_NS)
+        venue = primary_cat.get("term") if primary_cat is not None else ""
+
+        return self._norm({
+            "id": id_text,
+            "title": title,
+            "abstract": abstract,
+            "doi": doi,
+            "url": url,
+            "venue": venue,
+            "date": pub_date,
+            "source": self.name,
+        })
 
-            stop_paging = False
-            for e in entries:
-                # id / link
-                id_text = (e.findtext("atom:id", default="", namespaces=ATOM_NS) or "").strip()
-
-                # title / summary
-                title = (e.findtext("atom:title", default="", namespaces=ATOM_NS) or "").strip()
-                abstract = (e.findtext("atom:summary", default="", namespaces=ATOM_NS) or "").strip()
+    def Fetch(self, *, day: str, nextDay: str, **kwargs) -> list[dict]:
+        """Fetch arXiv entries submitted between [day, nextDay).
 
-                # published date
-                published_raw = (e.findtext("atom:published", default="", namespaces=ATOM_NS) or "").strip()
-                pub_date = _parse_atom_date(published_raw)
+        The window is pinned server-side with a submittedDate range, so every page
+        holds only in-window entries and the first page's opensearch:totalResults
+        says exactly how many pages cover the day. With `categories` (list or
+        comma-separated, e.g. "cs.CV,cs.LG") the query is split per category;
+        cross-listed papers are kept once. Pages are requested one after another:
+        the API asks for a single connection and one request every 3 seconds, which
+        the shared client enforces for export.arxiv.org (HOST_INTERVALS) across
+        sources and backfill days.
+        Doc: https://info.arxiv.org/help/api/user-manual.html
+        """
+        perPage = int(kwargs.get("perPage", 500))
+        maxPages = int(kwargs.get("maxPages", 20))
+        categories = kwargs.get("categories") or []
+        if isinstance(categories, str):
+            categories = [c.strip() for c in categories.split(",") if c.strip()]
+
+        window = self._window(day, nextDay)
+        queries = [f"cat:{c} AND {window}" for c in categories] or [window]
+
+        def page(query: str, start: int) -> tuple[list[dict], int]:
+            params = {
+                "search_query": query,
+                "sortBy": "submittedDate",
+                "sortOrder": "descending",
+                "start": start,
+                "max_results": perPage,
+            }
+            r = http.Get(self.BASE, params=params, timeout=60, ttl=self.CacheTtl(nextDay), stream=True)
+            with r:
+                r.raise_for_status()
+                return self._parse_feed(r.iter_content(chunk_size=1 << 16), day, nextDay)
+
+        pages: list[list[dict]] = []
+        for query in queries:
+            items, total = page(query, 0)
+            pages.append(items)
+            for start in range(perPage, min(total, perPage * maxPages), perPage):
+                pages.append(page(query, start)[0])
 
-                if pub_date and pub_date < day:
-                    stop_paging = True
-                    continue
-                if pub_date and not (day <= pub_date < nextDay):
+        out: list[dict] = []
+        seen: set[str] = set()
+        for items in pages:
+            for item in items:
+                if item["id"] in seen:
                     continue
-
-                # doi (optional)
-                doi = (e.findtext("arxiv:doi", default="", namespaces=ATOM_NS) or "").strip()
-
-                # url: prefer alternate link
-                url = ""
-                for link in e.findall("atom:link", ATOM_NS):
-                    if link.get("rel") == "alternate" and link.get("href"):
-                        url = link.get("href")
-                        break
-                if not url:
-                    url = id_text
-
-                # venue: use primary category if available
-                primary_cat = e.find("arxiv:primary_category", ATOM_NS)
-                venue = primary_cat.get("term") if primary_cat is not None else ""
-
-                out.append(self._norm({
-                    "id": id_text,
-                    "title": title,
-                    "abstract": abstract,
-                    "doi": doi,
-                    "url": url,
-                    "venue": venue,
-                    "date": pub_date,
-                    "source": self.name,
-                }))
-
-            if stop_paging:
-                break
-
-            params["start"] = int(params["start"]) + perPage
-
+                seen.add(item["id"])
+                out.append(item)
         return out
@@ -0,0 +1,63 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from .Aggregator import Aggregator, ABORT_POLL
+from .AsyncHttp import HostLimiter, UseLimiter
+from .Source import Source
+from ..Metrics import metrics, Scope
+from ..StageGraph import CheckAbort
+
+class AsyncAggregator(Aggregator):
+    """Runs every source's AFetch as a task on one event loop.
+
+    The requests themselves are blocking http.Get calls in worker threads (AGet), not
+    async sockets: the loop only coordinates them. Sources with a native AFetch
+    (PubMed, OpenAIRE) put several of their pages in flight at once under the
+    HostLimiter's per-host cap; sources that only implement Fetch (arXiv, Crossref,
+    ...) run whole in one thread via Source.AFetch, exactly as with the concurrent
+    Aggregator.
+    """
+    def __init__(self, sources:list[Source], *, timeout:float=300.0, hostLimits:dict[str, int] | None = None, defaultHostLimit:int=4, maxInFlight:int=64, nearThreshold:float=0.0, nearNumPerm:int=128):
+        super().__init__(sources, timeout=timeout, nearThreshold=nearThreshold, nearNumPerm=nearNumPerm)
+        self.hostLimits = hostLimits or {}
+        self.defaultHostLimit = defaultHostLimit
+        self.maxInFlight = max(1, int(maxInFlight))
+
+    def fetch_all(self, *, day:str, nextDay:str, **kwargs) -> list[dict]:
+        # Not asyncio.run(): that joins the default executor on exit, which would
+        # block on a timed-out source whose thread is still running.
+        loop = asyncio.new_event_loop()
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=self.maxInFlight, thread_name_prefix="afetch"))
+        try:
+            return loop.run_until_complete(self.afetch_all(day=day, nextDay=nextDay, **kwargs))
+        finally:
+            loop.close()
+
+    async def afetch_all(self, *, day:str, nextDay:str, **kwargs) -> list[dict]:
+        UseLimiter(HostLimiter(self.hostLimits, self.defaultHostLimit))
+
+        async def run(s:Source) -> list[dict]:
+            # each gather() task runs in its own context copy, so the scope stays per source
+            # and follows AGet / to_thread into the worker threads
+            try:
+                with Scope(s.name), metrics.Timer(f"source.{s.name}"):
+                    pile = await asyncio.wait_for(s.AFetch(day=day, nextDay=nextDay, **kwargs.get(s.name, {})), self.timeout)
+                metrics.Count(s.name, "records", len(pile))
+                return pile
+            except asyncio.TimeoutError:
+                self._failed(s, f"timed out after {self.timeout:.0f}s", "timeouts")
+            except Exception as e:
+                self._failed(s, e)
+            return []
+
+        # gather keeps source order, so dedup is independent of completion order
+        gathered = asyncio.gather(*(run(s) for s in self.sources))
+        try:
+            while not gathered.done():
+                CheckAbort()        # a failed pipeline stage cancels the fetch
+                await asyncio.wait([gathered], timeout=ABORT_POLL)
+        except BaseException:
+            gathered.cancel()
+            await asyncio.gather(gathered, return_exceptions=True)
+            raise
+        return self._merge(gathered.result())
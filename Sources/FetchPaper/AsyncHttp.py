@@ -0,0 +1,43 @@
+import asyncio
+import contextvars
+from urllib.parse import urlsplit
+
+import requests
+
+from ..HttpClient import http
+
+class HostLimiter:
+    """Per-host concurrency caps shared by every coroutine on one event loop.
+
+    limits maps a hostname (e.g. "api.crossref.org") to the number of requests
+    allowed in flight at once; hosts not listed get `default`.
+    """
+    def __init__(self, limits:dict[str, int] | None = None, default:int = 4):
+        self.limits = {k.lower(): max(1, int(v)) for k, v in (limits or {}).items()}
+        self.default = max(1, int(default))
+        self._sems: dict[str, asyncio.Semaphore] = {}
+
+    def For(self, url:str) -> asyncio.Semaphore:
+        host = (urlsplit(url).hostname or "").lower()
+        sem = self._sems.get(host)
+        if sem is None:
+            sem = self._sems[host] = asyncio.Semaphore(self.limits.get(host, self.default))
+        return sem
+
+_limiter: contextvars.ContextVar[HostLimiter | None] = contextvars.ContextVar("host_limiter", default=None)
+
+def UseLimiter(limiter:HostLimiter) -> None:
+    """Install `limiter` for the current task and every task/thread spawned from it."""
+    _limiter.set(limiter)
+
+async def AGet(url:str, **kwargs) -> requests.Response:
+    """Shared-client GET in a worker thread, gated by the active HostLimiter (if any).
+
+    Not non-blocking I/O: every request still occupies a thread for its whole duration,
+    so it inherits http.Get's pooling, retries, pacing and response cache. What the
+    coroutine buys is the per-host cap and a source's pages in flight at once."""
+    limiter = _limiter.get()
+    if limiter is None:
+        return await asyncio.to_thread(http.Get, url, **kwargs)
+    async with limiter.For(url):
+        return await asyncio.to_thread(http.Get, url, **kwargs)
@@ -1,5 +1,5 @@
 import os
-import requests
+from ..HttpClient import http
 from .Source import Source
 
 class CORESource(Source):
@@ -14,6 +14,8 @@ class CORESource(Source):
     """
     name = "CORE"
 
+    BASE = "https://api.core.ac.uk/v3"
+
     DATE_FIELDS = ["publishedDate", "datePublished", "year", "date", "createdDate", "oai.datestamp"]
 
     def _norm_date(self, date_val: str) -> str:
@@ -49,8 +51,8 @@ class CORESource(Source):
         return ""
 
     def Fetch(self, *, day: str, nextDay: str, **kwargs) -> list[dict]:
-        base_v3 = kwargs.get("base_v3") or "https://api.core.ac.uk/v3"
-        base_v2 = kwargs.get("base_v2") or "https://api.core.ac.uk/v3"  # keep same path; some proxies alias
+        base_v3 = kwargs.get("base_v3") or self.BASE
+        base_v2 = kwargs.get("base_v2") or self.BASE  # keep same path; some proxies alias
         api_key = kwargs.get("api_key") or os.getenv("CORE_API_KEY", "kz7XPvtybwZDCpRj1mB8d9UEAxOMGL5c")
         query = kwargs.get("query", "") or "*"
         page_size = min(int(kwargs.get("page_size", 100)), 100)
@@ -66,7 +68,7 @@ class CORESource(Source):
         params = {"q": query, "limit": page_size, "offset": 0, "sort": "publishedDate:desc"}
         for _ in range(max_pages):
             try:
-                r = requests.get(f"{base_v3}/search/works", params=params, headers=headers, timeout=60)
+                r = http.Get(f"{base_v3}/search/works", params=params, headers=headers, timeout=60, ttl=self.CacheTtl(nextDay))
             except Exception:
                 break
             if r.status_code != 200:
@@ -87,6 +89,7 @@ class CORESource(Source):
                 venue = (doc.get("publisher") or doc.get("journal") or doc.get("venue") or "CORE").strip()
                 date = self._extract_date(doc)
                 if date and not (day <= date < nextDay):
+                    self._Dropped("date")
                     continue
 
                 ident = doi or doc.get("id") or (title[:40] if title else "")
@@ -1,9 +1,12 @@
-import requests
+from ..HttpClient import http
 from .Source import Source
 
 class CrossrefSource(Source):
     name = "Crossref"
 
+    BASE = "https://api.crossref.org/works"
+    WINDOWED = True
+
     def Fetch(self, *, day: str, nextDay: str, **kwargs) -> list[dict]:
         """Fetch Crossref works in [day, nextDay)."""
         rows = int(kwargs.get("rows", 200))
@@ -18,7 +21,7 @@ class CrossrefSource(Source):
         }
         out: list[dict] = []
         for _ in range(maxPages):
-            r = requests.get("https://api.crossref.org/works", params=params, timeout=60)
+            r = http.Get(self.BASE, params=params, timeout=60, ttl=self.CacheTtl(nextDay))
             r.raise_for_status()
             data = r.json()
             items = (data.get("message") or {}).get("items", [])
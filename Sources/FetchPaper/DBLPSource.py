@@ -1,4 +1,4 @@
-import requests
+from ..HttpClient import http
 from .Source import Source
 
 class DBLPSource(Source):
@@ -9,6 +9,8 @@ class DBLPSource(Source):
     """
     name = "DBLP"
 
+    BASE = "https://dblp.org/search/publ/api"
+
     def _normalize_date(self, y: str, m: str = "", d: str = "") -> str:
         if not y:
             return ""
@@ -24,7 +26,6 @@ class DBLPSource(Source):
         return f"{y}-{m}-{d}"
 
     def Fetch(self, *, day: str, nextDay: str, **kwargs) -> list[dict]:
-        base = "https://dblp.org/search/publ/api"
         query = kwargs.get("query", "") or ""
         h = int(kwargs.get("page_size", 200))
         f = 0
@@ -33,7 +34,7 @@ class DBLPSource(Source):
         out: list[dict] = []
         for _ in range(max_pages):
             params = {"q": query, "format": "json", "h": h, "f": f}
-            r = requests.get(base, params=params, timeout=60)
+            r = http.Get(self.BASE, params=params, timeout=60, ttl=self.CacheTtl(nextDay))
             if r.status_code != 200:
                 break
             js = r.json()
@@ -62,6 +63,7 @@ class DBLPSource(Source):
                     date = self._normalize_date(year)
 
                 if date and not (day <= date < nextDay):
+                    self._Dropped("date")
                     continue
 
                 out.append(self._norm({
@@ -1,4 +1,5 @@
-import requests
+from urllib.parse import quote
+from ..HttpClient import http
 from .Source import Source
 
 class DOAJSource(Source):
@@ -10,6 +11,8 @@ class DOAJSource(Source):
     """
     name = "DOAJ"
 
+    BASE = "https://doaj.org/api/v2/search/articles/"
+
     def _norm_date(self, date_val: str) -> str:
         if not date_val:
             return ""
@@ -38,7 +41,6 @@ class DOAJSource(Source):
         return ""
 
     def Fetch(self, *, day: str, nextDay: str, **kwargs) -> list[dict]:
-        base = "https://doaj.org/api/v2/search/articles/"
         query = kwargs.get("query", "") or ""
         page_size = int(kwargs.get("page_size", 100))
         max_pages = int(kwargs.get("max_pages", 10))
@@ -46,9 +48,9 @@ class DOAJSource(Source):
         out: list[dict] = []
         page = 1
         while page <= max_pages:
-            url = f"{base}{requests.utils.quote(query)}"
+            url = f"{self.BASE}{quote(query)}"
             params = {"pageSize": page_size, "page": page}
-            r = requests.get(url, params=params, timeout=60)
+            r = http.Get(url, params=params, timeout=60, ttl=self.CacheTtl(nextDay))
             if r.status_code != 200:
                 break
             js = r.json()
@@ -78,6 +80,7 @@ class DOAJSource(Source):
                 venue = j.get("title") or ""
                 date = self._extract_date(bib)
                 if date and not (day <= date < nextDay):
+                    self._Dropped("date")
                     continue
 
                 out.append(self._norm({
@@ -1,4 +1,4 @@
-import requests
+from ..HttpClient import http
 from .Source import Source
 
 class EuropePMCSource(Source):
@@ -9,8 +9,10 @@ class EuropePMCSource(Source):
     """
     name = "Europe PMC"
 
+    BASE = "https://www.ebi.ac.uk/europepmc/webservices/rest/search"
+    WINDOWED = True
+
     def Fetch(self, *, day: str, nextDay: str, **kwargs) -> list[dict]:
-        base = "https://www.ebi.ac.uk/europepmc/webservices/rest/search"
         page_size = int(kwargs.get("page_size", 100))
         max_pages = int(kwargs.get("max_pages", 10))
         query = kwargs.get("query", "") or ""
@@ -27,7 +29,7 @@ class EuropePMCSource(Source):
         }
         out: list[dict] = []
         for _ in range(max_pages):
-            r = requests.get(base, params=params, timeout=60)
+            r = http.Get(self.BASE, params=params, timeout=60, ttl=self.CacheTtl(nextDay))
             if r.status_code != 200:
                 break
             js = r.json()
@@ -55,6 +57,7 @@ class EuropePMCSource(Source):
                     "venue": venue,
                     "date": date[:10] if date else "",
                     "source": self.name,
+                    "ids": {"pmid": it.get("pmid"), "pmcid": it.get("pmcid")},
                 }))
             next_cursor = js.get("nextCursorMark")
             if not next_cursor or next_cursor == params["cursorMark"]:
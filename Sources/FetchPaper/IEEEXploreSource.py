@@ -1,5 +1,5 @@
 import os
-import requests
+from ..HttpClient import http
 from .Source import Source
 
 class IEEEXploreSource(Source):
@@ -11,6 +11,8 @@ class IEEEXploreSource(Source):
     """
     name = "IEEE Xplore"
 
+    BASE = "https://ieeexploreapi.ieee.org/api/v1/search/articles"
+
     def _in_range(self, date: str, day: str, nextDay: str) -> bool:
         if not date:
             return False
@@ -31,7 +33,6 @@ class IEEEXploreSource(Source):
             # No key, skip gracefully
             return []
 
-        base = "https://ieeexploreapi.ieee.org/api/v1/search/articles"
         max_records = int(kwargs.get("max_records", 200))
         page_size = min(int(kwargs.get("page_size", 100)), 200)  # API allows up to 200
         querytext = kwargs.get("querytext", "")  # optional filter
@@ -51,7 +52,7 @@ class IEEEXploreSource(Source):
         out: list[dict] = []
         fetched = 0
         while fetched < max_records:
-            r = requests.get(base, params=params, timeout=60)
+            r = http.Get(self.BASE, params=params, timeout=60, ttl=self.CacheTtl(nextDay))
             # If unauthorized or rate limited, stop silently
             if r.status_code != 200:
                 break
@@ -67,6 +68,7 @@ class IEEEXploreSource(Source):
                 venue = (a.get("publication_title") or a.get("publisher") or "IEEE").strip()
                 date = (a.get("publication_date") or str(a.get("publication_year") or "")).strip()
                 if not self._in_range(date, day, nextDay):
+                    self._Dropped("date")
                     continue
 
                 art_id = a.get("article_number") or doi or title[:40]
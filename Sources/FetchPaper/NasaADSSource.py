@@ -1,5 +1,5 @@
 import os
-import requests
+from ..HttpClient import http
 from .Source import Source
 
 class NASAADSSource(Source):
@@ -13,6 +13,9 @@ class NASAADSSource(Source):
 
     name = "NASA ADS"
 
+    BASE = "https://api.adsabs.harvard.edu/v1/search/query"
+    WINDOWED = True
+
     FIELDS = [
         "id", "title", "abstract", "doi", "pubdate", "year", "pub", "page", "esources",
         "identifier", "url"
@@ -40,7 +43,6 @@ class NASAADSSource(Source):
             # No token, skip gracefully
             return []
 
-        base = "https://api.adsabs.harvard.edu/v1/search/query"
         page_size = min(int(kwargs.get("page_size", 100)), 200)
         max_pages = int(kwargs.get("max_pages", 10))
         query = kwargs.get("query", "") or "*"
@@ -54,7 +56,7 @@ class NASAADSSource(Source):
         # Inclusive range: pubdate:[day TO nextDay}
         # ADS usually stores pubdate as YYYY-MM; still works for windowing.
         q = query
-        fq = f"pubdate:[{day} TO {nextDay}}]"
+        fq = f"pubdate:[{day} TO {nextDay}}}"
 
         params = {
             "q": q,
@@ -67,7 +69,7 @@ class NASAADSSource(Source):
 
         out: list[dict] = []
         for _ in range(max_pages):
-            r = requests.get(base, params=params, headers=headers, timeout=60)
+            r = http.Get(self.BASE, params=params, headers=headers, timeout=60, ttl=self.CacheTtl(nextDay))
             if r.status_code != 200:
                 break
             js = r.json()
@@ -99,6 +101,7 @@ class NASAADSSource(Source):
 
                 # final guard for date
                 if date and not (day <= date < nextDay):
+                    self._Dropped("date")
                     continue
 
                 out.append(self._norm({
@@ -0,0 +1,123 @@
+import re
+import unicodedata
+
+import numpy as np
+
+from .RecordMerge import Fuse
+
+SHINGLE_WORDS = 3           # word n-gram size
+MIN_SHINGLES  = 3           # shorter texts ("Editorial", "Preface") are never clustered
+MAX_ANCHORS   = 8           # distinct clusters compared per LSH bucket
+BLOCK_ROWS    = 1 << 15     # shingles hashed per numpy block (bounds the numPerm-wide temporaries)
+_SHIFT = np.uint64(32)
+_MIX   = np.array([0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9], dtype = np.uint64)
+_TAGS  = re.compile(r"<[^>]+>|\$[^$]*\$")
+_WORDS = re.compile(r"\w+")
+
+class NearDuplicates:
+    """MinHash/LSH clustering of records whose title+abstract are nearly the same text.
+
+    Each record's normalized text is cut into word 3-gram shingles and summarized by
+    a `numPerm`-value MinHash signature. Signatures are split into `bands` bands of
+    `rows` values, and records sharing any band bucket become candidates. A candidate
+    pair is only merged if the signatures agree on at least `threshold` of their
+    values (the estimated Jaccard similarity of the shingle sets). Each bucket keeps
+    at most MAX_ANCHORS cluster representatives, so the number of pair checks grows
+    linearly with the number of records.
+    """
+    def __init__(self, threshold:float = 0.8, numPerm:int = 128, seed:int = 1):
+        self.threshold = float(threshold)
+        self.numPerm = max(8, int(numPerm))
+        self.bands, self.rows = _BandLayout(self.threshold, self.numPerm)
+        rng = np.random.default_rng(seed)
+        # multiply-shift hashing: h(x) = ((a*x + b) mod 2**64) >> 32, with a odd
+        self._a = rng.integers(0, 1 << 63, size = self.numPerm, dtype = np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.integers(0, 1 << 63, size = self.numPerm, dtype = np.uint64)
+
+    def Signatures(self, texts:list[str]) -> tuple[np.ndarray, np.ndarray]:
+        """(signatures [n, numPerm] uint32, valid [n] bool); texts with fewer than
+        MIN_SHINGLES shingles are not valid and must not be compared."""
+        vocabulary: dict[str, int] = {}
+        ids = [np.array([vocabulary.setdefault(w, len(vocabulary)) for w in Words(t)], dtype = np.uint64) for t in texts]
+        counts = np.array([max(0, len(x) - SHINGLE_WORDS + 1) for x in ids], dtype = np.int64)
+        valid = counts >= MIN_SHINGLES
+        signatures = np.zeros((len(texts), self.numPerm), dtype = np.uint32)
+
+        rows = np.flatnonzero(valid)
+        start = 0
+        while start < rows.size:
+            stop = start + 1
+            total = counts[rows[start]]
+            while stop < rows.size and total + counts[rows[stop]] <= BLOCK_ROWS:
+                total += counts[rows[stop]]
+                stop += 1
+            block = rows[start:stop]
+            shingles = np.concatenate([_ShingleKeys(ids[i]) for i in block])
+            hashed = np.multiply(self._a[:, None], shingles[None, :])
+            hashed += self._b[:, None]
+            hashed >>= _SHIFT
+            offsets = np.concatenate([[0], np.cumsum(counts[block])[:-1]])
+            signatures[block] = np.minimum.reduceat(hashed, offsets, axis = 1).T
+            start = stop
+        return signatures, valid
+
+    def Clusters(self, texts:list[str]) -> list[int]:
+        """For every text, the index of the first text in its near-duplicate cluster."""
+        signatures, valid = self.Signatures(texts)
+        parent = list(range(len(texts)))
+        def find(i:int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        minAgree = self.threshold * self.numPerm
+        buckets: dict[tuple[int, bytes], list[int]] = {}
+        for i in np.flatnonzero(valid).tolist():
+            sig = signatures[i]
+            for band in range(self.bands):
+                anchors = buckets.setdefault((band, sig[band * self.rows : (band + 1) * self.rows].tobytes()), [])
+                joined = False
+                for j in anchors:
+                    ri, rj = find(i), find(j)
+                    if ri == rj or np.count_nonzero(sig == signatures[j]) >= minAgree:
+                        parent[max(ri, rj)] = min(ri, rj)      # the earliest record stays the root
+                        joined = True
+                        break
+                if not joined and len(anchors) < MAX_ANCHORS:
+                    anchors.append(i)
+        return [find(i) for i in range(len(texts))]
+
+    def Filter(self, records:list[dict]) -> list[dict]:
+        """One record per near-duplicate cluster, fused with RecordMerge.Fuse and placed
+        where the cluster's first record was (input order kept otherwise)."""
+        roots = self.Clusters([f'{r.get("title", "") or ""} {r.get("abstract", "") or ""}' for r in records])
+        clusters: dict[int, list[dict]] = {}
+        for i, r in enumerate(records):
+            clusters.setdefault(roots[i], []).append(r)
+        return [group[0] if len(group) == 1 else Fuse(group) for group in clusters.values()]
+
+def Words(text:str) -> list[str]:
+    """Lowercased words of the text, with markup and inline TeX stripped and accents folded."""
+    text = _TAGS.sub(" ", text or "").casefold()
+    if not text.isascii():
+        text = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+    return _WORDS.findall(text)
+
+def _ShingleKeys(ids:np.ndarray) -> np.ndarray:
+    """One 32-bit key per word n-gram of a word-id sequence."""
+    grams = np.lib.stride_tricks.sliding_window_view(ids, SHINGLE_WORDS)
+    return (grams * _MIX[:SHINGLE_WORDS]).sum(axis = 1) >> _SHIFT
+
+def _BandLayout(threshold:float, numPerm:int) -> tuple[int, int]:
+    """(bands, rows) with bands*rows <= numPerm minimizing the false-positive plus
+    false-negative area of the LSH S-curve 1-(1-s^rows)^bands around `threshold`."""
+    best, bestError = (numPerm, 1), float("inf")
+    low, high = np.linspace(0.0, threshold, 64), np.linspace(threshold, 1.0, 64)
+    for rows in range(1, numPerm + 1):
+        bands = numPerm // rows
+        falsePositive = (1 - (1 - low ** rows) ** bands).mean() * threshold
+        falseNegative = ((1 - high ** rows) ** bands).mean() * (1 - threshold)
+        if falsePositive + falseNegative < bestError:
+            best, bestError = (bands, rows), falsePositive + falseNegative
+    return best
@@ -1,4 +1,6 @@
-import requests
+import asyncio
+from ..HttpClient import http
+from .AsyncHttp import AGet
 from .Source import Source
 
 class OpenAIRESouce(Source):
@@ -9,12 +11,85 @@ class OpenAIRESouce(Source):
     """
     name = "OpenAIRE"
 
-    def Fetch(self, *, day: str, nextDay: str, **kwargs) -> list[dict]:
-        base = "https://api.openaire.eu/search/publications"
-        page_size = int(kwargs.get("page_size", 100))
-        maxPages = int(kwargs.get("maxPages", 10))
-        query = kwargs.get("query", "")  # free-text query
+    BASE = "https://api.openaire.eu/search/publications"
+    WINDOWED = True
+
+    def _parse_results(self, results: list) -> list[dict]:
+        out: list[dict] = []
+        for item in results:
+            # Structure: item['metadata']['oaf:entity']['oaf:result']
+            md = (item.get("metadata") or {}).get("oaf:entity") or {}
+            res = md.get("oaf:result") or {}
+            title = ""
+            t = res.get("title") or {}
+            if isinstance(t, dict):
+                title = (t.get("$") or "").strip()
+            elif isinstance(t, str):
+                title = t.strip()
+
+            abstract = ""
+            desc = res.get("description") or {}
+            if isinstance(desc, dict):
+                abstract = (desc.get("$") or "").strip()
+            elif isinstance(desc, str):
+                abstract = desc.strip()
+
+            doi = ""
+            pid = res.get("pid") or []
+            if isinstance(pid, dict):
+                pid = [pid]
+            if isinstance(pid, list):
+                for p in pid:
+                    if (p.get("@type") or "").lower() == "doi":
+                        doi = (p.get("$") or "").strip()
+                        break
+
+            url = ""
+            bestid = res.get("bestaccessright") or {}
+            # try originalId as link
+            original_ids = res.get("originalId") or []
+            if isinstance(original_ids, dict):
+                original_ids = [original_ids]
+            if isinstance(original_ids, list) and original_ids:
+                # choose the first URL-looking id
+                for oid in original_ids:
+                    val = (oid.get("$") or "")
+                    if isinstance(val, str) and val.startswith("http"):
+                        url = val
+                        break
+            if not url and doi:
+                url = f"https://doi.org/{doi}"
+
+            venue = ""
+            pj = res.get("publisher") or res.get("journal") or ""
+            if isinstance(pj, dict):
+                venue = pj.get("$") or ""
+            elif isinstance(pj, str):
+                venue = pj
 
+            date = ""
+            for key in ("dateofacceptance", "publicationdate", "collectedfromdate"):
+                d = res.get(key) or {}
+                if isinstance(d, dict) and d.get("$"):
+                    date = d["$"][:10]
+                    break
+                if isinstance(d, str) and d:
+                    date = d[:10]
+                    break
+
+            out.append(self._norm({
+                "id": doi or (title[:40] if title else ""),
+                "title": title or "",
+                "abstract": abstract or "",
+                "doi": doi,
+                "url": url or "",
+                "venue": (venue or "OpenAIRE").strip(),
+                "date": date,
+                "source": self.name,
+            }))
+        return out
+
+    def _params(self, day: str, nextDay: str, page_size: int, query: str) -> dict:
         params = {
             "format": "json",
             "fromDate": day,
@@ -24,88 +99,59 @@ class OpenAIRESouce(Source):
         }
         if query:
             params["title"] = query  # OpenAIRE supports fielded params; keep minimal
+        return params
+
+    def _results_of(self, js: dict) -> list:
+        return ((js.get("response") or {}).get("results") or {}).get("result") or []
 
+    def Fetch(self, *, day: str, nextDay: str, **kwargs) -> list[dict]:
+        page_size = int(kwargs.get("page_size", 100))
+        maxPages = int(kwargs.get("maxPages", 10))
+        query = kwargs.get("query", "")  # free-text query
+
+        params = self._params(day, nextDay, page_size, query)
         out: list[dict] = []
         for _ in range(maxPages):
-            r = requests.get(base, params=params, timeout=60)
+            r = http.Get(self.BASE, params=params, timeout=60, ttl=self.CacheTtl(nextDay))
             if r.status_code != 200:
                 break
-            js = r.json()
-            results = ((js.get("response") or {}).get("results") or {}).get("result") or []
+            results = self._results_of(r.json())
             if not results:
                 break
-            for item in results:
-                # Structure: item['metadata']['oaf:entity']['oaf:result']
-                md = (item.get("metadata") or {}).get("oaf:entity") or {}
-                res = md.get("oaf:result") or {}
-                title = ""
-                t = res.get("title") or {}
-                if isinstance(t, dict):
-                    title = (t.get("$") or "").strip()
-                elif isinstance(t, str):
-                    title = t.strip()
-
-                abstract = ""
-                desc = res.get("description") or {}
-                if isinstance(desc, dict):
-                    abstract = (desc.get("$") or "").strip()
-                elif isinstance(desc, str):
-                    abstract = desc.strip()
-
-                doi = ""
-                pid = res.get("pid") or []
-                if isinstance(pid, dict):
-                    pid = [pid]
-                if isinstance(pid, list):
-                    for p in pid:
-                        if (p.get("@type") or "").lower() == "doi":
-                            doi = (p.get("$") or "").strip()
-                            break
-
-                url = ""
-                bestid = res.get("bestaccessright") or {}
-                # try originalId as link
-                original_ids = res.get("originalId") or []
-                if isinstance(original_ids, dict):
-                    original_ids = [original_ids]
-                if isinstance(original_ids, list) and original_ids:
-                    # choose the first URL-looking id
-                    for oid in original_ids:
-                        val = (oid.get("$") or "")
-                        if isinstance(val, str) and val.startswith("http"):
-                            url = val
-                            break
-                if not url and doi:
-                    url = f"https://doi.org/{doi}"
-
-                venue = ""
-                pj = res.get("publisher") or res.get("journal") or ""
-                if isinstance(pj, dict):
-                    venue = pj.get("$") or ""
-                elif isinstance(pj, str):
-                    venue = pj
-
-                date = ""
-                for key in ("dateofacceptance", "publicationdate", "collectedfromdate"):
-                    d = res.get(key) or {}
-                    if isinstance(d, dict) and d.get("$"):
-                        date = d["$"][:10]
-                        break
-                    if isinstance(d, str) and d:
-                        date = d[:10]
-                        break
-
-                out.append(self._norm({
-                    "id": doi or (title[:40] if title else ""),
-                    "title": title or "",
-                    "abstract": abstract or "",
-                    "doi": doi,
-                    "url": url or "",
-                    "venue": (venue or "OpenAIRE").strip(),
-                    "date": date,
-                    "source": self.name,
-                }))
+            out.extend(self._parse_results(results))
 
             params["page"] = int(params["page"]) + 1
 
         return out
+
+    async def AFetch(self, *, day: str, nextDay: str, **kwargs) -> list[dict]:
+        """Concurrent variant of Fetch: page 1 reports the hit total, then the
+        remaining page numbers are requested together.
+        """
+        page_size = int(kwargs.get("page_size", 100))
+        maxPages = int(kwargs.get("maxPages", 10))
+        query = kwargs.get("query", "")
+
+        params = self._params(day, nextDay, page_size, query)
+        r = await AGet(self.BASE, params=params, timeout=60, ttl=self.CacheTtl(nextDay))
+        if r.status_code != 200:
+            return []
+        js = r.json()
+        out = self._parse_results(self._results_of(js))
+        if not out:
+            return out
+        total_raw = (((js.get("response") or {}).get("header") or {}).get("total") or {})
+        total_raw = total_raw.get("$") if isinstance(total_raw, dict) else total_raw
+        try:
+            pages = min(maxPages, -(-int(total_raw) // page_size))
+        except (TypeError, ValueError):
+            pages = maxPages
+
+        async def page(n: int) -> list[dict]:
+            r = await AGet(self.BASE, params={**params, "page": n}, timeout=60, ttl=self.CacheTtl(nextDay))
+            if r.status_code != 200:
+                return []
+            return self._parse_results(self._results_of(r.json()))
+        for part in await asyncio.gather(*(page(n) for n in range(2, pages + 1))):
+            out.extend(part)
+        return out
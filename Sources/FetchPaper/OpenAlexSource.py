@@ -1,9 +1,12 @@
-import requests
+from ..HttpClient import http
 from .Source import Source
 
 class OpenAlexSource(Source):
     name = "OpenAlex"
 
+    BASE = "https://api.openalex.org/works"
+    WINDOWED = True
+
     def Fetch(self, *, day:str, nextDay:str, **kwargs) -> list[dict]:
         perPage = kwargs.get("perPage", 200)
         maxPages = kwargs.get("maxPages", 6)
@@ -16,7 +19,7 @@ class OpenAlexSource(Source):
 
         items = []
         for _ in range(maxPages):
-            r = requests.get("https://api.openalex.org/works", params = params, timeout = 60)
+            r = http.Get(self.BASE, params = params, timeout = 60, ttl = self.CacheTtl(nextDay))
             r.raise_for_status()
             
             data=r.json()
@@ -46,5 +49,6 @@ class OpenAlexSource(Source):
                 "venue": (it.get("host_venue",{}) or {}).get("display_name",""),
                 "date": it.get("publication_date",""),
                 "source": self.name,
+                "ids": {"pmid": ((it.get("ids") or {}).get("pmid") or "").rstrip("/").rsplit("/", 1)[-1]},
             }))
         return out
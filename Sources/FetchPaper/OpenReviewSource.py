@@ -1,6 +1,6 @@
 import time
-import requests
 from datetime import datetime, timezone
+from ..HttpClient import http
 from .Source import Source
 
 def _to_epoch_ms(date_str: str) -> int:
@@ -89,7 +89,7 @@ class OpenReviewSource(Source):
                 params["details"] = details
             collected: list[dict] = []
             for _ in range(max_pages):
-                r = requests.get(base, params=params, timeout=60)
+                r = http.Get(base, params=params, timeout=60, ttl=self.CacheTtl(nextDay))
                 if r.status_code != 200:
                     return False, []
                 js = r.json()
@@ -98,6 +98,7 @@ class OpenReviewSource(Source):
                     break
                 for n in notes:
                     if not self._in_range(n.get("cdate") or 0, day, nextDay):
+                        self._Dropped("date")
                         continue
                     if invitations:
                         inv = (n.get("invitation") or "")
@@ -119,7 +120,7 @@ class OpenReviewSource(Source):
                 params["details"] = details
             collected: list[dict] = []
             for _ in range(max_pages):
-                r = requests.get(base, params=params, timeout=60)
+                r = http.Get(base, params=params, timeout=60, ttl=self.CacheTtl(nextDay))
                 if r.status_code != 200:
                     return False, []
                 js = r.json()
@@ -129,6 +130,7 @@ class OpenReviewSource(Source):
                 for n in notes:
                     # Client-side filter by time and invitation
                     if not self._in_range(n.get("cdate") or 0, day, nextDay):
+                        self._Dropped("date")
                         continue
                     if invitations:
                         inv = (n.get("invitation") or "")
@@ -1,21 +1,19 @@
-import requests
+import asyncio
+from ..HttpClient import http
+from .AsyncHttp import AGet
 from .Source import Source
 
 class PubMedSource(Source):
     name = "PubMed"
 
-    def Fetch(self, *, day: str, nextDay: str, **kwargs) -> list[dict]:
-        """Fetch PubMed records with publication date in [day, nextDay).
+    BASE = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
+    WINDOWED = True
+    HEADERS = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; rv:91.0) Gecko/20100101 Firefox/91.0'
+    }
 
-        Uses NCBI E-utilities (JSON): esearch (to get IDs) -> esummary (to get metadata).
-        Docs: https://www.ncbi.nlm.nih.gov/books/NBK25499/
-        """
-        retmax = int(kwargs.get("retmax", 200))
-        maxPages = int(kwargs.get("maxPages", 10))
-        term = kwargs.get("term", "")  # optional term filter
-
-        base = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
-        esearch_params = {
+    def _esearch_params(self, day: str, nextDay: str, retmax: int, term: str) -> dict:
+        params = {
             "db": "pubmed",
             "retmode": "json",
             "sort": "pub+date",
@@ -26,11 +24,66 @@ class PubMedSource(Source):
             "retstart": 0,
         }
         if term:
-            esearch_params["term"] = term
+            params["term"] = term
+        return params
+
+    def _summary_params(self, chunk: list[str]) -> dict:
+        return {
+            "db": "pubmed",
+            "retmode": "json",
+            "id": ",".join(chunk),
+        }
+
+    def _parse_summary(self, js: dict) -> list[dict]:
+        out: list[dict] = []
+        result = js.get("result", {})
+        uids = result.get("uids", [])
+        for uid in uids:
+            rec = result.get(uid, {})
+            title = (rec.get("title") or "").strip()
+            # Prefer ArticleIds for DOI
+            doi = ""
+            for aid in rec.get("articleids", []):
+                if (aid.get("idtype") or "").lower() == "doi":
+                    doi = aid.get("value") or ""
+                    break
+            # URL: PubMed page
+            url = f"https://pubmed.ncbi.nlm.nih.gov/{uid}/"
+            # Venue / journal
+            venue = (rec.get("fulljournalname") or rec.get("source") or "").strip()
+            # Date
+            date = (rec.get("pubdate") or "").strip()
+            # Abstract is not in esummary; attempt short 'elocationid' or empty; users can follow URL
+            abstract = rec.get("elocationid") or ""
+
+            out.append(self._norm({
+                "id": uid,
+                "title": title,
+                "abstract": abstract,
+                "doi": doi,
+                "url": url,
+                "venue": venue,
+                "date": date,
+                "source": self.name,
+                "ids": {"pmid": uid},
+            }))
+        return out
+
+    def Fetch(self, *, day: str, nextDay: str, **kwargs) -> list[dict]:
+        """Fetch PubMed records with publication date in [day, nextDay).
+
+        Uses NCBI E-utilities (JSON): esearch (to get IDs) -> esummary (to get metadata).
+        Docs: https://www.ncbi.nlm.nih.gov/books/NBK25499/
+        """
+        retmax = int(kwargs.get("retmax", 200))
+        maxPages = int(kwargs.get("maxPages", 10))
+        term = kwargs.get("term", "")  # optional term filter
+
+        esearch_params = self._esearch_params(day, nextDay, retmax, term)
 
         all_ids: list[str] = []
         for _ in range(maxPages):
-            r = requests.get(f"{base}/esearch.fcgi", params=esearch_params, timeout=60)
+            r = http.Get(f"{self.BASE}/esearch.fcgi", params=esearch_params, timeout=60, ttl=self.CacheTtl(nextDay))
             r.raise_for_status()
             js = r.json()
             ids = (js.get("esearchresult", {}) or {}).get("idlist", [])
@@ -51,46 +104,41 @@ class PubMedSource(Source):
         # Batch through esummary (up to ~500 IDs per call is OK)
         for i in range(0, len(all_ids), 50):
             chunk = all_ids[i : i + 50]
-            summary_params = {
-                "db": "pubmed",
-                "retmode": "json",
-                "id": ",".join(chunk),
-            }
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; rv:91.0) Gecko/20100101 Firefox/91.0'
-            }
-            r = requests.get(f"{base}/esummary.fcgi", params=summary_params, headers=headers, timeout=60)
+            r = http.Get(f"{self.BASE}/esummary.fcgi", params=self._summary_params(chunk), headers=self.HEADERS, timeout=60, ttl=self.CacheTtl(nextDay))
             r.raise_for_status()
-            js = r.json()
-            result = js.get("result", {})
-            uids = result.get("uids", [])
-            for uid in uids:
-                rec = result.get(uid, {})
-                title = (rec.get("title") or "").strip()
-                # Prefer ArticleIds for DOI
-                doi = ""
-                for aid in rec.get("articleids", []):
-                    if (aid.get("idtype") or "").lower() == "doi":
-                        doi = aid.get("value") or ""
-                        break
-                # URL: PubMed page
-                url = f"https://pubmed.ncbi.nlm.nih.gov/{uid}/"
-                # Venue / journal
-                venue = (rec.get("fulljournalname") or rec.get("source") or "").strip()
-                # Date
-                date = (rec.get("pubdate") or "").strip()
-                # Abstract is not in esummary; attempt short 'elocationid' or empty; users can follow URL
-                abstract = rec.get("elocationid") or ""
-
-                out.append(self._norm({
-                    "id": uid,
-                    "title": title,
-                    "abstract": abstract,
-                    "doi": doi,
-                    "url": url,
-                    "venue": venue,
-                    "date": date,
-                    "source": self.name,
-                }))
+            out.extend(self._parse_summary(r.json()))
+
+        return out
 
+    async def AFetch(self, *, day: str, nextDay: str, **kwargs) -> list[dict]:
+        """Concurrent variant of Fetch: once the first esearch page reports the hit
+        count, the remaining esearch pages and every esummary batch are issued at once.
+        """
+        retmax = int(kwargs.get("retmax", 200))
+        maxPages = int(kwargs.get("maxPages", 10))
+        term = kwargs.get("term", "")
+
+        params = self._esearch_params(day, nextDay, retmax, term)
+        r = await AGet(f"{self.BASE}/esearch.fcgi", params=params, timeout=60, ttl=self.CacheTtl(nextDay))
+        r.raise_for_status()
+        res = r.json().get("esearchresult", {}) or {}
+        all_ids: list[str] = list(res.get("idlist", []))
+        if not all_ids:
+            return []
+        total = min(int(res.get("count", "0")), retmax * maxPages)
+
+        async def page(start: int) -> list[str]:
+            r = await AGet(f"{self.BASE}/esearch.fcgi", params={**params, "retstart": start}, timeout=60, ttl=self.CacheTtl(nextDay))
+            r.raise_for_status()
+            return (r.json().get("esearchresult", {}) or {}).get("idlist", [])
+        for ids in await asyncio.gather(*(page(st) for st in range(retmax, total, retmax))):
+            all_ids.extend(ids)
+
+        async def summary(chunk: list[str]) -> list[dict]:
+            r = await AGet(f"{self.BASE}/esummary.fcgi", params=self._summary_params(chunk), headers=self.HEADERS, timeout=60, ttl=self.CacheTtl(nextDay))
+            r.raise_for_status()
+            return self._parse_summary(r.json())
+        out: list[dict] = []
+        for part in await asyncio.gather(*(summary(all_ids[i : i + 50]) for i in range(0, len(all_ids), 50))):
+            out.extend(part)
         return out
@@ -0,0 +1,137 @@
+import re
+from urllib.parse import unquote
+
+# Default source priority for fused fields: publisher/indexer metadata first, preprints last.
+SOURCE_PRIORITY = (
+    "Crossref", "PubMed", "Europe PMC", "OpenAlex", "Semantic Scholar", "DBLP", "IEEE Xplore",
+    "NASA ADS", "DOAJ", "CORE", "OpenAIRE", "OpenReview", "arXiv",
+)
+# Per-field overrides; fields not listed use SOURCE_PRIORITY. "abstract" (longest wins) and
+# "date" (most precise wins, then priority) have their own rules in Fuse.
+FIELD_PRIORITY = {
+    "url": ("arXiv", "Europe PMC", "PubMed", "OpenReview") + SOURCE_PRIORITY,
+}
+
+_DOI_PREFIX = re.compile(r"^(?:https?://(?:dx\.)?doi\.org/|doi:\s*)", re.I)
+_ARXIV_DOI  = re.compile(r"^10\.48550/arxiv\.(.+)$", re.I)
+_ARXIV      = re.compile(r"(?:arxiv\.org/(?:abs|pdf)/|^arxiv:\s*|^)((?:\d{4}\.\d{4,5})|(?:[a-z\-]+(?:\.[a-z]{2})?/\d{7}))(?:v\d+)?(?:\.pdf)?$", re.I)
+_PUBMED     = re.compile(r"pubmed\.ncbi\.nlm\.nih\.gov/(\d+)")
+_OPENALEX   = re.compile(r"^(?:https?://(?:api\.)?openalex\.org/(?:works/)?)?(W\d+)$", re.I)
+_ISO_DATE   = re.compile(r"^\d{4}(?:-\d{2}(?:-\d{2})?)?$")
+
+def NormalizeDoi(doi:str) -> str:
+    """"https://doi.org/10.1000/ABC" / "doi:10.1000/abc" -> "10.1000/abc" ("" if it is not a DOI)."""
+    doi = _DOI_PREFIX.sub("", unquote((doi or "").strip())).strip().lower()
+    return doi if doi.startswith("10.") and "/" in doi else ""
+
+def NormalizeArxiv(text:str) -> str:
+    """arXiv abs/pdf URL, "arXiv:2501.01234v2" or a bare ID -> "2501.01234" ("" if none)."""
+    m = _ARXIV.search((text or "").strip())
+    return m.group(1).lower() if m else ""
+
+def NormalizeOpenAlex(text:str) -> str:
+    """"https://openalex.org/W123" / "W123" -> "W123" ("" if none)."""
+    m = _OPENALEX.match((text or "").strip())
+    return m.group(1).upper() if m else ""
+
+def RecordKeys(record:dict) -> list[str]:
+    """Canonical identifier keys of a record ("doi:…", "arxiv:…", "pmid:…", "openalex:…").
+
+    Source-specific IDs that are none of those are namespaced by source, and a record
+    with no identifier at all falls back to its title prefix plus date.
+    """
+    keys = []
+    source = record.get("source", "")
+    ids = record.get("ids") or {}
+    doi = NormalizeDoi(record.get("doi", ""))
+    if doi:
+        keys.append("doi:" + doi)
+        m = _ARXIV_DOI.match(doi)
+        if m:
+            keys.append("arxiv:" + (NormalizeArxiv(m.group(1)) or m.group(1)))
+    # a bare "2501.01234" is only read as an arXiv ID where arXiv is known to be meant
+    arxivTexts = [ids.get("arxiv", "")] + [t for t in (record.get("id", ""), record.get("url", "")) if source == "arXiv" or "arxiv" in (t or "").lower()]
+    for text in arxivTexts:
+        arxiv = NormalizeArxiv(text)
+        if arxiv:
+            keys.append("arxiv:" + arxiv)
+    pmid = str(ids.get("pmid") or "").strip()
+    if not pmid:
+        m = _PUBMED.search(record.get("url", ""))
+        pmid = m.group(1) if m else ""
+    if pmid.isdigit():
+        keys.append("pmid:" + pmid.lstrip("0"))
+    openalex = NormalizeOpenAlex(ids.get("openalex", "") or record.get("id", ""))
+    if openalex:
+        keys.append("openalex:" + openalex)
+
+    ident = str(record.get("id", "") or "").strip()
+    title = record.get("title", "") or ""
+    if ident and not keys and ident != title[:40] and not NormalizeDoi(ident):
+        keys.append(f"id:{source}:{ident}")
+    if not keys:
+        keys.append("t:" + title[:120].lower() + "|d:" + record.get("date", ""))
+    return list(dict.fromkeys(keys))
+
+class MergeIndex:
+    """Union-find over records that share any canonical identifier key.
+
+    Add() every record once (one dict probe per key), then Merged() returns one fused
+    record per group, in the order each group was first seen.
+    """
+    def __init__(self):
+        self.records: list[dict] = []
+        self._parent: list[int] = []
+        self._owner: dict[str, int] = {}
+
+    def _Find(self, i:int) -> int:
+        while self._parent[i] != i:
+            self._parent[i] = self._parent[self._parent[i]]
+            i = self._parent[i]
+        return i
+
+    def Add(self, record:dict) -> None:
+        i = len(self.records)
+        self.records.append(record)
+        self._parent.append(i)
+        for key in RecordKeys(record):
+            j = self._owner.setdefault(key, i)
+            if j != i:
+                ri, rj = self._Find(i), self._Find(j)
+                if ri != rj:
+                    self._parent[max(ri, rj)] = min(ri, rj)
+
+    def Groups(self) -> list[list[dict]]:
+        groups: dict[int, list[dict]] = {}
+        for i, record in enumerate(self.records):
+            groups.setdefault(self._Find(i), []).append(record)
+        return list(groups.values())
+
+    def Merged(self) -> list[dict]:
+        return [Fuse(group) for group in self.Groups()]
+
+def Fuse(group:list[dict]) -> dict:
+    """One record from copies of the same paper: the longest abstract, the most precise
+    ISO date, and every other field from the highest-priority source that has it.
+    Records that are already fused keep their "sources" in the union."""
+    sources = list(dict.fromkeys(s for r in group for s in (r.get("sources") or [r.get("source", "")])))
+    if len(group) == 1:
+        return {**group[0], "doi": NormalizeDoi(group[0].get("doi", "")), "sources": sources}
+    def ranked(field:str) -> list[dict]:
+        order = FIELD_PRIORITY.get(field, SOURCE_PRIORITY)
+        return sorted(group, key = lambda r: order.index(r.get("source")) if r.get("source") in order else len(order))
+
+    fused = {**ranked("id")[0]}
+    for field in ("title", "url", "venue", "id"):
+        fused[field] = next((r[field] for r in ranked(field) if r.get(field)), fused.get(field, ""))
+    fused["doi"] = next((NormalizeDoi(r["doi"]) for r in ranked("doi") if NormalizeDoi(r.get("doi", ""))), "")
+    fused["abstract"] = max((r.get("abstract", "") or "" for r in group), key = len)
+    fused["date"] = max(ranked("date"), key = lambda r: _DatePrecision(r.get("date", ""))).get("date", "")
+    fused["ids"] = {k: v for r in reversed(ranked("ids")) for k, v in (r.get("ids") or {}).items() if v}
+    fused["sources"] = sources
+    return fused
+
+def _DatePrecision(date:str) -> int:
+    """3 for YYYY-MM-DD, 2 for YYYY-MM, 1 for YYYY, 0 for anything else."""
+    date = (date or "").strip()
+    return (date.count("-") + 1) if _ISO_DATE.match(date) else 0
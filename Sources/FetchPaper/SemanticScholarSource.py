@@ -1,5 +1,5 @@
 import os
-import requests
+from ..HttpClient import http
 from .Source import Source
 
 class SemanticScholarSource(Source):
@@ -11,6 +11,8 @@ class SemanticScholarSource(Source):
     """
     name = "Semantic Scholar"
 
+    BASE = "https://api.semanticscholar.org/graph/v1/paper/search"
+
     FIELDS = "title,abstract,venue,publicationDate,year,externalIds,url"
 
     def _in_range(self, date: str, day: str, nextDay: str) -> bool:
@@ -35,7 +37,6 @@ class SemanticScholarSource(Source):
         if api_key:
             headers["x-api-key"] = api_key
 
-        base = "https://api.semanticscholar.org/graph/v1/paper/search"
         page_size = min(int(kwargs.get("page_size", 100)), 100)
         max_pages = int(kwargs.get("max_pages", 10))
         query = kwargs.get("query", "") or ""
@@ -55,7 +56,7 @@ class SemanticScholarSource(Source):
 
         out: list[dict] = []
         for _ in range(max_pages):
-            r = requests.get(base, params=params, headers=headers, timeout=60)
+            r = http.Get(self.BASE, params=params, headers=headers, timeout=60, ttl=self.CacheTtl(nextDay))
             if r.status_code != 200:
                 break
             js = r.json()
@@ -73,6 +74,7 @@ class SemanticScholarSource(Source):
                 venue = (p.get("venue") or "").strip()
                 date = (p.get("publicationDate") or str(p.get("year") or "")).strip()
                 if not self._in_range(date, day, nextDay):
+                    self._Dropped("date")
                     continue
                 out.append(self._norm({
                     "id": doi or title[:40],
@@ -83,6 +85,7 @@ class SemanticScholarSource(Source):
                     "venue": venue,
                     "date": date[:10] if date else "",
                     "source": self.name,
+                    "ids": {"arxiv": ex.get("ArXiv"), "pmid": ex.get("PubMed")} if isinstance(ex, dict) else {},
                 }))
             if len(data) < page_size:
                 break
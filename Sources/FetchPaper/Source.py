@@ -1,12 +1,44 @@
+import asyncio
 from abc import ABC, abstractmethod
 
+from ..HttpClient import http
+from ..ResponseCache import WindowTtl
+from ..Metrics import metrics
+
 class Source(ABC):
     name: str = "base"
+    # True when the query itself pins [day, nextDay) server-side, so pages for a window
+    # that has closed never change and can be cached for good.
+    WINDOWED: bool = False
+
+    def __init__(self, *, base:str | None = None):
+        """base: override the class-level BASE endpoint (a mirror, a proxy, or a local stub server)."""
+        if base:
+            self.BASE = base.rstrip("/") + ("/" if type(self).BASE.endswith("/") else "")
 
     @abstractmethod
     def Fetch(self, *, day:str, nextDay:str, **kwargs) -> list[dict]:
         ...
 
+    async def AFetch(self, *, day:str, nextDay:str, **kwargs) -> list[dict]:
+        """Async counterpart of Fetch.
+
+        The default runs the blocking Fetch in a worker thread; sources that can
+        issue their page requests concurrently override this with a version built on
+        AsyncHttp.AGet (itself threaded http.Get calls, under a per-host cap).
+        """
+        return await asyncio.to_thread(lambda: self.Fetch(day=day, nextDay=nextDay, **kwargs))
+
+    def CacheTtl(self, nextDay:str) -> float:
+        """Seconds this source's pages may be served from the HTTP response cache:
+        forever for a closed window of a windowed query, http.cacheTtl otherwise
+        (open windows, and free-text queries filtered client-side, whose pages shift day to day)."""
+        return WindowTtl(nextDay, http.cacheTtl) if self.WINDOWED else http.cacheTtl
+
+    def _Dropped(self, reason:str) -> None:
+        """Count a record the source fetched but filtered out client-side (e.g. reason="date")."""
+        metrics.Count(self.name, f"dropped_{reason}")
+
     def _norm(self, item:dict) -> dict:
         return {
             "id": item.get("id",""),
@@ -17,4 +49,5 @@ class Source(ABC):
             "venue": item.get("venue",""),
             "date": item.get("date",""),
             "source": item.get("source", self.name),
+            "ids": {k: str(v) for k, v in (item.get("ids") or {}).items() if v},    # cross-reference IDs, e.g. {"pmid": "…", "arxiv": "…"}
         }
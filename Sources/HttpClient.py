@@ -0,0 +1,168 @@
+# Sources/HttpClient.py
+import random
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .ResponseCache import ResponseCache
+from .Metrics import metrics, CurrentScope
+
+log = logging.getLogger(__name__)
+
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+# Hosts whose terms ask for serial, spaced requests: {host: seconds between request starts}.
+# arXiv: "no more than one request every three seconds ... a single connection at a time".
+HOST_INTERVALS = {"export.arxiv.org": 3.0}
+
+class HttpClient:
+    """Process-wide HTTP client shared by the sources, the AI client and the Zotero fetch.
+
+    - one requests.Session, so every host keeps its own pool of keep-alive connections
+      and multi-page fetches pay the DNS/TLS handshake once;
+    - retries on connection errors and 429/5xx with exponential backoff and full jitter,
+      honouring Retry-After when the server sends one;
+    - gzip/deflate negotiated on every request;
+    - hosts in `hostIntervals` get one request at a time, spaced that many seconds apart,
+      however many threads (sources, backfill days) ask at once;
+    - GETs that pass a `ttl` go through the on-disk ResponseCache when one is configured
+      (which reads the body to store it, so stream=True then streams from memory).
+    After the last attempt the final response is returned as-is, so callers keep their
+    own raise_for_status() / status_code handling.
+    """
+    def __init__(self, **kwargs):
+        self.session = requests.Session()
+        self.session.headers.update({"Accept-Encoding": "gzip, deflate"})
+        self._hostLocks: dict[str, threading.Lock] = {}
+        self._lastStart: dict[str, float] = {}
+        self._paceLock  = threading.Lock()
+        self.Configure(**kwargs)
+
+    def Configure(self, *, poolSize: int = 16, retries: int = 4, backoffBase: float = 0.5, backoffCap: float = 30.0,
+                  cacheDir: str = "", cacheTtl: float = 900.0, cacheRetentionDays: float = 14,
+                  hostIntervals: dict[str, float] | None = None) -> "HttpClient":
+        """(Re)apply pool, retry and response-cache settings in place, so modules holding `http` see them.
+        cacheDir: "" disables the response cache; cacheTtl: seconds a response for a still-open
+        window (or an undated query) is served without revalidation.
+        hostIntervals: per-host request spacing, on top of HOST_INTERVALS."""
+        self.hostIntervals = {**HOST_INTERVALS, **(hostIntervals or {})}
+        self.retries     = max(0, int(retries))
+        self.backoffBase = float(backoffBase)
+        self.backoffCap  = float(backoffCap)
+        self.cacheTtl    = max(0.0, float(cacheTtl))
+        self.cache       = ResponseCache(cacheDir, retentionDays = cacheRetentionDays) if cacheDir else None
+
+        adapter = HTTPAdapter(pool_connections = 32, pool_maxsize = max(1, int(poolSize)), max_retries = 0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        return self
+
+    def Backoff(self, attempt: int, retryAfter: str | None = None) -> float:
+        """Seconds to sleep before retry number `attempt` (0-based)."""
+        if retryAfter:
+            try:
+                return min(self.backoffCap, max(0.0, float(retryAfter)))
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoffCap, self.backoffBase * (2 ** attempt)))
+
+    def Request(self, method: str, url: str, **kwargs) -> requests.Response:
+        scope = CurrentScope(urlsplit(url).netloc)
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            metrics.Count(scope, "requests")
+            try:
+                with self._Paced(urlsplit(url).netloc), metrics.Timer("http_seconds", sample = True):
+                    r = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if last:
+                    metrics.Count(scope, "http_errors")
+                    raise
+                metrics.Count(scope, "retries")
+                delay = self.Backoff(attempt)
+                log.warning(f"{method} {urlsplit(url).netloc} failed ({e.__class__.__name__}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+            if r.status_code not in RETRY_STATUS or last:
+                if r.ok:
+                    metrics.Count(scope, "pages")
+                    # stream=True: leave the body unread for the caller; count the announced size
+                    metrics.Count(scope, "bytes", int(r.headers.get("Content-Length") or 0) if kwargs.get("stream") else len(r.content))
+                else:
+                    metrics.Count(scope, "http_errors")
+                return r
+            metrics.Count(scope, "retries")
+            delay = self.Backoff(attempt, r.headers.get("Retry-After"))
+            log.warning(f"{method} {urlsplit(url).netloc} returned {r.status_code}, retrying in {delay:.1f}s")
+            r.close()
+            time.sleep(delay)
+
+    @contextmanager
+    def _Paced(self, host: str):
+        """Hold the host's slot for one request: wait for the previous request to the host
+        to finish and for `interval` seconds since it started. Retries re-enter, so their
+        backoff sleeps do not hold the slot."""
+        interval = self.hostIntervals.get(host)
+        if not interval:
+            yield
+            return
+        with self._paceLock:
+            lock = self._hostLocks.setdefault(host, threading.Lock())
+        with lock:
+            delay = self._lastStart.get(host, float("-inf")) + interval - time.monotonic()
+            if delay > 0:
+                metrics.Observe("http_pace_seconds", delay)
+                time.sleep(delay)
+            self._lastStart[host] = time.monotonic()
+            yield
+
+    def Get(self, url: str, *, ttl: float | None = None, **kwargs) -> requests.Response:
+        """ttl: seconds a cached copy may be served as-is (ResponseCache.IMMUTABLE: forever);
+        None bypasses the cache. Only 200 responses are stored."""
+        if ttl is None or self.cache is None:
+            return self.Request("GET", url, **kwargs)
+
+        key   = self.cache.Key(url, kwargs.get("params"))
+        entry = self.cache.Load(key)
+        if entry is not None and self.cache.Fresh(entry[0], ttl):
+            self.cache.hits += 1
+            metrics.Count(CurrentScope(urlsplit(url).netloc), "cache_hits")
+            return self.cache.Response(*entry)
+
+        conditional = self.cache.Validators(entry[0]) if entry is not None else {}
+        headers = {**(kwargs.pop("headers", None) or {}), **conditional}
+        r = self.Request("GET", url, headers = headers, **kwargs)
+        if r.status_code == 304 and entry is not None:
+            self.cache.revalidated += 1
+            metrics.Count(CurrentScope(urlsplit(url).netloc), "cache_revalidated")
+            self.cache.Touch(key, *entry, r)
+            return self.cache.Response(*entry)
+        self.cache.misses += 1
+        if r.status_code == 200:
+            self.cache.Store(key, r)
+        return r
+
+    def Post(self, url: str, **kwargs) -> requests.Response:
+        return self.Request("POST", url, **kwargs)
+
+    def WarmUp(self, urls: list[str], timeout: float = 5.0) -> None:
+        """Resolve DNS and complete the TLS handshake for each host ahead of the first real request."""
+        origins = sorted({f"{p.scheme}://{p.netloc}" for p in map(urlsplit, urls) if p.scheme and p.netloc})
+        if not origins:
+            return
+        def touch(origin: str):
+            try:
+                self.session.head(origin, timeout = timeout, allow_redirects = False).close()
+            except requests.RequestException:
+                pass
+        with ThreadPoolExecutor(max_workers = min(16, len(origins)), thread_name_prefix = "warmup") as pool:
+            list(pool.map(touch, origins))
+        log.info(f"Warmed up connections to {len(origins)} hosts.")
+
+http = HttpClient()
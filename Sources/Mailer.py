@@ -3,6 +3,8 @@ import ssl, smtplib, base64
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
+from .Metrics import metrics
+
 class Mailer:
     def __init__(self, server: str, port: int):
         self.server = server
@@ -21,11 +23,21 @@ class Mailer:
         if code != 235:
             raise smtplib.SMTPAuthenticationError(code, resp)
 
-    def SendMarkdown(self, subject: str, markdownText: str):
+    def SendMarkdown(self, subject: str, markdownText: str, to: str | None = None):
+        """to: recipient(s) for this message; defaults to EMAIL_TO."""
+        try:
+            with metrics.Timer("mail.send"):
+                self._SendMarkdown(subject, markdownText, to or self.to)
+        except Exception:
+            metrics.Count("mail", "errors")
+            raise
+        metrics.Count("mail", "sent")
+
+    def _SendMarkdown(self, subject: str, markdownText: str, to: str):
         msg = MIMEMultipart("alternative")
         msg["Subject"] = subject
         msg["From"] = self.sender
-        msg["To"] = self.to
+        msg["To"] = to
         msg.attach(MIMEText(markdownText, "plain", "utf-8"))
 
         ctx = ssl.create_default_context()
@@ -1,21 +1,27 @@
 import json, os
 
 class MarkdownRenderer:
-    def Render(self, day, recommendations):
-        markdownLines = [f"## 每日论文推荐 — {day}\n"]
+    def Render(self, day, recommendations, *, heading = None, fileName = None):
+        markdownLines = [f"## {heading or f'每日论文推荐 — {day}'}\n"]
 
         for paper in recommendations:
-            markdownLines.append(
+            entry = (
                 f"- **{paper['title']}**\n"
                 f"  - 发表日期：{paper.get('date', '')} | 推荐度：{paper['Similarity']:.3f} | 来源：{paper.get('source','')}\n"
                 f"  - DOI：{paper.get('doi', '')}\n"
                 f"  - 链接：{paper.get('url','')}\n"
                 f"  - 摘要：{paper.get('abstract','')}\n"
             )
+            if paper.get("Related"):
+                entry += "  - 相关旧文：\n" + "".join(
+                    f"    - [{related['title']}]({related.get('url','')})（{related.get('date','')}，相似度 {related['Similarity']:.3f}）\n"
+                    for related in paper["Related"]
+                )
+            markdownLines.append(entry)
             
         markdown = "\n".join(markdownLines)
         os.makedirs("outputs", exist_ok = True)
-        with open(f"outputs/daily_{day}.md","w",encoding="utf-8") as f:
+        with open(f"outputs/{fileName or f'daily_{day}'}.md","w",encoding="utf-8") as f:
             f.write(markdown)
 
         return markdown
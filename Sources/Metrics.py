@@ -0,0 +1,119 @@
+# Sources/Metrics.py
+import os
+import json
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import numpy as np
+
+# Which Source the current thread/task is working for; set by the Aggregator around each
+# Fetch so the shared HTTP client can attribute pages and bytes to the right source.
+_scope: contextvars.ContextVar[str] = contextvars.ContextVar("metrics_scope", default = "")
+
+class RunMetrics:
+    """Thread-safe counters, timers and latency samples for one pipeline run.
+
+      counters - {scope: {name: number}}, e.g. {"arXiv": {"pages": 6, "bytes": 1843022}}
+      timers   - {name: seconds}, e.g. stage wall times
+      samples  - {name: [values]}, reported as count/mean/p50/p90/p99/max
+    Report() turns everything into one JSON-ready dict.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.Reset()
+
+    def Reset(self, **meta) -> None:
+        with self._lock:
+            self.meta     = {"started": datetime.now(timezone.utc).isoformat(timespec = "seconds"), **meta}
+            self.counters = defaultdict(lambda: defaultdict(float))
+            self.timers   = {}
+            self.samples  = defaultdict(list)
+            self._start   = time.monotonic()
+
+    def Count(self, scope: str, name: str, n: float = 1) -> None:
+        with self._lock:
+            self.counters[scope][name] += n
+
+    def Observe(self, name: str, value: float) -> None:
+        with self._lock:
+            self.samples[name].append(float(value))
+
+    def Time(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.timers[name] = self.timers.get(name, 0.0) + float(seconds)
+
+    @contextmanager
+    def Timer(self, name: str, sample: bool = False):
+        """Add the block's wall time to timers[name] (or, with sample=True, to samples[name])."""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            (self.Observe if sample else self.Time)(name, time.monotonic() - start)
+
+    def Report(self) -> dict:
+        with self._lock:
+            counters = {scope: {k: (int(v) if float(v).is_integer() else v) for k, v in values.items()} for scope, values in self.counters.items()}
+            samples  = {name: _Summary(values) for name, values in self.samples.items()}
+            report = {
+                "meta"    : {**self.meta, "seconds": round(time.monotonic() - self._start, 3)},
+                "timers"  : {k: round(v, 3) for k, v in self.timers.items()},
+                "counters": counters,
+                "samples" : samples,
+            }
+        dedup = counters.get("dedup", {})
+        if dedup.get("input"):
+            report["dedup_hit_rate"] = round(dedup.get("duplicates", 0) / dedup["input"], 4)
+        return report
+
+    def Write(self, path: str, keepPrevious: bool = False) -> dict:
+        """Write Report() to path. keepPrevious: the run resumes an earlier attempt, whose
+        report (and its own earlier attempts) is kept under "attempts", oldest first."""
+        report = self.Report()
+        if keepPrevious and os.path.exists(path):
+            try:
+                with open(path, "r", encoding = "utf-8") as f:
+                    previous = json.load(f)
+            except (OSError, ValueError):
+                previous = {}
+            if previous:
+                report["attempts"] = previous.pop("attempts", []) + [previous]
+        os.makedirs(os.path.dirname(path) or ".", exist_ok = True)
+        with open(path, "w", encoding = "utf-8") as f:
+            json.dump(report, f, ensure_ascii = False, indent = 2)
+        return report
+
+def _Summary(values: list[float]) -> dict:
+    if not values:
+        return {"count": 0}
+    a = np.asarray(values, dtype = np.float64)
+    p50, p90, p99 = np.percentile(a, [50, 90, 99])
+    return {"count": int(a.size), "mean": round(float(a.mean()), 4), "p50": round(float(p50), 4),
+            "p90": round(float(p90), 4), "p99": round(float(p99), 4), "max": round(float(a.max()), 4)}
+
+@contextmanager
+def Scope(name: str):
+    """Attribute HTTP traffic issued inside the block (this thread/task) to `name`."""
+    token = _scope.set(name)
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+def InScope(fn):
+    """Wrap fn so it runs under the caller's current scope, e.g. when handed to a thread pool
+    (pool threads do not inherit the submitting thread's context)."""
+    name = CurrentScope()
+    def run(*args, **kwargs):
+        with Scope(name):
+            return fn(*args, **kwargs)
+    return run
+
+def CurrentScope(default: str = "") -> str:
+    return _scope.get() or default
+
+metrics = RunMetrics()
@@ -0,0 +1,278 @@
+# Sources/PaperIndex.py
+import os
+import re
+import json
+import shutil
+import hashlib
+import logging
+import numpy as np
+
+from .Profile import SphericalKMeans
+from .Quantize import Quantized, Quantize, Dot
+from .EmbeddingCache import TextKey, KEY_BYTES
+from .FetchPaper.RecordMerge import NormalizeDoi
+
+log = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+RECORD_FIELDS = ("title", "doi", "url", "date", "venue", "source")
+
+def DoiHash(doi: str) -> int:
+    return int.from_bytes(hashlib.blake2b(NormalizeDoi(doi).encode("utf-8"), digest_size = 8).digest(), "little") >> 1
+
+def DayNumber(date: str) -> int:
+    """"2025-10-23..." -> 20251023 ("2025-10" -> 20251001, "2025" -> 20250101); 0 when the record has no usable date."""
+    digits = re.sub(r"\D", "", (date or "")[:10])
+    if len(digits) >= 8:
+        return int(digits[:8])
+    return int(digits + "0101"[len(digits) - 4:]) if len(digits) in (4, 6) else 0
+
+class Segment:
+    """One immutable, memory-mapped slice of the index, rows grouped by inverted list.
+
+      codes.{f16,i8}  - rows x d vectors in storage form, scales.f32 - per-row scales
+      keys.bin        - rows x 16-byte TextKey of the embedded text (for dedup)
+      days.i32        - rows publication day as YYYYMMDD (0 = unknown)
+      lists.i64       - nlist + 1 offsets: rows of list j are [lists[j], lists[j + 1])
+      dois.u64        - sorted DOI hashes, doirows.i64 - the row of each
+      records.jsonl   - one metadata line per row, offsets.i64 - byte offset of each line
+    """
+    def __init__(self, path: str, dimensions: int, dtype: str):
+        self.path = path
+        meta = _ReadJson(os.path.join(path, "segment.json"))
+        self.rows = int(meta["rows"])
+        codeType = np.int8 if dtype == "int8" else np.float16
+        self.codes   = _Map(path, "codes.i8" if dtype == "int8" else "codes.f16", codeType, (self.rows, dimensions))
+        self.scales  = _Map(path, "scales.f32",  np.float32, (self.rows, ))
+        self.keys    = _Map(path, "keys.bin",    np.uint8,   (self.rows, KEY_BYTES))
+        self.days    = _Map(path, "days.i32",    np.int32,   (self.rows, ))
+        self.lists   = np.fromfile(os.path.join(path, "lists.i64"), dtype = np.int64)
+        self.dois    = np.fromfile(os.path.join(path, "dois.u64"), dtype = np.uint64)
+        self.doiRows = np.fromfile(os.path.join(path, "doirows.i64"), dtype = np.int64)
+        self.offsets = np.fromfile(os.path.join(path, "offsets.i64"), dtype = np.int64)
+
+    def Records(self, rows) -> list[dict]:
+        out = []
+        with open(os.path.join(self.path, "records.jsonl"), "rb") as f:
+            for r in rows:
+                f.seek(int(self.offsets[r]))
+                out.append(json.loads(f.readline()))
+        return out
+
+    def FindDoi(self, doi: str) -> int:
+        h = np.uint64(DoiHash(doi))
+        i = int(np.searchsorted(self.dois, h))
+        return int(self.doiRows[i]) if i < len(self.dois) and self.dois[i] == h else -1
+
+    @staticmethod
+    def Write(path: str, records: list[dict], vectors: Quantized, keys: np.ndarray, assign: np.ndarray, nlist: int, dtype: str) -> None:
+        """Write rows sorted by their list `assign` into a new segment directory at `path`."""
+        order = np.argsort(assign, kind = "stable")
+        tmp = path + ".tmp"
+        shutil.rmtree(tmp, ignore_errors = True)
+        os.makedirs(tmp)
+        vectors.codes[order].tofile(os.path.join(tmp, "codes.i8" if dtype == "int8" else "codes.f16"))
+        vectors.scales[order].astype(np.float32).tofile(os.path.join(tmp, "scales.f32"))
+        keys[order].tofile(os.path.join(tmp, "keys.bin"))
+        np.asarray([DayNumber(records[i].get("date", "")) for i in order.tolist()], dtype = np.int32).tofile(os.path.join(tmp, "days.i32"))
+        np.concatenate([[0], np.cumsum(np.bincount(assign, minlength = nlist))]).astype(np.int64).tofile(os.path.join(tmp, "lists.i64"))
+
+        offsets, dois = [], []
+        with open(os.path.join(tmp, "records.jsonl"), "wb") as f:
+            for row, i in enumerate(order.tolist()):
+                record = {field: records[i].get(field, "") or "" for field in RECORD_FIELDS}
+                offsets.append(f.tell())
+                f.write(json.dumps(record, ensure_ascii = False).encode("utf-8") + b"\n")
+                if NormalizeDoi(record["doi"]):
+                    dois.append((DoiHash(record["doi"]), row))
+        np.asarray(offsets, dtype = np.int64).tofile(os.path.join(tmp, "offsets.i64"))
+        dois.sort()
+        np.asarray([h for h, _ in dois], dtype = np.uint64).tofile(os.path.join(tmp, "dois.u64"))
+        np.asarray([r for _, r in dois], dtype = np.int64).tofile(os.path.join(tmp, "doirows.i64"))
+        with open(os.path.join(tmp, "segment.json"), "w", encoding = "utf-8") as f:
+            json.dump({"rows": len(order), "nlist": nlist}, f)
+        os.replace(tmp, path)
+
+class PaperIndex:
+    """Persistent IVF index over every candidate embedding the pipeline has computed.
+
+    Layout under `root/<namespace>/` (one namespace per embedding model and dimensions):
+      meta.json      - segments, centroid generation, rows
+      centroids-G.npy - nlist x d unit centroids of generation G (absent until trained)
+      seg-NNNNN/     - immutable Segment directories
+    Append() writes each day's new vectors as one more segment, assigned to the current
+    lists. Compact() merges all segments into one, and (re)trains the centroids with
+    spherical k-means once the index has grown enough for a finer partition - about
+    sqrt(rows) lists. Search() probes the `nprobe` lists closest to each query in every
+    segment and scores only their rows, on the quantized codes.
+    """
+    def __init__(self, root: str, *, model: str, dimensions: int, dtype: str = "int8", maxSegments: int = 8, trainRows: int = 4096):
+        self.model       = model
+        self.dimensions  = int(dimensions)
+        self.dtype       = "int8" if dtype == "int8" else "float16"
+        self.maxSegments = max(1, int(maxSegments))
+        self.trainRows   = max(1, int(trainRows))
+        namespace = hashlib.sha1(json.dumps({"version": INDEX_VERSION, "model": model, "dimensions": self.dimensions, "dtype": self.dtype}, sort_keys = True).encode("utf-8")).hexdigest()[:16]
+        self.dir = os.path.join(root, namespace)
+        os.makedirs(self.dir, exist_ok = True)
+        self._keys = None
+        self._Load()
+
+    @property
+    def rows(self) -> int:
+        return sum(segment.rows for segment in self.segments)
+
+    @property
+    def nlist(self) -> int:
+        return 1 if self.centroids is None else self.centroids.shape[0]
+
+    # ---- write ----
+    def Append(self, records: list[dict], vectors: np.ndarray, texts: list[str]) -> int:
+        """Add records with their unit vectors and embedded texts; texts already indexed are
+        skipped. Returns the number of rows added."""
+        keys = np.frombuffer(b"".join(TextKey(t) for t in texts), dtype = np.uint8).reshape(-1, KEY_BYTES) if texts else np.zeros((0, KEY_BYTES), dtype = np.uint8)
+        known = self._KnownKeys()
+        fresh, seen = [], set()
+        for i in range(len(texts)):
+            key = keys[i].tobytes()
+            if key not in known and key not in seen and np.any(vectors[i]):
+                fresh.append(i)
+                seen.add(key)
+        if not fresh:
+            return 0
+        vectors = np.asarray(vectors, dtype = np.float32)[fresh]
+        self._WriteSegment([records[i] for i in fresh], Quantize(vectors, self.dtype), keys[fresh], self._Assign(vectors))
+        known.update(seen)
+        if len(self.segments) > self.maxSegments or (self.centroids is None and self.rows >= self.trainRows):
+            self.Compact()
+        return len(fresh)
+
+    def Compact(self) -> None:
+        """Merge every segment into one; retrain the lists when the index has outgrown them."""
+        if not self.segments:
+            return
+        codes   = np.concatenate([np.asarray(s.codes) for s in self.segments])
+        scales  = np.concatenate([np.asarray(s.scales) for s in self.segments])
+        keys    = np.concatenate([np.asarray(s.keys) for s in self.segments])
+        records = [record for s in self.segments for record in s.Records(range(s.rows))]
+        vectors = codes.astype(np.float32)
+        vectors /= (np.linalg.norm(vectors, axis = 1, keepdims = True) + 1e-9)
+
+        target = int(np.clip(round(np.sqrt(len(records))), 16, 4096))
+        if len(records) >= self.trainRows and (self.centroids is None or target >= 2 * self.nlist):
+            sample = vectors[np.random.default_rng(0).permutation(len(vectors))[:max(64 * target, self.trainRows)]]
+            self.centroids = SphericalKMeans(sample, target, iters = 10).astype(np.float32)
+            self.generation += 1
+            np.save(os.path.join(self.dir, f"centroids-{self.generation}.npy"), self.centroids)
+            log.info(f"Paper index: trained {self.nlist} inverted lists over {len(records)} papers.")
+        merged, self.segments = len(self.segments), []
+        self._WriteSegment(records, Quantized(codes, scales), keys, self._Assign(vectors))
+        self._Sweep()
+        log.info(f"Paper index: compacted {merged} segments into one ({len(records)} papers).")
+
+    # ---- read ----
+    def Search(self, queries: np.ndarray, k: int = 10, *, nprobe: int = 8, before: int = 0, after: int = 0, exclude: set | None = None) -> list[list[dict]]:
+        """Top-k records per unit query vector, best first, each with a "Similarity".
+
+        before / after: YYYYMMDD bounds on the publication day (exclusive / inclusive; 0 = none).
+        exclude: normalized DOIs to leave out (e.g. the query paper itself).
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype = np.float32))
+        nprobe  = max(1, min(int(nprobe), self.nlist))
+        probes  = np.argsort(-(queries @ self.centroids.T), axis = 1)[:, :nprobe] if self.centroids is not None else np.zeros((len(queries), 1), dtype = np.int64)
+        results = []
+        for q, lists in zip(queries, probes):
+            hits = []       # (score, segment, row)
+            for s, segment in enumerate(self.segments):
+                rows = np.concatenate([np.arange(segment.lists[j], segment.lists[j + 1]) for j in lists.tolist()]) if segment.rows else np.zeros((0, ), dtype = np.int64)
+                if before or after:
+                    days = segment.days[rows]
+                    rows = rows[((days < before) if before else True) & ((days >= after) if after else True)]
+                if rows.size == 0:
+                    continue
+                scores = Dot(Quantized(segment.codes[rows], segment.scales[rows]), q[:, None])[:, 0]
+                top = np.argpartition(-scores, min(len(scores), k + len(exclude or ())) - 1)[:k + len(exclude or ())]
+                hits += [(float(scores[i]), s, int(rows[i])) for i in top.tolist()]
+            # only the best k + |exclude| hits can make the result; read their records in
+            # one pass per segment, in file order
+            hits = sorted(hits, key = lambda hit: -hit[0])[:k + len(exclude or ())]
+            records = {}
+            for s in sorted({s for _, s, _ in hits}):
+                rows = sorted(row for _, hs, row in hits if hs == s)
+                records.update(zip(((s, row) for row in rows), self.segments[s].Records(rows)))
+            found = []
+            for score, s, row in hits:
+                record = records[(s, row)]
+                if exclude and NormalizeDoi(record.get("doi", "")) in exclude:
+                    continue
+                found.append({**record, "Similarity": score})
+                if len(found) == k:
+                    break
+            results.append(found)
+        return results
+
+    def FindDoi(self, doi: str) -> tuple[dict, np.ndarray] | None:
+        """(record, unit vector) of an indexed paper, or None."""
+        for segment in reversed(self.segments):
+            row = segment.FindDoi(doi)
+            if row >= 0:
+                vector = segment.codes[row].astype(np.float32)
+                return segment.Records([row])[0], vector / (np.linalg.norm(vector) + 1e-9)
+        return None
+
+    # ---- storage ----
+    def _Assign(self, vectors: np.ndarray) -> np.ndarray:
+        if self.centroids is None:
+            return np.zeros((len(vectors), ), dtype = np.int64)
+        return (vectors @ self.centroids.T).argmax(axis = 1).astype(np.int64)
+
+    def _KnownKeys(self) -> set:
+        if self._keys is None:
+            self._keys = {bytes(key) for segment in self.segments for key in np.asarray(segment.keys)}
+        return self._keys
+
+    def _WriteSegment(self, records, vectors: Quantized, keys, assign) -> None:
+        self.counter += 1
+        path = os.path.join(self.dir, f"seg-{self.counter:05d}")
+        Segment.Write(path, records, vectors, keys, assign, self.nlist, self.dtype)
+        self.segments.append(Segment(path, self.dimensions, self.dtype))
+        self._SaveMeta()
+
+    def _Load(self):
+        meta = _ReadJson(os.path.join(self.dir, "meta.json")) or {}
+        self.counter    = int(meta.get("counter", 0))
+        self.generation = int(meta.get("generation", 0))
+        self.centroids  = np.load(os.path.join(self.dir, f"centroids-{self.generation}.npy")) if self.generation else None
+        self.segments   = [Segment(os.path.join(self.dir, name), self.dimensions, self.dtype) for name in meta.get("segments", [])]
+        self._Sweep()
+        log.info(f"Paper index {self.dir}: {self.rows} papers in {len(self.segments)} segments, {self.nlist} lists.")
+
+    def _Sweep(self):
+        """Delete segments not listed in meta.json and centroids of other generations:
+        leftovers of an interrupted write, or of a compaction that has committed."""
+        listed = {os.path.basename(s.path) for s in self.segments}
+        for name in os.listdir(self.dir):
+            if name.startswith("seg-") and name not in listed:
+                shutil.rmtree(os.path.join(self.dir, name), ignore_errors = True)
+            elif name.startswith("centroids-") and name != f"centroids-{self.generation}.npy":
+                os.remove(os.path.join(self.dir, name))
+
+    def _SaveMeta(self):
+        meta = {"version": INDEX_VERSION, "model": self.model, "dimensions": self.dimensions, "dtype": self.dtype,
+                "counter": self.counter, "generation": self.generation, "rows": self.rows,
+                "segments": [os.path.basename(s.path) for s in self.segments]}
+        tmp = os.path.join(self.dir, "meta.json.tmp")
+        with open(tmp, "w", encoding = "utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(self.dir, "meta.json"))
+
+def _ReadJson(path: str) -> dict | None:
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding = "utf-8") as f:
+        return json.load(f)
+
+def _Map(path: str, name: str, dtype, shape):
+    if shape[0] == 0:
+        return np.zeros(shape, dtype = dtype)
+    return np.memmap(os.path.join(path, name), dtype = dtype, mode = "r", shape = shape)
@@ -0,0 +1,165 @@
+# Sources/PaperStore.py
+import os
+import json
+import sqlite3
+import hashlib
+import logging
+import threading
+import numpy as np
+
+from .Quantize import Quantize, Dequantize, Quantized, DTYPES
+from .EmbeddingCache import TextKey
+from .FetchPaper.RecordMerge import RecordKeys
+
+log = logging.getLogger(__name__)
+
+PAPER_FIELDS = ("title", "abstract", "doi", "url", "venue", "date", "source")
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS papers (
+    id       TEXT PRIMARY KEY,          -- canonical key: RecordKeys(record)[0]
+    title    TEXT, abstract TEXT, doi TEXT, url TEXT, venue TEXT, date TEXT, source TEXT,
+    extra    TEXT,                      -- JSON of every other record field (sources, ids, ...)
+    textKey  BLOB                       -- TextKey of the text the paper is embedded as
+);
+CREATE TABLE IF NOT EXISTS days (
+    day      TEXT,
+    position INTEGER,                   -- order within the day's candidate pool
+    id       TEXT,
+    PRIMARY KEY (day, position)
+);
+CREATE TABLE IF NOT EXISTS vectors (
+    textKey  BLOB,
+    space    TEXT,                      -- vector namespace (model, dimensions, dtype)
+    row      INTEGER,                   -- row in that namespace's append-only matrix
+    PRIMARY KEY (textKey, space)
+);
+"""
+
+class PaperStore:
+    """Local archive of every candidate pool, so past days re-rank and re-render offline.
+
+    Under `root/`:
+      papers.db            - SQLite: normalized metadata keyed by canonical ID, each day's
+                             candidate list, and row pointers into the vector matrices
+      <space>/vectors.*    - append-only float16/int8/float32 matrix of one embedding space
+      <space>/scales.f32   - per-row scales (int8 only)
+      <space>/meta.json    - model, dimensions, dtype of the space
+    Rows are only ever appended, so a pointer stays valid for the life of the store;
+    reads memory-map the matrix and touch only the rows asked for.
+    """
+    def __init__(self, root: str, *, model: str, dimensions: int, dtype: str = "float16"):
+        if dtype not in DTYPES:
+            raise ValueError(f"Unknown paper store dtype {dtype!r}; expected one of {', '.join(DTYPES)}")
+        self.root       = root
+        self.model      = model
+        self.dimensions = int(dimensions)
+        self.dtype      = dtype
+        meta = {"model": model, "dimensions": self.dimensions, "dtype": dtype}
+        self.space = hashlib.sha1(json.dumps(meta, sort_keys = True).encode("utf-8")).hexdigest()[:16]
+        self.dir   = os.path.join(root, self.space)
+        os.makedirs(self.dir, exist_ok = True)
+        with open(os.path.join(self.dir, "meta.json"), "w", encoding = "utf-8") as f:
+            json.dump(meta, f)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(root, "papers.db"), check_same_thread = False)
+        self._db.executescript(SCHEMA)
+        self._vectorFile = os.path.join(self.dir, {"float32": "vectors.f32", "float16": "vectors.f16", "int8": "vectors.i8"}[dtype])
+        self._scaleFile  = os.path.join(self.dir, "scales.f32")
+        self._rowBytes   = np.dtype(DTYPES[dtype]).itemsize * self.dimensions
+        self._rows = os.path.getsize(self._vectorFile) // self._rowBytes if os.path.exists(self._vectorFile) else 0
+        self._Repair()
+
+    # ---- write ----
+    def PutDay(self, day: str, candidates: list[dict], texts: list[str]) -> None:
+        """Upsert the candidates' metadata and make them the candidate pool of `day`."""
+        rows, ids = [], []
+        for paper, text in zip(candidates, texts):
+            paperId = RecordKeys(paper)[0]
+            extra = {k: v for k, v in paper.items() if k not in PAPER_FIELDS and k not in ("Similarity", "Cluster", "Related")}
+            rows.append((paperId, *[str(paper.get(f, "") or "") for f in PAPER_FIELDS], json.dumps(extra, ensure_ascii = False, default = str), TextKey(text)))
+            ids.append(paperId)
+        with self._lock, self._db:
+            self._db.executemany(f"INSERT OR REPLACE INTO papers (id, {', '.join(PAPER_FIELDS)}, extra, textKey) VALUES ({', '.join('?' * (len(PAPER_FIELDS) + 3))})", rows)
+            self._db.execute("DELETE FROM days WHERE day = ?", (day, ))
+            self._db.executemany("INSERT INTO days (day, position, id) VALUES (?, ?, ?)", [(day, i, paperId) for i, paperId in enumerate(ids)])
+
+    def PutVectors(self, texts: list[str], vectors: np.ndarray) -> int:
+        """Append the vectors of texts not stored yet (all-zero rows, i.e. failed embeddings,
+        are skipped). Returns the number of rows appended."""
+        keys = [TextKey(t) for t in texts]
+        with self._lock:
+            known = self._Known(keys)
+            fresh, seen = [], set()
+            for i, key in enumerate(keys):
+                if key not in known and key not in seen and np.any(vectors[i]):
+                    fresh.append(i)
+                    seen.add(key)
+            if not fresh:
+                return 0
+            codes, scales = Quantize(np.asarray(vectors, dtype = np.float32)[fresh], self.dtype)
+            # matrix first, then pointers: a crash in between leaves unreferenced rows, never dangling pointers
+            with open(self._vectorFile, "ab") as f:
+                f.write(np.ascontiguousarray(codes).tobytes())
+            if self.dtype == "int8":
+                with open(self._scaleFile, "ab") as f:
+                    f.write(scales.astype(np.float32).tobytes())
+            start, self._rows = self._rows, self._rows + len(fresh)
+            with self._db:
+                self._db.executemany("INSERT OR IGNORE INTO vectors (textKey, space, row) VALUES (?, ?, ?)", [(keys[i], self.space, start + j) for j, i in enumerate(fresh)])
+            return len(fresh)
+
+    # ---- read ----
+    def Days(self) -> list[str]:
+        with self._lock:
+            return [day for (day, ) in self._db.execute("SELECT DISTINCT day FROM days ORDER BY day")]
+
+    def Day(self, day: str) -> tuple[list[dict], np.ndarray, np.ndarray]:
+        """(candidates, hit mask, vectors) of a stored day, in pool order; vectors holds one
+        unit row per candidate that has a stored embedding (hit)."""
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT p.id, {', '.join('p.' + f for f in PAPER_FIELDS)}, p.extra, v.row FROM days d "
+                "JOIN papers p ON p.id = d.id LEFT JOIN vectors v ON v.textKey = p.textKey AND v.space = ? "
+                "WHERE d.day = ? ORDER BY d.position", (self.space, day)).fetchall()
+        candidates = []
+        for paperId, *fields, extra, _ in rows:
+            candidates.append({**json.loads(extra or "{}"), **dict(zip(PAPER_FIELDS, fields))})
+        pointers = np.asarray([-1 if row is None else row for *_, row in rows], dtype = np.int64)
+        hit = pointers >= 0
+        vectors = Dequantize(self._Read(pointers[hit]))
+        vectors /= (np.linalg.norm(vectors, axis = 1, keepdims = True) + 1e-9)
+        return candidates, hit, vectors
+
+    # ---- storage ----
+    def _Known(self, keys: list[bytes]) -> set:
+        known = set()
+        for i in range(0, len(keys), 500):
+            chunk = keys[i : i + 500]
+            known.update(k for (k, ) in self._db.execute(f"SELECT textKey FROM vectors WHERE space = ? AND textKey IN ({', '.join('?' * len(chunk))})", (self.space, *chunk)))
+        return known
+
+    def _Read(self, rows: np.ndarray) -> Quantized:
+        if rows.size == 0 or self._rows == 0:
+            return Quantized(np.zeros((0, self.dimensions), dtype = DTYPES[self.dtype]), np.zeros((0, ), dtype = np.float32))
+        codes = np.memmap(self._vectorFile, dtype = DTYPES[self.dtype], mode = "r", shape = (self._rows, self.dimensions))
+        if self.dtype != "int8":
+            return Quantized(np.array(codes[rows]), np.ones((len(rows), ), dtype = np.float32))
+        scales = np.memmap(self._scaleFile, dtype = np.float32, mode = "r", shape = (self._rows, ))
+        return Quantized(np.array(codes[rows]), np.array(scales[rows]))
+
+    def _Repair(self):
+        """Trim a torn trailing row and drop pointers past the end of the matrix (interrupted appends)."""
+        if os.path.exists(self._vectorFile) and os.path.getsize(self._vectorFile) != self._rows * self._rowBytes:
+            with open(self._vectorFile, "r+b") as f:
+                f.truncate(self._rows * self._rowBytes)
+        if self.dtype == "int8" and os.path.exists(self._scaleFile):
+            scaleRows = os.path.getsize(self._scaleFile) // 4
+            if scaleRows < self._rows:
+                self._rows = scaleRows
+                with open(self._vectorFile, "r+b") as f:
+                    f.truncate(self._rows * self._rowBytes)
+            with open(self._scaleFile, "r+b") as f:
+                f.truncate(self._rows * 4)
+        with self._db:
+            self._db.execute("DELETE FROM vectors WHERE space = ? AND row >= ?", (self.space, self._rows))
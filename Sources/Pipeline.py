@@ -1,13 +1,28 @@
 import os
 import logging
-import requests
 import numpy as np
+from datetime import date, timedelta
+from concurrent.futures import ThreadPoolExecutor
 
+from .HttpClient import http
 from .Embedder import Embedder
+from .EmbeddingBackend import OpenBackend
+from .ZoteroLibrary import OpenLibraries, CombinedProfile, ZOTERO_API
+from .Profile import ProfileModel, ProfileSet, BuildCentroidProfile, Fingerprint
+from .ConfigLoader import ProfileSettings
+from .Ranker import TopKRanker
+from .Prefilter import Prefilter
+from .PaperIndex import PaperIndex, DayNumber
+from .PaperStore import PaperStore
+from .Checkpoint import Checkpoints
+from .StageGraph import Stage, StageGraph
+from .Metrics import metrics
 from .AIClient import GeminiClient
 from .MarkdownRenderer import MarkdownRenderer
 from .Mailer import Mailer
 from .FetchPaper.Aggregator import Aggregator
+from .FetchPaper.AsyncAggregator import AsyncAggregator
+from .FetchPaper.RecordMerge import RecordKeys, NormalizeDoi
 
 from .FetchPaper.ArxivSource import ArxivSource
 from .FetchPaper.CORESource import CORESource
@@ -20,84 +35,530 @@ from .FetchPaper.OpenAlexSource import OpenAlexSource
 log = logging.getLogger(__name__)
 
 class Pipeline:
-    def __init__(self, config):
+    def __init__(self, config, *, offline : bool = False):
+        """offline: do not probe the embedding API (Rerank reads stored vectors only)."""
         self.config = config
-        self.embedder = Embedder(config.EMBEDDING_MODEL)
+        self.embedder = OpenEmbedder(config, probe = not offline)
+        self.index = OpenIndex(config, self.embedder)
+        self.store = OpenStore(config, self.embedder)
         self.renderer = MarkdownRenderer()
         # self.ai = GeminiClient(config.GEMINI_KEY, config.GEMINI_MODEL) if (config.AI_ENABLE and config.GEMINI_KEY) else None
         self.mailer = Mailer(config.EMAIL_SERVER, config.EMAIL_PORT)
-        
-        self.aggregator = Aggregator([
+        # 画像列表：未配置 profiles 时即 zotero 段的单一用户（NAME 为空，输出文件名与收件人保持原样）
+        self.recipients = config.PROFILES or [ProfileSettings(
+            NAME         = "",
+            ZOTERO_USER  = os.getenv("ZOTERO_USER") or config.ZOTERO_USER,
+            ZOTERO_GROUP = os.getenv("ZOTERO_GROUP") or config.ZOTERO_GROUP,
+            ZOTERO_KEY   = os.getenv("ZOTERO_KEY") or config.ZOTERO_KEY,
+            EMAIL_TO     = "",
+            TOP_K        = config.TOP_K,
+        )]
+
+        sources = [
             ArxivSource(),
             CrossrefSource(),
-        ])
+        ]
+        dedup = {"nearThreshold": config.DEDUP_NEAR_THRESHOLD, "nearNumPerm": config.DEDUP_NUM_PERM}
+        if config.FETCH_ASYNC:
+            self.aggregator = AsyncAggregator(sources, timeout = config.FETCH_TIMEOUT, defaultHostLimit = config.FETCH_HOST_LIMIT, **dedup)
+        else:
+            self.aggregator = Aggregator(sources, concurrent = config.FETCH_CONCURRENT, maxWorkers = config.FETCH_WORKERS, timeout = config.FETCH_TIMEOUT, **dedup)
 
-    def Run(self, *, day : str, nextDay : str):
+        http.Configure(
+            poolSize = config.HTTP_POOL_SIZE, retries = config.HTTP_RETRIES, backoffBase = config.HTTP_BACKOFF,
+            cacheDir = config.HTTP_CACHE_DIR, cacheTtl = config.HTTP_CACHE_TTL, cacheRetentionDays = config.HTTP_CACHE_RETENTION_DAYS,
+        )
+        self.warmUpUrls = [s.BASE for s in sources] + [ZOTERO_API, "https://generativelanguage.googleapis.com"]
 
+    def Run(self, *, day : str, nextDay : str, resume : bool = False):
+        """Run the daily recommendation as a stage DAG.
+
+        zotero -> profile  runs alongside  fetch; prefilter joins the Zotero sync and the
+        merged, deduplicated candidate pool, rank embeds just its shortlist, then
+        archive (which stores the vectors rank computed), render -> mail. Candidates are embedded only after merging and fusion,
+        so cross-source duplicates are never paid for and the fused text is what gets
+        cached. With several profiles configured, fetch runs once; rank scores every
+        profile in one matmul per chunk, and each profile gets its own digest.
+        Every stage leaves a checkpoint; resume=True restores the ones still valid,
+        so a retry after a late failure (say, SMTP) redoes only what failed.
+        """
         log.info(f'Pipeline started for day: {day}')
+        metrics.Reset(day = day, nextDay = nextDay, embedding = self.embedder.model)
+        self.embedder.ResetCounts()
+        with metrics.Timer("stage.warmup"):
+            http.WarmUp(self.warmUpUrls)
 
-        # 1) Zotero 用户画像
-        log.info(f'Fetching user profile from Zotero...')
-        personasTexts = []
-        zoteroUser = os.getenv("ZOTERO_USER")
-        zoteroKey  = os.getenv("ZOTERO_KEY")
-        headers = {"Zotero-API-Key": zoteroKey}
-        baseUrl = f"https://api.zotero.org/users/{zoteroUser}/items?format=json&limit=9999&sort=dateModified&direction=desc"
-        
-        zoteroPapers = requests.get(baseUrl, headers = headers, timeout = 60).json()
-        totalPapers = 0
-        for paper in zoteroPapers:
-            if "data" in paper:
-                dataField = paper["data"]
-                if "title" in dataField and "abstractNote" in dataField:
-                    totalPapers += 1
-                    personasTexts.append((f"## 论文 {totalPapers}\n- 标题：" + dataField["title"] + "\n- 摘要：" + dataField["abstractNote"]).strip())
-                    log.info(f"- Loaded paper from Zotero ({totalPapers}): " + dataField["title"])
-
-        # 2) 文本嵌入
-        log.info(f'Embedding user profile texts...')
-        embeddings = self.embedder.Encode(personasTexts)
-        if embeddings.size == 0:
-            personasVecs = np.zeros((1, self.embedder.dimensions), dtype = np.float32)
-        else:
-            personasVecs = embeddings.mean(axis = 0, keepdims = True)
-            personasVecs /= (np.linalg.norm(personasVecs) + 1e-9)
+        graph = StageGraph([
+            Stage("zotero",  self._SyncLibraries,  outputs = ("libraries", )),
+            Stage("profile", self._UpdateProfile,  inputs = ("libraries", ), outputs = ("profile", )),
+            Stage("fetch",   self._FetchPapers,    inputs = ("day", "nextDay"), outputs = ("candidates", "texts")),
+            Stage("prefilter", self._PrefilterPapers, inputs = ("libraries", "candidates", "texts"), outputs = ("shortlist", "shortTexts")),
+            Stage("rank",    self._RankPapers,     inputs = ("day", "profile", "shortlist", "shortTexts"), outputs = ("recommendations", "ranked", "rankedTexts", "rankedVectors")),
+            Stage("archive", self._ArchivePapers,  inputs = ("ranked", "rankedTexts", "rankedVectors")),
+            Stage("render",  self._RenderDigest,   inputs = ("day", "recommendations"), outputs = ("markdown", )),
+            Stage("mail",    self._MailDigest,     inputs = ("day", "markdown")),
+        ], checkpoints = self._Checkpoints(f"daily_{day}", resume))
+        self._RunGraph(graph, {"day": day, "nextDay": nextDay}, f"outputs/daily_{day}.metrics.json")
+
+    def Backfill(self, *, start : str, end : str, combined : bool = False, resume : bool = False):
+        """Catch up on every day in [start, end) in one run.
+
+        Zotero sync and the profile run once. The day windows are fetched in parallel
+        slices, and a paper returned for several days is kept on its first day only.
+        Every unique candidate is embedded and scored once, and each day's top-K (plus,
+        with combined=True, the top-K of the whole range) is picked from those shared
+        scores. Day digests go to outputs/; with combined=True only the combined digest
+        is mailed, otherwise one mail per day.
+        """
+        days = [(date.fromisoformat(start) + timedelta(days = i)).isoformat() for i in range((date.fromisoformat(end) - date.fromisoformat(start)).days)]
+        if not days:
+            raise ValueError(f"Empty backfill range [{start}, {end})")
+        log.info(f'Backfill started for {len(days)} days: {start} .. {days[-1]}')
+        metrics.Reset(day = start, nextDay = end, backfill = len(days), embedding = self.embedder.model)
+        self.embedder.ResetCounts()
+        with metrics.Timer("stage.warmup"):
+            http.WarmUp(self.warmUpUrls)
+
+        graph = StageGraph([
+            Stage("zotero",  self._SyncLibraries,  outputs = ("libraries", )),
+            Stage("profile", self._UpdateProfile,  inputs = ("libraries", ), outputs = ("profile", )),
+            Stage("fetch",   self._FetchDays,      inputs = ("days", ), outputs = ("candidates", "texts", "spans")),
+            Stage("prefilter", self._PrefilterDays, inputs = ("libraries", "candidates", "texts", "spans"), outputs = ("shortlist", "shortTexts", "shortSpans")),
+            Stage("rank",    self._RankDays,       inputs = ("profile", "shortlist", "shortTexts", "shortSpans", "combined"), outputs = ("digests", "ranked", "rankedTexts", "rankedVectors")),
+            Stage("archive", self._ArchivePapers,  inputs = ("ranked", "rankedTexts", "rankedVectors")),
+            Stage("render",  self._RenderDigests,  inputs = ("days", "digests"), outputs = ("markdowns", )),
+            Stage("mail",    self._MailDigests,    inputs = ("days", "markdowns", "combined")),
+        ], checkpoints = self._Checkpoints(f"backfill_{start}_{days[-1]}", resume))
+        self._RunGraph(graph, {"days": days, "combined": combined}, f"outputs/backfill_{start}_{days[-1]}.metrics.json")
+
+    def Rerank(self, *, day : str, mail : bool = False):
+        """Re-rank and re-render a past day from the paper store, without fetching or embedding.
+
+        The candidate pool and its vectors come from the store, the profile from the item
+        vectors last stored in the local Zotero mirror (not synced, nothing re-embedded).
+        Only candidates ranked at full resolution that day are stored; those the prefilter
+        (or the coarse pass) dropped stay out.
+        With mail=True the digests are sent again.
+        """
+        if self.store is None:
+            raise ValueError("Re-ranking needs the paper store (cache.PAPER_STORE_DIR is empty)")
+        log.info(f'Re-ranking {day} from the paper store')
+        metrics.Reset(day = day, rerank = True, embedding = self.embedder.model)
+        self.embedder.ResetCounts()
+        stages = [
+            Stage("zotero",  self._LocalLibraries, outputs = ("libraries", )),
+            Stage("profile", self._StoredProfile,  outputs = ("profile", ), inputs = ("libraries", )),
+            Stage("load",    self._LoadDay,        inputs = ("day", ), outputs = ("stored", "storedVectors")),
+            Stage("rank",    self._RankStored,     inputs = ("day", "profile", "stored", "storedVectors"), outputs = ("recommendations", )),
+            Stage("render",  self._RenderDigest,   inputs = ("day", "recommendations"), outputs = ("markdown", )),
+        ]
+        if mail:
+            stages.append(Stage("mail", self._MailDigest, inputs = ("day", "markdown")))
+        self._RunGraph(StageGraph(stages), {"day": day}, f"outputs/rerank_{day}.metrics.json")
+
+    def _Checkpoints(self, scope, resume) -> Checkpoints | None:
+        if not self.config.CHECKPOINT_DIR:
+            return None
+        return Checkpoints(self.config.CHECKPOINT_DIR, scope = scope, config = self.config, resume = resume, retentionDays = self.config.CHECKPOINT_RETENTION_DAYS)
+
+    def _RunGraph(self, graph, initial, metricsPath):
+        status = "failed"
+        try:
+            graph.Run(initial)
+            status = "ok"
+        finally:
+            if graph.checkpoints is not None and graph.checkpoints.restored:
+                log.info(f'Resumed from checkpoints: {", ".join(graph.checkpoints.restored)}')
+                metrics.Count("checkpoint", "restored", len(graph.checkpoints.restored))
+            for name, seconds in graph.timings.items():
+                metrics.Time(f"stage.{name}", seconds)
+            metrics.meta["status"] = status
+            # a resumed run's own counters cover only what it redid; keep the earlier attempts' reports
+            metrics.Write(metricsPath, keepPrevious = graph.checkpoints is not None and graph.checkpoints.resume)
+        if http.cache is not None:
+            log.info(f'HTTP cache: {http.cache.hits} fresh hits, {http.cache.revalidated} revalidated, {http.cache.misses} downloaded.')
+        log.info('Pipeline stage timings: ' + ", ".join(f"{name} {seconds:.1f}s" for name, seconds in graph.timings.items()))
+
+    # 1) Zotero 用户画像（本地镜像增量同步）
+    def _SyncLibraries(self) -> dict:
+        log.info(f'Syncing {len(self.recipients)} user profile(s) from Zotero...')
+        libraries, shared = self._OpenLibraries()
+        for library in shared:
+            library.Sync()
+        return {"libraries": libraries}
+
+    def _LocalLibraries(self) -> dict:
+        return {"libraries": self._OpenLibraries()[0]}
+
+    def _OpenLibraries(self):
+        """({profile name: its libraries}, every distinct library once)."""
+        shared, libraries = {}, {}
+        for recipient in self.recipients:
+            opened = OpenLibraries(
+                self.config.ZOTERO_CACHE_DIR,
+                userId   = recipient.ZOTERO_USER,
+                groupIds = recipient.ZOTERO_GROUP,
+                apiKey   = recipient.ZOTERO_KEY,
+            )
+            # a group library several profiles include is synced and embedded once
+            libraries[recipient.NAME] = [shared.setdefault(library.dir, library) for library in opened]
+        return libraries, list(shared.values())
 
-        # 3) 抓取候选论文 + 嵌入
+    # 2) 文本嵌入（只嵌入新增/修改的条目，画像向量按累加和增量维护；个人库与群组库合并为一个语料）
+    def _UpdateProfile(self, libraries, update = True) -> dict:
+        log.info(f'Updating user profile vectors...' if update else 'Loading stored user profile vectors...')
+        profiles = {}
+        for name, owned in libraries.items():
+            personasVecs = CombinedProfile(owned, self.embedder, update = update)
+            profiles[name] = self._BuildProfile(owned, personasVecs, name)
+        return {"profile": ProfileSet(profiles)}
+
+    def _StoredProfile(self, libraries) -> dict:
+        """Profile from the stored item vectors only: no embedding calls, no lexical refit."""
+        return self._UpdateProfile(libraries, update = False)
+
+    # 3) 抓取候选论文（合并、去重后才交给初筛与嵌入）
+    def _FetchPapers(self, day, nextDay) -> dict:
         log.info(f'Fetching candidate papers for {day}...')
-        rawDataset = self.aggregator.fetch_all(day=day, nextDay=nextDay, **{"OpenAlex":{"perPage":200,"maxPages":6}})
+        rawDataset = self.aggregator.fetch_all(day=day, nextDay=nextDay, **self._FetchKwargs())
+        paperCandidates, paperTexts = self._CandidateTexts(rawDataset)
+        if self.store is not None:
+            self.store.PutDay(day, paperCandidates, paperTexts)
+        metrics.Count("pipeline", "candidates", len(paperCandidates))
+        metrics.Count("pipeline", "dropped_empty", len(rawDataset) - len(paperCandidates))
+        return {"candidates": paperCandidates, "texts": paperTexts}
+
+    # 3.6) 级联初筛：嵌入前用文库词频 BM25 + 期刊/分类偏好打分，只保留前 M 篇
+    def _PrefilterPapers(self, libraries, candidates, texts) -> dict:
+        keep, _ = self._Shortlist(libraries, candidates, texts, {"": (0, len(candidates))})
+        return {"shortlist": [candidates[i] for i in keep], "shortTexts": [texts[i] for i in keep]}
+
+    # 4) 分块嵌入 + 相似度打分（流式保留 Top-K，不保留完整的候选矩阵）
+    def _RankPapers(self, day, profile, shortlist, shortTexts) -> dict:
+        log.info(f'Embedding and ranking {len(shortTexts)} candidate papers...')
+        keep, _ = self._CoarseShortlist(profile, shortTexts, {"": (0, len(shortTexts))})
+        candidates, texts = [shortlist[i] for i in keep], [shortTexts[i] for i in keep]
+        rankers = self._Rankers(profile)
+        vectors, failed = np.zeros((len(texts), self.embedder.dimensions), dtype = np.float32), 0
+        for offset, embeddings, mask in self.embedder.EncodeChunks(texts, self.config.RANK_CHUNK_SIZE):
+            vectors[offset : offset + len(embeddings)] = embeddings
+            failed += int((~mask).sum())
+            for name, (scores, clusters) in profile.Score(embeddings).items():
+                rankers[name].PushScores(scores, clusters, offset, mask)
+        metrics.Count("pipeline", "embedding_failed", failed)
+        paperRecommendations = {name: self._Recommendations(candidates, ranker) for name, ranker in rankers.items()}
+        for name, ranker in rankers.items():
+            self._AttachRelated(paperRecommendations[name], day, vectors[ranker.Result()[0]])
+
+        # 5) （可选）Gemini 摘要/理由
+        # if self.ai and picks:
+        #     picks = self.ai.summarize_batch(picks, personasNote)
+        metrics.Count("pipeline", "recommendations", sum(len(v) for v in paperRecommendations.values()))
+        return {"recommendations": paperRecommendations, "ranked": candidates, "rankedTexts": texts, "rankedVectors": vectors}
+
+    # 6) 渲染 + 邮件（每个画像一份）
+    def _RenderDigest(self, day, recommendations) -> dict:
+        log.info(f'Rendering markdown...')
+        return {"markdown": {name: self.renderer.Render(day, picks, fileName = _FileName(f"daily_{day}", name)) for name, picks in recommendations.items()}}
+
+    def _MailDigest(self, day, markdown) -> dict:
+        log.info(f'Sending {len(markdown)} email(s)...')
+        for recipient in self.recipients:
+            self.mailer.SendMarkdown(subject=f"[PaperLens] {day}", markdownText = markdown[recipient.NAME], to = recipient.EMAIL_TO or None)
+        return {}
+
+    # 补跑：按天切片并行抓取，跨天去重（论文只归入首次出现的那一天）
+    def _FetchDays(self, days) -> dict:
+        log.info(f'Fetching candidate papers for {len(days)} days...')
+        def fetch(day):
+            nextDay = (date.fromisoformat(day) + timedelta(days = 1)).isoformat()
+            return self.aggregator.fetch_all(day=day, nextDay=nextDay, **self._FetchKwargs())
+        with ThreadPoolExecutor(max_workers = max(1, min(self.config.BACKFILL_WORKERS, len(days))), thread_name_prefix = "backfill") as pool:
+            perDay = list(pool.map(fetch, days))
+
+        seen, paperCandidates, paperTexts, spans = set(), [], [], {}
+        for day, rawDataset in zip(days, perDay):
+            fresh = []
+            for rawPaper in rawDataset:
+                keys = RecordKeys(rawPaper)
+                if seen.isdisjoint(keys):
+                    fresh.append(rawPaper)
+                seen.update(keys)
+            dayCandidates, dayTexts = self._CandidateTexts(fresh)
+            if self.store is not None:
+                self.store.PutDay(day, dayCandidates, dayTexts)
+            spans[day] = (len(paperCandidates), len(paperCandidates) + len(dayCandidates))
+            paperCandidates += dayCandidates
+            paperTexts += dayTexts
+            metrics.Count("pipeline", "repeated_days", len(rawDataset) - len(fresh))
+        metrics.Count("pipeline", "candidates", len(paperCandidates))
+        return {"candidates": paperCandidates, "texts": paperTexts, "spans": spans}
+
+    # 补跑：按天各自初筛，保证每天都留足 M 篇
+    def _PrefilterDays(self, libraries, candidates, texts, spans) -> dict:
+        keep, shortSpans = self._Shortlist(libraries, candidates, texts, spans)
+        return {"shortlist": [candidates[i] for i in keep], "shortTexts": [texts[i] for i in keep], "shortSpans": shortSpans}
 
-        totalPapers = 0
-        paperTexts = []
-        paperCandidates = []
+    # 补跑：所有候选只嵌入、打分一次，按天（及整段）各取 Top-K
+    def _RankDays(self, profile, shortlist, shortTexts, shortSpans, combined) -> dict:
+        log.info(f'Embedding and ranking {len(shortTexts)} candidate papers across {len(shortSpans)} days...')
+        keep, spans = self._CoarseShortlist(profile, shortTexts, shortSpans)
+        candidates, texts = [shortlist[i] for i in keep], [shortTexts[i] for i in keep]
+        labels = list(spans) + ([_RangeLabel(list(spans))] if combined else [])
+        rankers = {label: self._Rankers(profile) for label in labels}
+        vectors, failed = np.zeros((len(texts), self.embedder.dimensions), dtype = np.float32), 0
+        for offset, embeddings, mask in self.embedder.EncodeChunks(texts, self.config.RANK_CHUNK_SIZE):
+            vectors[offset : offset + len(embeddings)] = embeddings
+            failed += int((~mask).sum())
+            for name, (scores, clusters) in profile.Score(embeddings).items():
+                for day, (lo, hi) in spans.items():
+                    a, b = max(lo, offset) - offset, min(hi, offset + len(scores)) - offset
+                    if a < b:
+                        rankers[day][name].PushScores(scores[a:b], clusters[a:b], offset + a, mask[a:b])
+                if combined:
+                    rankers[labels[-1]][name].PushScores(scores, clusters, offset, mask)
+        metrics.Count("pipeline", "embedding_failed", failed)
+        digests = {name: {label: self._Recommendations(candidates, rankers[label][name]) for label in labels} for name in profile.names}
+        for label in labels:
+            for name, ranker in rankers[label].items():
+                self._AttachRelated(digests[name][label], label if label in spans else list(spans)[0], vectors[ranker.Result()[0]])
+        metrics.Count("pipeline", "recommendations", sum(len(v) for byLabel in digests.values() for v in byLabel.values()))
+        return {"digests": digests, "ranked": candidates, "rankedTexts": texts, "rankedVectors": vectors}
+
+    # 归档：把排序阶段以完整维度嵌入的候选及其向量写入论文库与 ANN 索引（不再嵌入）
+    def _ArchivePapers(self, ranked, rankedTexts, rankedVectors) -> dict:
+        if self.index is None and self.store is None:
+            return {}
+        with metrics.Timer("archive.seconds"):
+            # rows that failed to embed are all-zero; the store and the index skip them
+            if self.store is not None:
+                stored = self.store.PutVectors(rankedTexts, rankedVectors)
+                metrics.Count("store", "vectors_added", stored)
+                log.info(f'Paper store: added {stored} vectors.')
+            if self.index is not None:
+                added = self.index.Append(ranked, rankedVectors, rankedTexts)
+                metrics.Count("index", "added", added)
+                log.info(f'Paper index: added {added} papers ({self.index.rows} in total).')
+        return {}
+
+    # 重排：从论文库读出某天的候选与向量，不联网
+    def _LoadDay(self, day) -> dict:
+        candidates, hit, vectors = self.store.Day(day)
+        if not candidates:
+            raise ValueError(f"The paper store has no candidates for {day}")
+        log.info(f'Loaded {len(candidates)} candidates of {day} from the paper store ({int(hit.sum())} with vectors).')
+        metrics.Count("pipeline", "candidates", len(candidates))
+        metrics.Count("store", "without_vectors", int((~hit).sum()))
+        return {"stored": [paper for paper, h in zip(candidates, hit.tolist()) if h], "storedVectors": vectors}
+
+    def _RankStored(self, day, profile, stored, storedVectors) -> dict:
+        rankers = self._Rankers(profile)
+        for name, (scores, clusters) in profile.Score(storedVectors).items():
+            rankers[name].PushScores(scores, clusters, 0)
+        paperRecommendations = {name: self._Recommendations(stored, ranker) for name, ranker in rankers.items()}
+        for name, ranker in rankers.items():
+            self._AttachRelated(paperRecommendations[name], day, storedVectors[ranker.Result()[0]])
+        metrics.Count("pipeline", "recommendations", sum(len(v) for v in paperRecommendations.values()))
+        return {"recommendations": paperRecommendations}
+
+    def _RenderDigests(self, days, digests) -> dict:
+        log.info(f'Rendering {sum(len(v) for v in digests.values())} digests...')
+        markdowns = {}
+        for name, byLabel in digests.items():
+            markdowns[name] = {}
+            for label, recommendations in byLabel.items():
+                if label in days:
+                    markdowns[name][label] = self.renderer.Render(label, recommendations, fileName = _FileName(f"daily_{label}", name))
+                else:
+                    markdowns[name][label] = self.renderer.Render(label, recommendations, heading = f"论文推荐汇总 — {days[0]} 至 {days[-1]}", fileName = _FileName(f"backfill_{label}", name))
+        return {"markdowns": markdowns}
+
+    def _MailDigests(self, days, markdowns, combined) -> dict:
+        labels = [_RangeLabel(days)] if combined else list(days)
+        log.info(f'Sending {len(labels) * len(self.recipients)} email(s)...')
+        for recipient in self.recipients:
+            for label in labels:
+                self.mailer.SendMarkdown(subject=f"[PaperLens] {label}", markdownText = markdowns[recipient.NAME][label], to = recipient.EMAIL_TO or None)
+        return {}
+
+    def _Shortlist(self, libraries, candidates, texts, spans) -> tuple[np.ndarray, dict]:
+        """Indices of the candidates worth embedding, and the spans remapped onto them.
+
+        Each profile fits its own Prefilter on its Zotero papers and keeps
+        max(PREFILTER_TOP_M, PREFILTER_MARGIN x its TOP_K) candidates per span; the
+        shortlist is the union. Candidates already in the embedding cache always pass.
+        """
+        config = self.config
+        if config.PREFILTER_TOP_M <= 0 or not candidates:
+            return np.arange(len(candidates)), dict(spans)
+        with metrics.Timer("prefilter.seconds"):
+            cached = self.embedder.Cached(texts)
+            chosen = np.zeros((len(candidates), ), dtype = bool)
+            for recipient in self.recipients:
+                papers = [paper for library in libraries[recipient.NAME] for paper in library.items.values()]
+                prefilter = Prefilter(
+                    venueWeight = config.PREFILTER_VENUE_WEIGHT,
+                    allow       = config.PREFILTER_ALLOW.split(","),
+                    deny        = config.PREFILTER_DENY.split(","),
+                ).Fit(papers)
+                keep = max(config.PREFILTER_TOP_M, int(np.ceil(config.PREFILTER_MARGIN * recipient.TOP_K)))
+                for lo, hi in spans.values():
+                    chosen[lo + prefilter.Select(candidates[lo : hi], keep, always = cached[lo : hi])] = True
+        keep = np.flatnonzero(chosen)
+        log.info(f'Prefilter kept {len(keep)} of {len(candidates)} candidates ({int(cached.sum())} already embedded).')
+        metrics.Count("prefilter", "kept", len(keep))
+        metrics.Count("prefilter", "dropped", len(candidates) - len(keep))
+        metrics.Count("prefilter", "cached", int(cached.sum()))
+        return keep, _Remap(keep, spans)
+
+    def _CoarseShortlist(self, profile, texts, spans) -> tuple[np.ndarray, dict]:
+        """Coarse-to-fine, first pass: score the cached candidates on their Matryoshka
+        prefix of RANK_COARSE_DIMENSIONS components, straight from the quantized cache
+        rows, and keep each profile's best max(RANK_COARSE_TOP_M, TOP_K) per span for
+        full-resolution rescoring. Uncached candidates skip it: they cost a full embedding
+        either way (the API bills input tokens, not output dimensions), so they go
+        straight to the fine pass and are embedded there once. A no-op unless the backend
+        is Matryoshka-trained and the cache holds more than M candidates of a span.
+        """
+        config, embedder = self.config, self.embedder
+        dimensions = config.RANK_COARSE_DIMENSIONS
+        topM = {recipient.NAME: max(config.RANK_COARSE_TOP_M, recipient.TOP_K) for recipient in self.recipients}
+        everything = np.arange(len(texts)), dict(spans)
+        if dimensions <= 0 or dimensions >= embedder.dimensions or not embedder.backend.nested or embedder.cache is None:
+            return everything
+        cached = embedder.Cached(texts)
+        rows = np.flatnonzero(cached)
+        cachedSpans = _Remap(rows, spans)
+        if all(hi - lo <= max(topM.values()) for lo, hi in cachedSpans.values()):
+            return everything
+        cachedTexts = [texts[i] for i in rows.tolist()]
+        coarse = profile.Truncate(dimensions)
+        rankers = {label: {name: TopKRanker(topM[name], model) for name, model in coarse.profiles.items()} for label in spans}
+        with metrics.Timer("rank.coarse"):
+            for offset in range(0, len(cachedTexts), max(1, config.RANK_CHUNK_SIZE)):
+                codes = embedder.EncodeQuantized(cachedTexts[offset : offset + config.RANK_CHUNK_SIZE], dimensions)
+                mask = codes.codes.any(axis = 1)        # all-zero rows failed to embed
+                for name, (scores, clusters) in coarse.Score(codes).items():
+                    for label, (lo, hi) in cachedSpans.items():
+                        a, b = max(lo, offset) - offset, min(hi, offset + len(scores)) - offset
+                        if a < b:
+                            rankers[label][name].PushScores(scores[a:b], clusters[a:b], offset + a, mask[a:b])
+        winners = np.unique(rows[np.concatenate([ranker.Result()[0] for byName in rankers.values() for ranker in byName.values()])])
+        keep = np.union1d(winners, np.flatnonzero(~cached))
+        log.info(f'Coarse pass ({dimensions}-d) kept {len(winners)} of {len(rows)} cached candidates; {len(texts) - len(rows)} uncached go straight to full-resolution scoring.')
+        metrics.Count("rank", "coarse_kept", len(keep))
+        return keep, _Remap(keep, spans)
+
+    def _AttachRelated(self, papers, day, queries) -> None:
+        """Give each pick the INDEX_RELATED closest indexed papers published in the
+        INDEX_RELATED_DAYS before `day` (paper["Related"]). queries: the picks' unit
+        vectors, as the rank stage computed them (nothing is embedded here)."""
+        if self.index is None or self.config.INDEX_RELATED <= 0 or not papers or self.index.rows == 0:
+            return
+        start = date.fromisoformat(day) - timedelta(days = self.config.INDEX_RELATED_DAYS)
+        with metrics.Timer("index.related"):
+            for paper, query in zip(papers, queries):
+                exclude = {d for d in [NormalizeDoi(paper.get("doi", ""))] if d}
+                paper["Related"] = self.index.Search(query, self.config.INDEX_RELATED, nprobe = self.config.INDEX_NPROBE, before = DayNumber(day), after = DayNumber(start.isoformat()), exclude = exclude)[0]
+
+    def _Rankers(self, profile) -> dict[str, TopKRanker]:
+        """One top-K ranker per profile, each with its recipient's TOP_K."""
+        topK = {recipient.NAME: recipient.TOP_K for recipient in self.recipients}
+        return {name: TopKRanker(topK[name], model) for name, model in profile.profiles.items()}
+
+    def _FetchKwargs(self) -> dict:
+        return {"OpenAlex":{"perPage":200,"maxPages":6}, "arXiv":{"categories":self.config.ARXIV_CATEGORIES}}
+
+    def _Recommendations(self, candidates, ranker) -> list[dict]:
+        """The ranker's top-K candidates, best first, with their similarity and profile cluster."""
+        rankOrder, paperSimilarity, paperCluster = ranker.Result()
+        paperRecommendations = []
+        for index, similarity, cluster in zip(rankOrder.tolist(), paperSimilarity.tolist(), paperCluster.tolist()):
+            paper = {**candidates[index]}
+            paper["Similarity"]=float(similarity)
+            paper["Cluster"]=int(cluster)
+            paper.setdefault("abstract", paper.get("abstract", ""))
+            paperRecommendations.append(paper)
+        if ranker.profile.k > 1:
+            log.info(f'Top-{len(rankOrder)} picks per profile cluster: {ranker.profile.Quotas(paperCluster)}')
+        return paperRecommendations
+
+    def _CandidateTexts(self, rawDataset) -> tuple[list[dict], list[str]]:
+        """Papers with a title or abstract, and the text each one is embedded as."""
+        paperCandidates, paperTexts = [], []
         for rawPaper in rawDataset:
             title        = rawPaper.get("title", "") or ""
             abstractNote = rawPaper.get("abstract", "") or ""
             if title.strip() == "" and abstractNote.strip() == "":
                 continue
-            
-            totalPapers += 1
             paperCandidates.append(rawPaper)
-            paperTexts.append(f"## 论文 {totalPapers}\n- 标题：{title}\n- 摘要：{abstractNote}")
-        
-        embeddings = self.embedder.Encode(paperTexts)
-        
-        # 4) 相似度打分
-        log.info(f'Ranking candidate papers...')
-        paperSimilarity = (embeddings @ personasVecs.T).ravel() if embeddings.size else np.zeros((0, ), dtype = np.float32)
-        rankOrder = np.argsort(paperSimilarity)[::-1][:self.config.TOP_K]
-        paperRecommendations = []
-        for index in rankOrder:
-            paper = {**paperCandidates[index]}
-            paper["Similarity"]=float(paperSimilarity[index])
-            paper.setdefault("abstract", paper.get("abstract", ""))
-            paperRecommendations.append(paper)
+            paperTexts.append(f"## 论文\n- 标题：{title}\n- 摘要：{abstractNote}")
+        return paperCandidates, paperTexts
 
-        # 5) （可选）Gemini 摘要/理由
-        # if self.ai and picks:
-        #     picks = self.ai.summarize_batch(picks, personasNote)
+    def _BuildProfile(self, libraries, personasVecs, name = "") -> ProfileModel:
+        """Mean-vector profile, or k spherical k-means centroids over the library when PROFILE_MODE is "centroids"."""
+        if self.config.PROFILE_MODE != "centroids":
+            return ProfileModel(personasVecs)
+        vectors = np.vstack([library.Vectors(self.embedder) for library in libraries] or [np.zeros((0, self.embedder.dimensions), dtype = np.float32)])
+        vectors = vectors[np.linalg.norm(vectors, axis = 1) > 0]
+        fingerprint = Fingerprint(
+            [(library.libraryType, library.libraryId, library.version) for library in libraries],
+            self.embedder.model, self.embedder.dimensions, self.config.PROFILE_CLUSTERS,
+        )
+        return BuildCentroidProfile(
+            vectors,
+            k           = self.config.PROFILE_CLUSTERS,
+            path        = os.path.join(self.config.ZOTERO_CACHE_DIR, _FileName("centroids", name) + ".npz"),
+            fingerprint = fingerprint,
+            reduce      = self.config.PROFILE_REDUCE,
+            temperature = self.config.PROFILE_TEMPERATURE,
+        )
+
+def _RangeLabel(days) -> str:
+    return f"{days[0]}_{days[-1]}"
+
+def OpenEmbedder(config, probe : bool = True) -> Embedder:
+    """The configured embedding backend behind the embedding cache."""
+    backend = OpenBackend(
+        config.EMBEDDING_BACKEND,
+        modelName         = config.EMBEDDING_MODEL,
+        lexicalDimensions = config.EMBEDDING_LEXICAL_DIMENSIONS,
+        lexicalStats      = config.EMBEDDING_LEXICAL_STATS,
+        probe             = probe,
+    )
+    embedder = Embedder(
+        config.EMBEDDING_MODEL,
+        backend       = backend,
+        cacheDir      = config.EMBEDDING_CACHE_DIR,
+        cacheMaxRows  = config.EMBEDDING_CACHE_MAX_ROWS,
+        cacheDtype    = config.EMBEDDING_CACHE_DTYPE,
+        cacheMaxAgeDays = config.EMBEDDING_CACHE_MAX_AGE_DAYS,
+        concurrency   = config.EMBEDDING_CONCURRENCY,
+        batchSize     = config.EMBEDDING_BATCH_SIZE,
+        maxBatchChars = config.EMBEDDING_BATCH_CHARS,
+        retries       = config.EMBEDDING_RETRIES,
+        breaker       = config.EMBEDDING_BREAKER,
+    )
+    if embedder.cache is not None and config.EMBEDDING_CACHE_RESET:
+        embedder.cache.Invalidate()
+    return embedder
+
+def OpenIndex(config, embedder) -> PaperIndex | None:
+    """The historical paper index for the embedder's vector space; None when INDEX_DIR is empty."""
+    if not config.INDEX_DIR:
+        return None
+    return PaperIndex(config.INDEX_DIR, model = embedder.space, dimensions = embedder.dimensions, dtype = config.INDEX_DTYPE, maxSegments = config.INDEX_MAX_SEGMENTS)
+
+def OpenStore(config, embedder) -> PaperStore | None:
+    """The local paper store for the embedder's vector space; None when PAPER_STORE_DIR is empty."""
+    if not config.PAPER_STORE_DIR:
+        return None
+    return PaperStore(config.PAPER_STORE_DIR, model = embedder.space, dimensions = embedder.dimensions, dtype = config.PAPER_STORE_DTYPE)
+
+def _Remap(keep, spans) -> dict:
+    """Spans over the full candidate list -> spans over the sorted subset `keep`."""
+    return {label: tuple(int(x) for x in np.searchsorted(keep, (lo, hi))) for label, (lo, hi) in spans.items()}
 
-        # 6) 渲染 + 邮件
-        log.info(f'Rendering markdown and sending email...')
-        markdown = self.renderer.Render(day, paperRecommendations)
-        self.mailer.SendMarkdown(subject=f"[PaperLens] {day}", markdownText = markdown)
+def _FileName(stem, name) -> str:
+    """Per-profile output/cache file stem; the unnamed single profile keeps the plain stem."""
+    return f"{stem}_{name}" if name else stem
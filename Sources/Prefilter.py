@@ -0,0 +1,121 @@
+# Sources/Prefilter.py
+import re
+import logging
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+_TOKENS = re.compile(r"\w\w+")
+
+def Tokens(text: str) -> list[str]:
+    return _TOKENS.findall((text or "").lower())
+
+def VenueKey(venue: str) -> str:
+    return re.sub(r"\s+", " ", (venue or "").strip().lower())
+
+class Prefilter:
+    """Cheap local relevance score that decides which candidates are worth a paid embedding.
+
+    Fit() learns from the Zotero library:
+      - term weights: the fraction of library papers that use each term; the library acts
+        as one long weighted BM25 query against the candidate pool
+      - venue log-odds: how much more often a venue (journal, proceedings, or an arXiv
+        primary category, which ArxivSource reports as the venue) appears in the library
+        than in the candidate pool, add-one smoothed
+    Score() = z-scored BM25 + venueWeight * clipped venue log-odds. `allow` / `deny` are
+    substring rules over the venue that force a candidate in or out.
+    """
+    def __init__(self, *, venueWeight: float = 1.0, allow: list[str] | None = None, deny: list[str] | None = None, k1: float = 1.2, b: float = 0.75):
+        self.venueWeight = float(venueWeight)
+        self.allow = [VenueKey(v) for v in (allow or []) if v.strip()]
+        self.deny  = [VenueKey(v) for v in (deny or []) if v.strip()]
+        self.k1, self.b = float(k1), float(b)
+        self.queryWeights: dict[str, float] = {}
+        self.libraryVenues: dict[str, int] = {}
+        self.libraryCount = 0
+
+    def Fit(self, papers: list[dict]) -> "Prefilter":
+        """papers: library items with "title", "abstract" and (optionally) "venue"."""
+        df: dict[str, int] = {}
+        venues: dict[str, int] = {}
+        for paper in papers:
+            for term in set(Tokens(f'{paper.get("title", "")} {paper.get("abstract", "")}')):
+                df[term] = df.get(term, 0) + 1
+            venue = VenueKey(paper.get("venue", ""))
+            if venue:
+                venues[venue] = venues.get(venue, 0) + 1
+        self.libraryCount = len(papers)
+        self.queryWeights = {term: count / max(1, self.libraryCount) for term, count in df.items()}
+        self.libraryVenues = venues
+        return self
+
+    @property
+    def fitted(self) -> bool:
+        return bool(self.queryWeights)
+
+    def Score(self, candidates: list[dict]) -> np.ndarray:
+        n = len(candidates)
+        if n == 0 or not self.fitted:
+            return np.zeros((n, ), dtype = np.float32)
+
+        # pool vocabulary restricted to library terms: only those can contribute to the score
+        termId = {term: i for i, term in enumerate(self.queryWeights)}
+        rows, cols, lengths = [], [], np.zeros((n, ), dtype = np.float32)
+        for i, paper in enumerate(candidates):
+            tokens = Tokens(f'{paper.get("title", "")} {paper.get("abstract", "")}')
+            lengths[i] = len(tokens)
+            ids = [termId[t] for t in tokens if t in termId]
+            rows.extend([i] * len(ids))
+            cols.extend(ids)
+        pairs, tf = np.unique(np.asarray(rows, dtype = np.int64) * len(termId) + np.asarray(cols, dtype = np.int64), return_counts = True)
+        docs, terms = pairs // len(termId), pairs % len(termId)
+
+        df = np.bincount(terms, minlength = len(termId)).astype(np.float32)
+        idf = np.log1p((n - df + 0.5) / (df + 0.5))
+        weights = np.fromiter(self.queryWeights.values(), dtype = np.float32, count = len(termId))
+        avgLen = max(1.0, float(lengths.mean()))
+        norm = self.k1 * (1 - self.b + self.b * lengths[docs] / avgLen)
+        contrib = weights[terms] * idf[terms] * tf * (self.k1 + 1) / (tf + norm)
+        bm25 = np.bincount(docs, weights = contrib, minlength = n).astype(np.float32)
+        score = (bm25 - bm25.mean()) / (bm25.std() + 1e-9)
+
+        if self.venueWeight and self.libraryVenues:
+            score += self.venueWeight * self._VenueLogOdds(candidates)
+        return score.astype(np.float32)
+
+    def Select(self, candidates: list[dict], keep: int, *, always: np.ndarray | None = None) -> np.ndarray:
+        """Sorted indices of the candidates to forward: the `keep` best scores, plus
+        `always` (e.g. already-embedded rows, which cost nothing) and allow-listed venues,
+        minus deny-listed venues. Everything passes while the filter is unfitted."""
+        n = len(candidates)
+        if not self.fitted or keep >= n:
+            chosen = np.ones((n, ), dtype = bool)
+        else:
+            scores = self.Score(candidates)
+            chosen = np.zeros((n, ), dtype = bool)
+            chosen[np.argpartition(-scores, keep - 1)[:keep] if keep > 0 else []] = True
+        if always is not None:
+            chosen |= always
+        for i, paper in enumerate(candidates):
+            venue = VenueKey(paper.get("venue", ""))
+            if venue and any(rule in venue for rule in self.deny):
+                chosen[i] = False
+            elif venue and any(rule in venue for rule in self.allow):
+                chosen[i] = True
+        return np.flatnonzero(chosen)
+
+    def _VenueLogOdds(self, candidates: list[dict]) -> np.ndarray:
+        venues = [VenueKey(paper.get("venue", "")) for paper in candidates]
+        pool: dict[str, int] = {}
+        for venue in venues:
+            pool[venue] = pool.get(venue, 0) + 1
+        vocabulary = len(set(pool) | set(self.libraryVenues)) + 1
+        libraryTotal, poolTotal = sum(self.libraryVenues.values()), len(candidates)
+        odds = np.zeros((len(candidates), ), dtype = np.float32)
+        for i, venue in enumerate(venues):
+            if not venue:
+                continue
+            inLibrary = (self.libraryVenues.get(venue, 0) + 1) / (libraryTotal + vocabulary)
+            inPool    = (pool[venue] + 1) / (poolTotal + vocabulary)
+            odds[i] = np.log(inLibrary / inPool)
+        return np.clip(odds, -3.0, 3.0)
@@ -0,0 +1,143 @@
+# Sources/Profile.py
+import os
+import json
+import hashlib
+import logging
+import numpy as np
+
+from .Quantize import Quantized, Truncate, Dot
+
+log = logging.getLogger(__name__)
+
+def SphericalKMeans(vectors: np.ndarray, k: int, iters: int = 25, seed: int = 0, init: np.ndarray | None = None) -> np.ndarray:
+    """Cluster unit vectors by cosine similarity; returns (k', d) unit centroids, k' = min(k, N).
+
+    k-means++ seeding (or `init`, e.g. last run's centroids), then Lloyd iterations
+    where each centroid is the renormalized sum of its members. An empty cluster is
+    re-seeded with the point worst served by the current centroids.
+    """
+    X = np.asarray(vectors, dtype = np.float32)
+    n = X.shape[0]
+    k = max(1, min(int(k), n))
+    rng = np.random.default_rng(seed)
+
+    if init is not None and init.shape == (k, X.shape[1]):
+        C = init.astype(np.float32, copy = True)
+    else:
+        C = np.empty((k, X.shape[1]), dtype = np.float32)
+        C[0] = X[rng.integers(n)]
+        best = X @ C[0]
+        for j in range(1, k):
+            dist = np.clip(1.0 - best, 0.0, None)
+            total = dist.sum()
+            C[j] = X[rng.choice(n, p = dist / total)] if total > 0 else X[rng.integers(n)]
+            best = np.maximum(best, X @ C[j])
+
+    assign = None
+    for _ in range(iters):
+        S = X @ C.T
+        newAssign = S.argmax(axis = 1)
+        if assign is not None and np.array_equal(newAssign, assign):
+            break
+        assign = newAssign
+        oneHot = np.zeros((n, k), dtype = np.float32)
+        oneHot[np.arange(n), assign] = 1.0
+        sums = oneHot.T @ X
+        empty = np.flatnonzero(oneHot.sum(axis = 0) == 0)
+        if empty.size:
+            worst = np.argsort(S[np.arange(n), assign])[:empty.size]
+            sums[empty], assign[worst] = X[worst], empty
+        C = sums / (np.linalg.norm(sums, axis = 1, keepdims = True) + 1e-9)
+    return C
+
+class ProfileModel:
+    """A user profile as k unit centroids; k = 1 is the classic mean-vector profile.
+
+    Score() is one (N x d)·(d x k) matmul followed by a reduction across centroids:
+      "max"     - similarity to the closest centroid
+      "softmax" - temperature-smoothed max, T * log(mean(exp(s / T)))
+    """
+    def __init__(self, centroids: np.ndarray, *, reduce: str = "max", temperature: float = 0.05, sizes: np.ndarray | None = None):
+        self.centroids   = np.asarray(centroids, dtype = np.float32).reshape(-1, centroids.shape[-1])
+        self.reduce      = reduce
+        self.temperature = float(temperature)
+        self.sizes       = sizes if sizes is not None else np.ones(len(self.centroids), dtype = np.int64)
+
+    @property
+    def k(self) -> int:
+        return self.centroids.shape[0]
+
+    def Score(self, embeddings: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Return (score per candidate, index of its best centroid)."""
+        if embeddings.size == 0:
+            return np.zeros((0, ), dtype = np.float32), np.zeros((0, ), dtype = np.int64)
+        return self.Reduce(embeddings @ self.centroids.T)
+
+    def Reduce(self, S: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """(score, best centroid) per row of the (N x k) centroid similarities S."""
+        best = S.argmax(axis = 1)
+        if self.k == 1 or self.reduce == "max":
+            return S[np.arange(S.shape[0]), best], best
+        T = self.temperature
+        top = S[np.arange(S.shape[0]), best]
+        scores = top + T * np.log(np.exp((S - top[:, None]) / T).mean(axis = 1))
+        return scores.astype(np.float32), best
+
+    def Quotas(self, clusters: np.ndarray) -> dict[int, int]:
+        """How many of the given (top-K) picks fall under each centroid."""
+        counts = np.bincount(clusters, minlength = self.k) if clusters.size else np.zeros(self.k, dtype = np.int64)
+        return {int(j): int(c) for j, c in enumerate(counts)}
+
+class ProfileSet:
+    """Several users' profiles scored together.
+
+    All centroids are stacked into one (d x sum k) matrix, so each candidate chunk
+    costs a single (N x d)·(d x P) matmul however many profiles there are; each
+    profile then reduces its own column slice.
+    """
+    def __init__(self, profiles: dict[str, ProfileModel]):
+        self.profiles = profiles
+        self.names    = list(profiles)
+        self.stacked  = np.vstack([p.centroids for p in profiles.values()]).T if profiles else np.zeros((0, 0), dtype = np.float32)
+        self.bounds   = np.cumsum([0] + [p.k for p in profiles.values()]).tolist()
+
+    def Score(self, embeddings: np.ndarray | Quantized) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+        """{name: (score per candidate, index of its best centroid in that profile)}.
+
+        Quantized embeddings are scored in storage form (Quantize.Dot), as unit vectors.
+        """
+        if len(embeddings) == 0:
+            return {name: profile.Score(np.zeros((0, self.stacked.shape[0]), dtype = np.float32)) for name, profile in self.profiles.items()}
+        S = Dot(embeddings, self.stacked) if isinstance(embeddings, Quantized) else embeddings @ self.stacked
+        return {name: self.profiles[name].Reduce(S[:, lo:hi]) for name, lo, hi in zip(self.names, self.bounds, self.bounds[1:])}
+
+    def Truncate(self, dimensions: int) -> "ProfileSet":
+        """The same profiles with Matryoshka-truncated centroids, for a coarse first pass."""
+        return ProfileSet({name: ProfileModel(Truncate(p.centroids, dimensions), reduce = p.reduce, temperature = p.temperature, sizes = p.sizes) for name, p in self.profiles.items()})
+
+def BuildCentroidProfile(vectors: np.ndarray, *, k: int, path: str, fingerprint: str, reduce: str = "max", temperature: float = 0.05) -> ProfileModel:
+    """Cluster library embeddings into k centroids, persisted at `path` (.npz).
+
+    The stored centroids are reused as-is while `fingerprint` (library versions,
+    model, k) is unchanged, and used as the warm start when it changes.
+    """
+    previous = None
+    if os.path.exists(path):
+        stored = np.load(path)
+        if str(stored["fingerprint"]) == fingerprint:
+            log.info(f"Reusing {stored['centroids'].shape[0]} persisted profile centroids.")
+            return ProfileModel(stored["centroids"], reduce = reduce, temperature = temperature, sizes = stored["sizes"])
+        previous = stored["centroids"]
+
+    if vectors.shape[0] == 0:
+        return ProfileModel(np.zeros((1, vectors.shape[1]), dtype = np.float32), reduce = reduce, temperature = temperature)
+
+    centroids = SphericalKMeans(vectors, k, init = previous)
+    sizes = np.bincount((vectors @ centroids.T).argmax(axis = 1), minlength = centroids.shape[0])
+    os.makedirs(os.path.dirname(path) or ".", exist_ok = True)
+    np.savez(path, centroids = centroids, sizes = sizes, fingerprint = np.array(fingerprint))
+    log.info(f"Clustered {vectors.shape[0]} library papers into {centroids.shape[0]} profile centroids (sizes {sizes.tolist()}).")
+    return ProfileModel(centroids, reduce = reduce, temperature = temperature, sizes = sizes)
+
+def Fingerprint(*parts) -> str:
+    return hashlib.sha1(json.dumps(parts, sort_keys = True, default = str).encode("utf-8")).hexdigest()
@@ -0,0 +1,53 @@
+# Sources/Quantize.py
+import numpy as np
+from typing import NamedTuple
+
+DTYPES = {"float32": np.float32, "float16": np.float16, "int8": np.int8}
+
+class Quantized(NamedTuple):
+    """Vectors in storage form: row i is codes[i] * scales[i].
+
+    float32 / float16 codes carry unit scales; int8 codes are symmetric per-vector
+    quantization, scale = max|v| / 127 (12 KB -> 3 KB per 3072-d vector).
+    """
+    codes  : np.ndarray
+    scales : np.ndarray
+
+    def __len__(self) -> int:
+        return self.codes.shape[0]
+
+def Quantize(vectors: np.ndarray, dtype: str = "int8") -> Quantized:
+    vectors = np.asarray(vectors, dtype = np.float32)
+    if dtype not in DTYPES:
+        raise ValueError(f"Unknown vector dtype {dtype!r}; expected one of {', '.join(DTYPES)}")
+    if dtype != "int8":
+        return Quantized(vectors.astype(DTYPES[dtype]), np.ones((vectors.shape[0], ), dtype = np.float32))
+    scales = np.abs(vectors).max(axis = 1) / 127.0 if vectors.size else np.zeros((vectors.shape[0], ), dtype = np.float32)
+    scales = np.where(scales > 0, scales, 1.0).astype(np.float32)
+    codes  = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return Quantized(codes, scales)
+
+def Dequantize(q: Quantized, dimensions: int | None = None) -> np.ndarray:
+    """float32 vectors, optionally only their leading `dimensions` components."""
+    codes = q.codes if dimensions is None else q.codes[:, :dimensions]
+    return codes.astype(np.float32) * q.scales[:, None]
+
+def Truncate(vectors: np.ndarray, dimensions: int) -> np.ndarray:
+    """Matryoshka prefix: the leading `dimensions` components, renormalized to unit length."""
+    prefix = np.asarray(vectors, dtype = np.float32)[:, :dimensions]
+    return prefix / (np.linalg.norm(prefix, axis = 1, keepdims = True) + 1e-9)
+
+def Dot(q: Quantized, matrix: np.ndarray, normalize: bool = True) -> np.ndarray:
+    """(N x m) dot products of quantized rows with a (d' x m) matrix, d' <= d, using
+    only the rows' leading d' components and without dequantizing them first.
+
+    With normalize=True each row prefix is treated as a unit vector (the cosine
+    against a Matryoshka-truncated profile); the per-vector scale then cancels out.
+    """
+    codes = q.codes[:, :matrix.shape[0]].astype(np.float32)
+    S = codes @ matrix
+    if normalize:
+        S /= (np.linalg.norm(codes, axis = 1, keepdims = True) + 1e-9)
+    else:
+        S *= q.scales[:, None]
+    return S
@@ -0,0 +1,51 @@
+# Sources/Ranker.py
+import numpy as np
+
+from .Profile import ProfileModel
+
+class TopKRanker:
+    """Streaming, bounded-memory top-K over candidate embeddings.
+
+    Push() scores one chunk against the profile and merges it into the running
+    top-K, so the chunk can be dropped right away: peak memory is O(chunk + K) rows
+    and each merge sorts only chunk + K scores. Ties are broken on candidate index,
+    so the result does not depend on chunking.
+    """
+    def __init__(self, k: int, profile: ProfileModel):
+        self.k       = max(0, int(k))
+        self.profile = profile
+        self.seen    = 0
+
+        self._index    = np.zeros((0, ), dtype = np.int64)
+        self._scores   = np.zeros((0, ), dtype = np.float32)
+        self._clusters = np.zeros((0, ), dtype = np.int64)
+
+    def Push(self, embeddings: np.ndarray, offset: int) -> None:
+        """Score rows [offset, offset + len(embeddings)) of the candidate list."""
+        if embeddings.shape[0] == 0 or self.k == 0:
+            self.seen += embeddings.shape[0]
+            return
+        self.PushScores(*self.profile.Score(embeddings), offset)
+
+    def PushScores(self, scores: np.ndarray, clusters: np.ndarray, offset: int, mask: np.ndarray | None = None) -> None:
+        """Like Push, for rows already scored against the profile (one Score shared by several rankers).
+        mask: rows to consider; the others (e.g. texts that failed to embed) are dropped."""
+        self.seen += scores.shape[0]
+        if scores.shape[0] == 0 or self.k == 0:
+            return
+        index = offset + np.arange(scores.shape[0], dtype = np.int64)
+        if mask is not None:
+            index, scores, clusters = index[mask], scores[mask], clusters[mask]
+        index    = np.concatenate([self._index, index])
+        scores   = np.concatenate([self._scores, scores.astype(np.float32)])
+        clusters = np.concatenate([self._clusters, clusters.astype(np.int64)])
+        if scores.shape[0] > self.k:
+            # full order rather than argpartition, so ties at the cut go to the earlier candidate
+            keep = np.lexsort((index, -scores))[:self.k]
+            index, scores, clusters = index[keep], scores[keep], clusters[keep]
+        self._index, self._scores, self._clusters = index, scores, clusters
+
+    def Result(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(candidate indices, scores, clusters), best first; ties go to the earlier candidate."""
+        order = np.lexsort((self._index, -self._scores))
+        return self._index[order], self._scores[order], self._clusters[order]
@@ -0,0 +1,135 @@
+# Sources/ResponseCache.py
+import os
+import gzip
+import json
+import time
+import hashlib
+import logging
+from datetime import datetime, timezone
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+log = logging.getLogger(__name__)
+
+IMMUTABLE = float("inf")
+
+# Query parameters that identify the caller rather than the content; left out of the key
+# so a rotated API key does not invalidate the cache (and never ends up in a file name).
+SECRET_PARAMS = {"api_key", "apikey", "key", "token", "access_token", "mailto", "email"}
+
+# Response headers worth keeping: content decoding plus what callers and revalidation read.
+KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Last-Modified-Version", "Total-Results", "Link")
+
+def NormalizedUrl(url: str, params: dict | None = None) -> str:
+    """URL with params merged into the query, sorted, secrets dropped, scheme/host lowercased."""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values = True)
+    for name, value in (params or {}).items():
+        values = value if isinstance(value, (list, tuple)) else [value]
+        query.extend((name, "" if v is None else str(v)) for v in values)
+    query = sorted((k, v) for k, v in query if k.lower() not in SECRET_PARAMS)
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", urlencode(query), ""))
+
+def WindowTtl(nextDay: str, openTtl: float) -> float:
+    """IMMUTABLE once [day, nextDay) has closed in UTC, else openTtl seconds."""
+    today = datetime.now(timezone.utc).date().isoformat()
+    return IMMUTABLE if nextDay and nextDay <= today else openTtl
+
+class ResponseCache:
+    """Gzipped GET responses on disk, keyed by the normalized request URL.
+
+    Each entry is <root>/<k[:2]>/<k>.gz holding one JSON header line (url, status,
+    kept headers, stored time) followed by the raw body. Entries younger than the
+    caller's TTL are served without touching the network; older ones that carry an
+    ETag or Last-Modified are revalidated with a conditional request, and a 304
+    refreshes them in place. Files untouched for `retentionDays` are pruned.
+    """
+    def __init__(self, root: str, *, retentionDays: float = 14):
+        self.root      = root
+        self.retention = float(retentionDays) * 86400
+        self.hits = self.revalidated = self.misses = 0
+        os.makedirs(root, exist_ok = True)
+        self._Prune()
+
+    def Key(self, url: str, params: dict | None = None) -> str:
+        return hashlib.sha256(NormalizedUrl(url, params).encode("utf-8")).hexdigest()
+
+    def Load(self, key: str) -> tuple[dict, bytes] | None:
+        try:
+            with gzip.open(self._Path(key), "rb") as f:
+                header = json.loads(f.readline())
+                return header, f.read()
+        except (OSError, EOFError, ValueError):
+            return None
+
+    def Store(self, key: str, r: requests.Response) -> None:
+        header = {
+            "url"     : r.url,
+            "status"  : r.status_code,
+            "encoding": r.encoding,
+            "headers" : {h: r.headers[h] for h in KEPT_HEADERS if h in r.headers},
+            "stored"  : time.time(),
+        }
+        self._Write(key, header, r.content)
+
+    def Touch(self, key: str, header: dict, body: bytes, r: requests.Response) -> None:
+        """Record a 304: the stored body is current as of now (validators may be refreshed)."""
+        header["stored"] = time.time()
+        header["headers"].update({h: r.headers[h] for h in ("ETag", "Last-Modified") if h in r.headers})
+        self._Write(key, header, body)
+
+    @staticmethod
+    def Fresh(header: dict, ttl: float) -> bool:
+        return ttl == IMMUTABLE or time.time() - float(header.get("stored", 0)) < ttl
+
+    @staticmethod
+    def Validators(header: dict) -> dict:
+        headers = header.get("headers") or {}
+        conditional = {}
+        if "ETag" in headers:
+            conditional["If-None-Match"] = headers["ETag"]
+        if "Last-Modified" in headers:
+            conditional["If-Modified-Since"] = headers["Last-Modified"]
+        return conditional
+
+    @staticmethod
+    def Response(header: dict, body: bytes) -> requests.Response:
+        """Rebuild a requests.Response, so callers' .json()/.text/raise_for_status() work unchanged."""
+        r = requests.Response()
+        r.status_code = int(header.get("status", 200))
+        r.url         = header.get("url", "")
+        r.encoding    = header.get("encoding")
+        r.headers     = CaseInsensitiveDict(header.get("headers") or {})
+        r.reason      = "OK (cached)"
+        r._content    = body
+        r._content_consumed = True      # body in memory: iter_content() slices it instead of reading a socket
+        return r
+
+    # ---- storage ----
+    def _Path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.gz")
+
+    def _Write(self, key: str, header: dict, body: bytes):
+        path = self._Path(key)
+        os.makedirs(os.path.dirname(path), exist_ok = True)
+        tmp = f"{path}.{os.getpid()}.{id(body)}.tmp"
+        with gzip.open(tmp, "wb", compresslevel = 6) as f:
+            f.write(json.dumps(header).encode("utf-8") + b"\n")
+            f.write(body)
+        os.replace(tmp, path)
+
+    def _Prune(self):
+        cutoff, removed = time.time() - self.retention, 0
+        for dirpath, _, files in os.walk(self.root):
+            for name in files:
+                path = os.path.join(dirpath, name)
+                try:
+                    if name.endswith(".tmp") or os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        removed += 1
+                except OSError:
+                    pass
+        if removed:
+            log.info(f"HTTP cache: pruned {removed} expired responses.")
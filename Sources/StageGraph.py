@@ -0,0 +1,134 @@
+# Sources/StageGraph.py
+import time
+import logging
+import threading
+import contextvars
+from dataclasses import dataclass, field
+from typing import Any, Callable
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+log = logging.getLogger(__name__)
+
+# The abort flag of the graph whose stage the current thread is running (see CheckAbort).
+_abort: contextvars.ContextVar[threading.Event | None] = contextvars.ContextVar("stage_abort", default = None)
+
+class StageAborted(RuntimeError):
+    """Raised inside a stage once another stage of its graph has failed."""
+
+def CheckAbort() -> None:
+    """Raise StageAborted if another stage of the running graph has failed. Long-running
+    loops (source fetches, Zotero pages, embedding batches) call this between units of
+    work, so a failure elsewhere stops them before they spend more time or quota."""
+    event = _abort.get()
+    if event is not None and event.is_set():
+        raise StageAborted("another stage failed")
+
+@dataclass
+class Stage:
+    """One named step: fn(**inputs) -> {output name: value}."""
+    name    : str
+    fn      : Callable[..., dict]
+    inputs  : tuple[str, ...] = ()
+    outputs : tuple[str, ...] = ()
+
+@dataclass
+class StageGraph:
+    """Runs a DAG of stages, starting every stage as soon as its inputs exist.
+
+    Each stage gets its own thread, so independent stages overlap and end-to-end
+    latency approaches the critical path. The first stage error is re-raised at once:
+    the graph sets its abort flag (which running stages poll through CheckAbort) and
+    does not wait for the stages in flight.
+
+    With `checkpoints` (see Checkpoint.Checkpoints), every stage saves its outputs when
+    it finishes, and on resume a stage whose checkpoint key still matches is restored
+    instead of run.
+    """
+    stages  : list[Stage]
+    timings : dict[str, float] = field(default_factory = dict)
+    checkpoints : Any = None
+
+    def __post_init__(self):
+        self._Validate()
+
+    def _Validate(self):
+        producer: dict[str, str] = {}
+        for st in self.stages:
+            for name in st.outputs:
+                if name in producer:
+                    raise ValueError(f"'{name}' is produced by both {producer[name]} and {st.name}")
+                producer[name] = st.name
+        # Kahn's algorithm
+        deps = {st.name: {producer[i] for i in st.inputs if i in producer} for st in self.stages}
+        done: set[str] = set()
+        while len(done) < len(deps):
+            ready = [n for n, d in deps.items() if n not in done and d <= done]
+            if not ready:
+                raise ValueError(f"stage graph has a cycle among {sorted(set(deps) - done)}")
+            done.update(ready)
+
+    def Run(self, initial: dict | None = None) -> dict:
+        values = dict(initial or {})
+        # content fingerprints of every value, which make up the checkpoint keys
+        fingerprints = {}
+        if self.checkpoints is not None:
+            from .Checkpoint import ValueFingerprint
+            fingerprints = {name: ValueFingerprint(value) for name, value in (initial or {}).items()}
+
+        abort = threading.Event()
+
+        def call(st: Stage) -> tuple[dict, dict]:
+            token = _abort.set(abort)
+            try:
+                return run(st)
+            finally:
+                _abort.reset(token)
+
+        def run(st: Stage) -> tuple[dict, dict]:
+            start = time.monotonic()
+            kwargs = {i: values[i] for i in st.inputs}
+            key = None
+            if self.checkpoints is not None:
+                key = self.checkpoints.Key(st.name, {i: fingerprints[i] for i in st.inputs})
+                restored = self.checkpoints.Load(st.name, key)
+                if restored is not None:
+                    self.timings[st.name] = time.monotonic() - start
+                    log.info(f"Stage {st.name} restored from checkpoint")
+                    return restored
+            try:
+                result = st.fn(**kwargs) or {}
+            finally:
+                self.timings[st.name] = time.monotonic() - start
+            log.info(f"Stage {st.name} finished in {self.timings[st.name]:.1f}s")
+            if key is None:
+                return result, {o: None for o in st.outputs}
+            return result, self.checkpoints.Save(st.name, key, {o: result[o] for o in st.outputs if o in result})
+
+        remaining = list(self.stages)
+        pending: dict = {}
+        pool = ThreadPoolExecutor(max_workers = max(1, len(self.stages)), thread_name_prefix = "stage")
+        try:
+            while remaining or pending:
+                for st in [st for st in remaining if all(i in values for i in st.inputs)]:
+                    remaining.remove(st)
+                    pending[pool.submit(call, st)] = st
+                if not pending:
+                    missing = sorted({i for st in remaining for i in st.inputs if i not in values})
+                    raise ValueError(f"stages {[st.name for st in remaining]} wait on values nobody produces: {missing}")
+                finished, _ = wait(pending, return_when = FIRST_COMPLETED)
+                for fut in finished:
+                    st = pending.pop(fut)
+                    result, outputFingerprints = fut.result()
+                    missing = [o for o in st.outputs if o not in result]
+                    if missing:
+                        raise ValueError(f"stage {st.name} did not return {missing}")
+                    values.update({o: result[o] for o in st.outputs})
+                    fingerprints.update(outputFingerprints)
+        except BaseException:
+            abort.set()
+            if pending:
+                log.error(f"Aborting stages still running: {', '.join(st.name for st in pending.values())}")
+            pool.shutdown(wait = False, cancel_futures = True)
+            raise
+        pool.shutdown()
+        return values
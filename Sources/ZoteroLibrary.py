@@ -0,0 +1,254 @@
+# Sources/ZoteroLibrary.py
+import os
+import json
+import hashlib
+import logging
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .HttpClient import http
+from .EmbeddingCache import TextKey
+from .StageGraph import CheckAbort
+
+log = logging.getLogger(__name__)
+
+ZOTERO_API = "https://api.zotero.org"
+PAGE_LIMIT = 100                    # server-side cap on items per page
+
+# Only the item JSON's `data` block, and no attachments; notes are dropped client-side
+# (they have no title/abstractNote).
+ITEM_PROJECTION = {"format": "json", "include": "data", "itemType": "-attachment"}
+
+class ZoteroLibrary:
+    """Local mirror of one Zotero library plus its incrementally maintained profile vector.
+
+    Sync() asks only for what changed since the stored library version
+    (`since=<version>` on /items/top and /deleted, `Last-Modified-Version` header);
+    an unchanged library answers the first page with 304 (If-Modified-Since-Version).
+    Sync requests never go through the HTTP response cache, which would replay a
+    stale answer within its TTL.
+    Profile() re-embeds only items whose text differs from what was embedded and keeps
+    the profile as a running sum of per-item vectors, so unchanged items are never
+    re-downloaded or re-embedded.
+
+    Files under <root>/<libraryType>_<libraryId>/:
+      state.json            - library version and {itemKey: {version, title, abstract, venue}}
+      vectors/<space>/      - one set per embedding model, side by side, so switching
+                              backends (e.g. a degraded lexical run) never discards another's:
+        vectors.npy         - one normalized embedding per item in profile.json["keys"] order
+        profile.json        - model/dimensions, row keys, TextKey of each row's text, running sum
+    """
+    def __init__(self, root: str, *, libraryId: str, apiKey: str, libraryType: str = "users", workers: int = 8):
+        self.libraryType = libraryType
+        self.libraryId   = str(libraryId)
+        self.apiKey      = apiKey or ""
+        self.workers     = max(1, int(workers))
+        self.dir         = os.path.join(root, f"{libraryType}_{self.libraryId}")
+
+        self.version = 0
+        self.items: dict[str, dict] = {}
+        self._LoadState()
+
+    def __getstate__(self) -> dict:
+        # pickled into stage checkpoints: keep the API key out of them
+        return {**self.__dict__, "apiKey": ""}
+
+    # ---- sync ----
+    def Sync(self) -> tuple[int, int]:
+        """Pull changes since the stored version. Returns (#added or changed, #deleted)."""
+        headers = {"Zotero-API-Key": self.apiKey, "Zotero-API-Version": "3"}
+        if self.version:
+            headers["If-Modified-Since-Version"] = str(self.version)
+        base    = f"{ZOTERO_API}/{self.libraryType}/{self.libraryId}"
+
+        changed, newVersion = 0, self.version
+        params = {**ITEM_PROJECTION, "since": self.version, "includeTrashed": 1}
+        for page, pageVersion in self._FetchPages(f"{base}/items/top", params, headers):
+            newVersion = max(newVersion, pageVersion)
+            for paper in page:
+                changed += self._Apply(paper)
+
+        deleted = 0
+        if self.version and newVersion > self.version:
+            r = http.Get(f"{base}/deleted", params = {"since": self.version}, headers = headers, timeout = 60)
+            r.raise_for_status()
+            for key in (r.json() or {}).get("items", []):
+                if self.items.pop(key, None) is not None:
+                    deleted += 1
+
+        self.version = newVersion
+        self._SaveState()
+        log.info(f"Zotero {self.libraryType}/{self.libraryId} synced to version {self.version}: {changed} added/changed, {deleted} deleted, {len(self.items)} papers.")
+        return changed, deleted
+
+    def _FetchPages(self, url: str, params: dict, headers: dict):
+        """Yield (items, Last-Modified-Version) per page, as each page arrives.
+
+        The first page's Total-Results header tells how many pages there are; the
+        rest are then requested concurrently. A 304 (library unchanged) yields nothing.
+        """
+        def fetch(start: int):
+            r = http.Get(url, params = {**params, "limit": PAGE_LIMIT, "start": start}, headers = headers, timeout = 60)
+            if r.status_code == 304:
+                return None
+            r.raise_for_status()
+            return r.json(), int(r.headers.get("Last-Modified-Version", 0)), int(r.headers.get("Total-Results", 0))
+
+        first = fetch(0)
+        if first is None:
+            return
+        page, version, total = first
+        yield page, version
+        starts = range(PAGE_LIMIT, total, PAGE_LIMIT)
+        if not starts:
+            return
+        with ThreadPoolExecutor(max_workers = min(self.workers, len(starts)), thread_name_prefix = "zotero") as pool:
+            futures = [pool.submit(fetch, s) for s in starts]
+            try:
+                for fut in as_completed(futures):
+                    CheckAbort()
+                    result = fut.result()
+                    if result is not None:
+                        yield result[0], result[1]
+            finally:
+                for fut in futures:
+                    fut.cancel()        # after a failure (here or in another stage) leave the rest unrequested
+
+    def _Apply(self, paper: dict) -> int:
+        key       = paper.get("key") or ""
+        dataField = paper.get("data") or {}
+        if not key:
+            return 0
+        if dataField.get("deleted") or "title" not in dataField or "abstractNote" not in dataField:
+            self.items.pop(key, None)
+            return 0
+        self.items[key] = {
+            "version" : paper.get("version", 0),
+            "title"   : dataField["title"],
+            "abstract": dataField["abstractNote"],
+            "venue"   : dataField.get("publicationTitle") or dataField.get("proceedingsTitle") or dataField.get("repository") or "",
+        }
+        return 1
+
+    # ---- profile ----
+    def Texts(self, keys: list[str] | None = None) -> list[str]:
+        keys = list(self.items) if keys is None else keys
+        return [("## 论文\n- 标题：" + self.items[k]["title"] + "\n- 摘要：" + self.items[k]["abstract"]).strip() for k in keys]
+
+    def Profile(self, embedder) -> np.ndarray:
+        """(1, d) normalized mean of the item embeddings, updated incrementally."""
+        return CombinedProfile([self], embedder)
+
+    def Update(self, embedder) -> tuple[np.ndarray, int]:
+        """Bring the stored item vectors of the embedder's model up to date; return (running sum, #items)."""
+        keys, textKeys, vectors, total = self._LoadVectors(embedder)
+        current = {k: TextKey(text).hex() for k, text in zip(self.items, self.Texts())}
+
+        stale = [i for i, (k, t) in enumerate(zip(keys, textKeys)) if current.get(k) != t]
+        stored = set(keys).difference(keys[i] for i in stale)
+        fresh = [k for k in self.items if k not in stored]
+
+        if stale:
+            drop = np.array(stale, dtype = np.int64)
+            total -= vectors[drop].astype(np.float64).sum(axis = 0)
+            keep = np.setdiff1d(np.arange(len(keys)), drop)
+            keys, textKeys, vectors = [keys[i] for i in keep], [textKeys[i] for i in keep], vectors[keep]
+        if fresh:
+            log.info(f"Embedding {len(fresh)} new or changed Zotero papers...")
+            embedder.Fit(self.Texts(fresh))
+            added, ok = embedder.EncodeMasked(self.Texts(fresh))
+            # items that failed to embed stay out of the profile; their text differs from
+            # every stored row, so the next run retries them
+            fresh, added = [k for k, good in zip(fresh, ok.tolist()) if good], added[ok]
+            total += added.astype(np.float64).sum(axis = 0)
+            keys, textKeys, vectors = keys + fresh, textKeys + [current[k] for k in fresh], np.vstack([vectors, added])
+
+        if stale or fresh:
+            self._SaveVectors(embedder, keys, textKeys, vectors, total)
+        return total, len(keys)
+
+    def Stored(self, embedder) -> tuple[np.ndarray, int]:
+        """(running sum, #items) as last stored for the embedder's model, embedding nothing:
+        items added or changed since then are left out (offline re-ranking)."""
+        keys, _, _, total = self._LoadVectors(embedder)
+        if self.items and not keys:
+            log.warning(f"Zotero {self.libraryType}/{self.libraryId} has no stored vectors for {embedder.model}; it is left out of the profile.")
+        return total, len(keys)
+
+    def Vectors(self, embedder) -> np.ndarray:
+        """Per-item embeddings as last stored by Profile()."""
+        return self._LoadVectors(embedder)[2]
+
+    # ---- storage ----
+    def _LoadState(self):
+        path = os.path.join(self.dir, "state.json")
+        if not os.path.exists(path):
+            return
+        with open(path, "r", encoding = "utf-8") as f:
+            state = json.load(f)
+        self.version = int(state.get("version", 0))
+        self.items   = state.get("items", {})
+
+    def _SaveState(self):
+        os.makedirs(self.dir, exist_ok = True)
+        tmp = os.path.join(self.dir, "state.json.tmp")
+        with open(tmp, "w", encoding = "utf-8") as f:
+            json.dump({"version": self.version, "items": self.items}, f, ensure_ascii = False)
+        os.replace(tmp, os.path.join(self.dir, "state.json"))
+
+    def _VectorDir(self, embedder) -> str:
+        space = hashlib.sha1(json.dumps({"model": embedder.model, "dimensions": embedder.dimensions}, sort_keys = True).encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.dir, "vectors", space)
+
+    def _LoadVectors(self, embedder) -> tuple[list[str], list[str], np.ndarray, np.ndarray]:
+        """(row keys, row TextKeys, vectors, running sum) stored for the embedder's model."""
+        empty = ([], [], np.zeros((0, embedder.dimensions), dtype = np.float32), np.zeros((embedder.dimensions, ), dtype = np.float64))
+        vectorDir = self._VectorDir(embedder)
+        metaPath, vecPath = os.path.join(vectorDir, "profile.json"), os.path.join(vectorDir, "vectors.npy")
+        if not (os.path.exists(metaPath) and os.path.exists(vecPath)):
+            return empty
+        with open(metaPath, "r", encoding = "utf-8") as f:
+            meta = json.load(f)
+        vectors = np.load(vecPath)
+        if vectors.shape != (len(meta["keys"]), embedder.dimensions):
+            log.warning(f"Zotero profile vectors in {vectorDir} are inconsistent (interrupted write); rebuilding them.")
+            return empty
+        return meta["keys"], meta["texts"], vectors, np.asarray(meta["sum"], dtype = np.float64)
+
+    def _SaveVectors(self, embedder, keys: list[str], textKeys: list[str], vectors: np.ndarray, total: np.ndarray):
+        vectorDir = self._VectorDir(embedder)
+        os.makedirs(vectorDir, exist_ok = True)
+        # each file is replaced atomically; a crash between the two is caught by the shape check on load
+        np.save(os.path.join(vectorDir, "vectors.tmp.npy"), vectors.astype(np.float32))
+        os.replace(os.path.join(vectorDir, "vectors.tmp.npy"), os.path.join(vectorDir, "vectors.npy"))
+        meta = {"model": embedder.model, "dimensions": embedder.dimensions, "keys": keys, "texts": textKeys, "sum": total.tolist()}
+        with open(os.path.join(vectorDir, "profile.json.tmp"), "w", encoding = "utf-8") as f:
+            json.dump(meta, f)
+        os.replace(os.path.join(vectorDir, "profile.json.tmp"), os.path.join(vectorDir, "profile.json"))
+        # single-model layout of earlier versions; its items re-embed from the embedding cache
+        for name in ("vectors.npy", "profile.json"):
+            if os.path.exists(os.path.join(self.dir, name)):
+                os.remove(os.path.join(self.dir, name))
+
+def OpenLibraries(root: str, *, userId: str, groupIds: str, apiKey: str, workers: int = 8) -> list[ZoteroLibrary]:
+    """The user's library plus every group in `groupIds` (comma-separated)."""
+    libraries = []
+    if userId:
+        libraries.append(ZoteroLibrary(root, libraryId = userId, apiKey = apiKey, libraryType = "users", workers = workers))
+    for groupId in (g.strip() for g in (groupIds or "").split(",")):
+        if groupId:
+            libraries.append(ZoteroLibrary(root, libraryId = groupId, apiKey = apiKey, libraryType = "groups", workers = workers))
+    return libraries
+
+def CombinedProfile(libraries: list[ZoteroLibrary], embedder, update: bool = True) -> np.ndarray:
+    """(1, d) normalized mean over the items of all libraries, as one profile corpus.
+    update=False uses the stored vectors as they are (Stored) and never calls the embedder."""
+    total, count = np.zeros((embedder.dimensions, ), dtype = np.float64), 0
+    for library in libraries:
+        librarySum, libraryCount = library.Update(embedder) if update else library.Stored(embedder)
+        total += librarySum
+        count += libraryCount
+    if count == 0:
+        return np.zeros((1, embedder.dimensions), dtype = np.float32)
+    profile = total.astype(np.float32)[None, :]
+    return profile / (np.linalg.norm(profile) + 1e-9)
@@ -1,4 +1,5 @@
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
+import argparse
 import logging
 
 from Sources.ConfigLoader import ParserConfig
@@ -7,6 +8,15 @@ from Sources.Pipeline import Pipeline
 log = logging.getLogger(__name__)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "PaperLens daily paper recommendation.")
+    parser.add_argument("--since",    default = "", help = "backfill mode: first day to catch up on (YYYY-MM-DD)")
+    parser.add_argument("--until",    default = "", help = "backfill mode: last day, inclusive (default: yesterday)")
+    parser.add_argument("--combined", action = "store_true", help = "backfill mode: mail one digest for the whole range instead of one per day")
+    parser.add_argument("--resume",   action = "store_true", help = "skip every stage whose checkpoint from an earlier attempt is still valid")
+    parser.add_argument("--rerank",   default = "", help = "re-rank and re-render a past day (YYYY-MM-DD) from the local paper store, offline")
+    parser.add_argument("--mail",     action = "store_true", help = "rerank mode: send the digests again")
+    args = parser.parse_args()
+
     logging.basicConfig(
         level   = logging.INFO,
         format  = '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -18,4 +28,10 @@ if __name__ == "__main__":
     yesterday = config.TARGET_DATE or (datetime.now(timezone.utc).date() + timedelta(days = -1)).isoformat()
     today     = config.TARGET_DATE or (datetime.now(timezone.utc).date() + timedelta(days =  0)).isoformat()
 
-    Pipeline(config).Run(day = yesterday, nextDay = today)
+    if args.rerank:
+        Pipeline(config, offline = True).Rerank(day = args.rerank, mail = args.mail)
+    elif args.since:
+        until = date.fromisoformat(args.until or yesterday)
+        Pipeline(config).Backfill(start = args.since, end = (until + timedelta(days = 1)).isoformat(), combined = args.combined, resume = args.resume)
+    else:
+        Pipeline(config).Run(day = yesterday, nextDay = today, resume = args.resume)
@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta, timezone
+import argparse
+import logging
+import time
+
+from Sources.ConfigLoader import ParserConfig
+from Sources.Pipeline import OpenEmbedder, OpenIndex
+from Sources.PaperIndex import DayNumber
+from Sources.HttpClient import http
+from Sources.FetchPaper.RecordMerge import NormalizeDoi
+
+log = logging.getLogger(__name__)
+
+def QueryText(doi: str) -> str:
+    """Title and abstract of a DOI that is not in the index, from Crossref, embedded like a candidate."""
+    response = http.Get(f"https://api.crossref.org/works/{doi}", timeout = 20)
+    response.raise_for_status()
+    work = response.json().get("message", {})
+    title = " ".join(work.get("title") or [])
+    abstract = work.get("abstract", "") or ""
+    return f"## 论文\n- 标题：{title}\n- 摘要：{abstract}"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Search the PaperLens history index by free text or DOI.")
+    parser.add_argument("query", help = "free-text query, or a DOI (10.xxxx/... or a doi.org URL)")
+    parser.add_argument("-k", "--top", type = int, default = 10, help = "number of results")
+    parser.add_argument("--days", type = int, default = 0, help = "only papers published in the last N days (0: all)")
+    parser.add_argument("--nprobe", type = int, default = 0, help = "inverted lists to probe (default: index.INDEX_NPROBE)")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level   = logging.WARNING,
+        format  = '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        datefmt = '%Y-%m-%d %H:%M:%S'
+    )
+
+    config = ParserConfig()
+    # no probe request: a DOI already in the index is answered without the embedding API
+    embedder = OpenEmbedder(config, probe = False)
+    index = OpenIndex(config, embedder)
+    if index is None:
+        raise SystemExit("The paper index is disabled (index.INDEX_DIR is empty).")
+
+    doi = NormalizeDoi(args.query)
+    exclude = {doi} if doi else set()
+    found = index.FindDoi(doi) if doi else None
+    if found is not None:
+        record, query = found
+        print(f"Query paper: {record['title']} ({record['date']})")
+    else:
+        queries, ok = embedder.EncodeMasked([QueryText(doi) if doi else args.query])
+        if not ok[0]:
+            raise SystemExit("Could not embed the query.")
+        query = queries[0]
+
+    after = DayNumber((datetime.now(timezone.utc).date() - timedelta(days = args.days)).isoformat()) if args.days > 0 else 0
+    start = time.perf_counter()
+    results = index.Search(query, args.top, nprobe = args.nprobe or config.INDEX_NPROBE, after = after, exclude = exclude)[0]
+    elapsed = (time.perf_counter() - start) * 1000
+
+    for rank, paper in enumerate(results, 1):
+        print(f"{rank:>3}. [{paper['Similarity']:.3f}] {paper['title']}")
+        print(f"     {paper['date']} | {paper['venue'] or paper['source']} | {paper['doi'] or paper['url']}")
+    print(f"{len(results)} results from {index.rows} indexed papers in {elapsed:.1f} ms.")
@@ -0,0 +1,6 @@
+# tests/conftest.py
+import os
+import sys
+
+# the modules use package-relative imports, so tests import them as Sources.<Module>
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
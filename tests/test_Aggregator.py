@@ -0,0 +1,60 @@
+# tests/test_Aggregator.py
+import time
+import threading
+
+from Sources.Metrics import metrics
+from Sources.FetchPaper.Source import Source
+from Sources.FetchPaper.Aggregator import Aggregator
+
+class FakeSource(Source):
+    """Returns one record per DOI after `delay` seconds, or raises `error`."""
+
+    def __init__(self, name: str, dois: list[str], delay: float = 0.0, error: Exception | None = None):
+        super().__init__()
+        self.name, self.dois, self.delay, self.error = name, dois, delay, error
+        self.threads: set[str] = set()
+
+    def Fetch(self, *, day: str, nextDay: str, **kwargs) -> list[dict]:
+        self.threads.add(threading.current_thread().name)
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return [self._norm({"doi": doi, "title": f"{self.name} {doi}", "date": day}) for doi in self.dois]
+
+def Fetch(aggregator: Aggregator) -> list[dict]:
+    metrics.Reset()
+    return aggregator.fetch_all(day = "2025-01-02", nextDay = "2025-01-03")
+
+def test_concurrent_results_keep_source_order():
+    # the slowest source is listed first and answers last, yet still wins the shared DOI
+    sources = [FakeSource("Crossref", ["10.1/a", "10.1/shared"], delay = 0.3),
+               FakeSource("OpenAlex", ["10.1/b", "10.1/shared"], delay = 0.1),
+               FakeSource("arXiv",    ["10.1/c"])]
+    start = time.monotonic()
+    merged = Fetch(Aggregator(sources, concurrent = True, maxWorkers = 3))
+    assert time.monotonic() - start < 0.5                   # the sources overlapped
+    assert [r["doi"] for r in merged] == ["10.1/a", "10.1/shared", "10.1/b", "10.1/c"]
+    assert merged[1]["title"] == "Crossref 10.1/shared"
+    assert merged[1]["sources"] == ["Crossref", "OpenAlex"]
+    assert all(name.startswith("fetch") for s in sources for name in s.threads)
+    assert merged == Fetch(Aggregator(sources))             # same merge as the sequential path
+
+def test_a_failing_source_is_isolated():
+    sources = [FakeSource("Crossref", ["10.1/a"]),
+               FakeSource("OpenAlex", ["10.1/b"], error = RuntimeError("HTTP 500")),
+               FakeSource("arXiv",    ["10.1/c"])]
+    for concurrent in (False, True):
+        merged = Fetch(Aggregator(sources, concurrent = concurrent))
+        assert [r["doi"] for r in merged] == ["10.1/a", "10.1/c"]
+        counters = metrics.Report()["counters"]
+        assert counters["OpenAlex"]["errors"] == 1
+        assert counters["Crossref"]["records"] == 1
+
+def test_a_source_past_its_deadline_is_abandoned():
+    sources = [FakeSource("Crossref", ["10.1/a"], delay = 0.05),
+               FakeSource("OpenAlex", ["10.1/b"], delay = 2.0)]
+    start = time.monotonic()
+    merged = Fetch(Aggregator(sources, concurrent = True, timeout = 0.3))
+    assert time.monotonic() - start < 1.5
+    assert [r["doi"] for r in merged] == ["10.1/a"]
+    assert metrics.Report()["counters"]["OpenAlex"]["timeouts"] == 1
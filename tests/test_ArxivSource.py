@@ -0,0 +1,66 @@
+# tests/test_ArxivSource.py
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+import pytest
+
+from Sources.HttpClient import http
+from Sources.FetchPaper.ArxivSource import ArxivSource
+
+DAY, NEXT_DAY = "2025-10-20", "2025-10-21"
+
+def Feed(start: int, size: int, total: int) -> bytes:
+    entries = "".join(
+        f"<entry><id>http://arxiv.org/abs/2510.{n:05d}v1</id><published>{DAY if n % 5 else '2025-10-19'}T10:00:00Z</published>"
+        f"<title>Paper {n}</title><summary>Abstract {n}</summary>"
+        f"<link href=\"http://arxiv.org/abs/2510.{n:05d}v1\" rel=\"alternate\" type=\"text/html\"/>"
+        f"<arxiv:primary_category term=\"cs.LG\"/></entry>"
+        for n in range(start, min(start + size, total))
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<feed xmlns="http://www.w3.org/2005/Atom" xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/" xmlns:arxiv="http://arxiv.org/schemas/atom">'
+        f"<opensearch:totalResults>{total}</opensearch:totalResults>{entries}</feed>"
+    ).encode("utf-8")
+
+@pytest.fixture
+def server():
+    requests = []
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            q = parse_qs(urlsplit(self.path).query)
+            requests.append(q)
+            body = gzip.compress(Feed(int(q["start"][0]), int(q["max_results"][0]), 23))
+            self.send_response(200)
+            self.send_header("Content-Type", "application/atom+xml")
+            self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        def log_message(self, *args):
+            pass
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target = httpd.serve_forever, daemon = True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/api/query", requests
+    httpd.shutdown()
+    http.Configure()
+
+def test_pages_are_stream_parsed_and_filtered_to_the_window(server):
+    base, requests = server
+    http.Configure(retries = 0)
+    records = ArxivSource(base = base).Fetch(day = DAY, nextDay = NEXT_DAY, perPage = 10)
+    assert [q["start"] for q in requests] == [["0"], ["10"], ["20"]]
+    assert [r["title"] for r in records] == [f"Paper {n}" for n in range(23) if n % 5]
+    assert records[0]["url"] == "http://arxiv.org/abs/2510.00001v1"
+    assert records[0]["venue"] == "cs.LG"
+
+def test_cached_pages_parse_the_same(server, tmp_path):
+    base, requests = server
+    http.Configure(retries = 0, cacheDir = str(tmp_path))
+    first = ArxivSource(base = base).Fetch(day = DAY, nextDay = NEXT_DAY, perPage = 10)
+    assert len(requests) == 3
+    again = ArxivSource(base = base).Fetch(day = DAY, nextDay = NEXT_DAY, perPage = 10)
+    assert len(requests) == 3           # a closed window is served from the cache for good
+    assert again == first
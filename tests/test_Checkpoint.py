@@ -0,0 +1,76 @@
+# tests/test_Checkpoint.py
+import pytest
+
+from Sources.Checkpoint import Checkpoints
+from Sources.StageGraph import Stage, StageGraph
+
+SCOPE = "2025-10-23"
+
+def RunGraph(root, calls: list, *, config: dict, resume: bool, seed: int = 3) -> tuple[dict, Checkpoints]:
+    def Load(seed):
+        calls.append("load")
+        return {"items": list(range(seed))}
+    def Total(items):
+        calls.append("total")
+        return {"total": sum(items)}
+    checkpoints = Checkpoints(str(root), scope = SCOPE, config = config, resume = resume)
+    graph = StageGraph([
+        Stage("load",  Load,  inputs = ("seed", ),  outputs = ("items", )),
+        Stage("total", Total, inputs = ("items", ), outputs = ("total", )),
+    ], checkpoints = checkpoints)
+    return graph.Run({"seed": seed}), checkpoints
+
+def test_resume_restores_finished_stages(tmp_path):
+    calls = []
+    values, _ = RunGraph(tmp_path, calls, config = {"TOP_K": 5}, resume = False)
+    assert calls == ["load", "total"] and values["total"] == 3
+
+    calls.clear()
+    values, checkpoints = RunGraph(tmp_path, calls, config = {"TOP_K": 5}, resume = True)
+    assert calls == []
+    assert sorted(checkpoints.restored) == ["load", "total"]
+    assert values["total"] == 3
+
+def test_checkpoints_are_not_read_without_resume(tmp_path):
+    calls = []
+    RunGraph(tmp_path, calls, config = {"TOP_K": 5}, resume = False)
+    RunGraph(tmp_path, calls, config = {"TOP_K": 5}, resume = False)
+    assert calls == ["load", "total"] * 2
+
+def test_config_change_makes_checkpoints_stale(tmp_path):
+    calls = []
+    RunGraph(tmp_path, calls, config = {"TOP_K": 5}, resume = False)
+    calls.clear()
+    values, checkpoints = RunGraph(tmp_path, calls, config = {"TOP_K": 6}, resume = True)
+    assert calls == ["load", "total"]
+    assert checkpoints.restored == []
+    assert values["total"] == 3
+
+def test_changed_input_reruns_downstream_stages(tmp_path):
+    calls = []
+    RunGraph(tmp_path, calls, config = {}, resume = False, seed = 3)
+    calls.clear()
+    values, _ = RunGraph(tmp_path, calls, config = {}, resume = True, seed = 4)
+    assert calls == ["load", "total"]
+    assert values["total"] == 6
+
+def test_failed_stage_is_rerun_on_resume(tmp_path):
+    calls = []
+    def Load(seed):
+        calls.append("load")
+        return {"items": list(range(seed))}
+    def Broken(items):
+        raise RuntimeError("mail server down")
+    checkpoints = Checkpoints(str(tmp_path), scope = SCOPE, config = {}, resume = False)
+    graph = StageGraph([
+        Stage("load",  Load,   inputs = ("seed", ),  outputs = ("items", )),
+        Stage("total", Broken, inputs = ("items", ), outputs = ("total", )),
+    ], checkpoints = checkpoints)
+    with pytest.raises(RuntimeError):
+        graph.Run({"seed": 3})
+
+    calls.clear()
+    values, checkpoints = RunGraph(tmp_path, calls, config = {}, resume = True)
+    assert calls == ["total"]
+    assert checkpoints.restored == ["load"]
+    assert values["total"] == 3
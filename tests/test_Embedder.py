@@ -0,0 +1,148 @@
+# tests/test_Embedder.py
+import zlib
+import threading
+import numpy as np
+
+from Sources.Embedder import Embedder, PayloadRejected
+from Sources.EmbeddingBackend import EmbeddingBackend
+from Sources.Metrics import metrics
+from Sources.Quantize import Dequantize
+
+DIMENSIONS = 8
+
+class Rejected(Exception):
+    code = 400
+
+class QuotaExceeded(Exception):
+    code = 429
+
+def Vector(text: str) -> np.ndarray:
+    return np.random.default_rng(zlib.crc32(text.encode("utf-8"))).normal(size = DIMENSIONS).astype(np.float32)
+
+class FakeBackend(EmbeddingBackend):
+    """Deterministic vectors per text. A batch holding a "huge" text is rejected as too
+    large (400); one holding a "flaky" text, or any batch while `down`, fails transiently."""
+    name        = "fake"
+    dimensions  = DIMENSIONS
+    concurrency = 4
+
+    def __init__(self):
+        self.calls = 0
+        self.down  = False
+        self._lock = threading.Lock()
+
+    def Embed(self, texts):
+        with self._lock:
+            self.calls += 1
+        if self.down or any("flaky" in t for t in texts):
+            raise ConnectionError("connection reset")
+        if any("huge" in t for t in texts):
+            raise Rejected("request payload size exceeds the limit")
+        return np.stack([Vector(t) for t in texts])
+
+def Expected(texts) -> np.ndarray:
+    vectors = np.stack([Vector(t) for t in texts])
+    return vectors / np.linalg.norm(vectors, axis = 1, keepdims = True)
+
+def OpenEmbedder(backend, **kwargs) -> Embedder:
+    return Embedder(backend = backend, concurrency = 4, batchSize = 4, retries = 0, **kwargs)
+
+def test_rejected_payloads_are_split_down_to_the_bad_text():
+    texts = [f"paper {i}" for i in range(40)]
+    texts[5], texts[30] = "huge paper 5", "huge paper 30"
+    texts[12] = texts[3]        # duplicates are embedded once and scattered to every row
+    backend = FakeBackend()
+    embeddings, mask = OpenEmbedder(backend).EncodeMasked(texts)
+
+    assert embeddings.shape == (len(texts), DIMENSIONS)
+    assert np.flatnonzero(~mask).tolist() == [5, 30]
+    assert not embeddings[~mask].any()
+    assert np.allclose(embeddings[mask], Expected([t for t, ok in zip(texts, mask) if ok]), atol = 1e-5)
+
+def test_transient_failure_masks_its_batch_without_splitting():
+    texts = [f"paper {i}" for i in range(16)]
+    texts[9] = "flaky paper 9"
+    backend = FakeBackend()
+    embeddings, mask = OpenEmbedder(backend).EncodeMasked(texts)
+
+    assert np.flatnonzero(~mask).tolist() == [8, 9, 10, 11]
+    assert backend.calls == 4
+    assert np.allclose(embeddings[mask], Expected([t for t, ok in zip(texts, mask) if ok]), atol = 1e-5)
+
+def test_breaker_stops_after_consecutive_failures_and_probes_later():
+    backend = FakeBackend()
+    backend.down = True
+    embedder = OpenEmbedder(backend, breaker = 3)
+    texts = [f"paper {i}" for i in range(400)]
+
+    _, mask = embedder.EncodeMasked(texts)
+    assert not mask.any()
+    assert backend.calls < 3 + embedder.concurrency          # not one call per batch of 4
+
+    calls = backend.calls
+    _, mask = embedder.EncodeMasked(texts)
+    assert not mask.any()
+    assert backend.calls == calls + 1                       # a single probe batch
+
+    backend.down = False
+    embeddings, mask = embedder.EncodeMasked(texts)
+    assert mask.all()
+    assert np.allclose(embeddings, Expected(texts), atol = 1e-5)
+
+def test_only_size_errors_are_payload_rejections():
+    assert PayloadRejected(Rejected("invalid argument"))
+    assert PayloadRejected(ValueError("Request payload size exceeds the limit"))
+    assert not PayloadRejected(QuotaExceeded("RESOURCE_EXHAUSTED: Quota exceeded for metric embed_content"))
+    assert not PayloadRejected(ConnectionError("connection reset"))
+
+def test_quota_errors_back_off_and_trip_the_breaker(monkeypatch):
+    class Exhausted(FakeBackend):
+        def Embed(self, texts):
+            with self._lock:
+                self.calls += 1
+                self.sizes.append(len(texts))
+            raise QuotaExceeded("RESOURCE_EXHAUSTED: Quota exceeded for metric embed_content")
+    sleeps = []
+    monkeypatch.setattr("Sources.Embedder.time.sleep", sleeps.append)
+    backend = Exhausted()
+    backend.sizes = []
+    embedder = Embedder(backend = backend, concurrency = 4, batchSize = 4, retries = 2, breaker = 3)
+
+    _, mask = embedder.EncodeMasked([f"paper {i}" for i in range(400)])
+    assert not mask.any()
+    assert set(backend.sizes) == {4}                        # never split into single texts
+    assert backend.calls <= 3 * (2 + embedder.concurrency)  # each batch tried retries + 1 times, then the breaker
+    assert len(sleeps) == 2 * backend.calls // 3            # two backoffs per failed batch
+    assert metrics.Report()["counters"]["embedding"]["breaker_trips"] >= 1
+
+def test_texts_are_counted_once_per_run(tmp_path):
+    embedder = OpenEmbedder(FakeBackend(), cacheDir = str(tmp_path))
+    texts = [f"paper {i}" for i in range(20)]
+    embedder.Encode(texts[:5])
+
+    metrics.Reset()
+    embedder.ResetCounts()
+    embedder.EncodeQuantized(texts, 4)      # coarse pass
+    embedder.Encode(texts[:10])             # fine pass
+    embedder.Encode(texts)                  # archive re-read
+    counters = metrics.Report()["counters"]["embedding"]
+    assert (counters["texts"], counters["cache_hits"], counters["cache_misses"]) == (20, 5, 15)
+
+def test_quantized_cache_serves_prefixes_of_cached_texts(tmp_path):
+    backend = FakeBackend()
+    embedder = OpenEmbedder(backend, cacheDir = str(tmp_path), cacheDtype = "int8")
+    texts = [f"paper {i}" for i in range(12)]
+    embedder.Encode(texts[:8])
+    assert embedder.Cached(texts).tolist() == [True] * 8 + [False] * 4
+
+    calls = backend.calls
+    q = embedder.EncodeQuantized(texts[:8], 4)
+    assert backend.calls == calls                           # cached rows cost no embedding call
+    assert q.codes.dtype == np.int8 and q.codes.shape == (8, 4)
+    raw = np.stack([Vector(t) for t in texts])              # prefixes are stored as embedded, not renormalized
+    assert np.allclose(Dequantize(q), raw[:8, :4], atol = 0.03)
+
+    q = embedder.EncodeQuantized(texts, 4)                  # evicted meanwhile: embedded once at full size
+    assert backend.calls == calls + 1
+    assert embedder.Cached(texts).all()
+    assert np.allclose(Dequantize(q), raw[:, :4], atol = 0.03)
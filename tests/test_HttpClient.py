@@ -0,0 +1,94 @@
+# tests/test_HttpClient.py
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from Sources.HttpClient import HttpClient
+from Sources.Metrics import metrics
+
+@pytest.fixture
+def server():
+    """Answers with the queued (status, headers) pairs, then 200 "ok"; records each
+    request's headers, plus the client port under "peer" and the arrival time under "at"."""
+    script: list[tuple[int, dict]] = []
+    seen: list[dict] = []
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        def do_GET(self):
+            seen.append({**self.headers, "peer": self.client_address[1], "at": time.monotonic()})
+            status, headers = script.pop(0) if script else (200, {})
+            body = b"ok" if status == 200 else b"busy"
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        def log_message(self, *args):
+            pass
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target = httpd.serve_forever, daemon = True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/page", script, seen
+    httpd.shutdown()
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays: list[float] = []
+    monkeypatch.setattr("Sources.HttpClient.time.sleep", delays.append)
+    return delays
+
+def test_retries_429_and_5xx_honouring_retry_after(server, sleeps):
+    url, script, seen = server
+    script += [(429, {"Retry-After": "7"}), (503, {})]
+    metrics.Reset()
+    r = HttpClient(retries = 3, backoffBase = 0.5).Get(url, timeout = 5)
+    assert r.status_code == 200 and r.text == "ok"
+    assert len(seen) == 3
+    assert sleeps[0] == 7.0                     # server-given delay
+    assert 0.0 <= sleeps[1] <= 1.0              # full jitter over backoffBase * 2**1
+    counters = metrics.Report()["counters"][url.split("/")[2]]
+    assert counters["requests"] == 3 and counters["retries"] == 2 and counters["pages"] == 1
+
+def test_the_last_response_is_returned_as_is(server, sleeps):
+    url, script, seen = server
+    script += [(503, {})] * 3
+    r = HttpClient(retries = 2).Get(url, timeout = 5)
+    assert r.status_code == 503
+    assert len(seen) == 3 and len(sleeps) == 2
+    script.append((429, {}))
+    assert HttpClient(retries = 0).Get(url, timeout = 5).status_code == 429
+    assert len(seen) == 4 and len(sleeps) == 2
+
+def test_connection_errors_are_retried_then_raised(sleeps):
+    with pytest.raises(requests.ConnectionError):
+        HttpClient(retries = 2).Get("http://127.0.0.1:9/unreachable", timeout = 1)
+    assert len(sleeps) == 2
+
+def test_connections_are_kept_alive(server):
+    url, script, seen = server
+    client = HttpClient()
+    for _ in range(3):
+        assert client.Get(url, timeout = 5).ok
+    assert all(h.get("Accept-Encoding") == "gzip, deflate" for h in seen)
+    assert len({h["peer"] for h in seen}) == 1               # one keep-alive connection
+
+def test_backoff_is_capped():
+    client = HttpClient(backoffBase = 1.0, backoffCap = 5.0)
+    assert client.Backoff(0, "120") == 5.0
+    assert client.Backoff(0, "not-a-number") <= 1.0
+    assert all(client.Backoff(10) <= 5.0 for _ in range(100))
+
+def test_paced_hosts_get_spaced_serial_requests(server):
+    url, script, seen = server
+    client = HttpClient(hostIntervals = {url.split("/")[2]: 0.2})
+    threads = [threading.Thread(target = lambda: client.Get(url, timeout = 5)) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    arrivals = sorted(h["at"] for h in seen)
+    assert len(arrivals) == 3
+    assert all(b - a >= 0.18 for a, b in zip(arrivals, arrivals[1:]))
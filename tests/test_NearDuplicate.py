@@ -0,0 +1,48 @@
+# tests/test_NearDuplicate.py
+import numpy as np
+
+from Sources.FetchPaper.NearDuplicate import NearDuplicates, Words, _BandLayout
+
+def RandomTexts(n: int, words: int = 150, seed: int = 0) -> list[str]:
+    rng = np.random.default_rng(seed)
+    vocabulary = [f"w{i}" for i in range(2000)]
+    return [" ".join(rng.choice(vocabulary, size = words)) for _ in range(n)]
+
+def test_words_strip_markup_tex_and_accents():
+    assert Words("<i>Café</i> of $\\alpha$ NAÏVE models") == ["cafe", "of", "naive", "models"]
+
+def test_band_layout_fits_the_signature():
+    for threshold in (0.5, 0.8, 0.9):
+        bands, rows = _BandLayout(threshold, 128)
+        assert bands * rows <= 128
+
+def test_near_copies_cluster_and_distinct_texts_do_not():
+    texts = RandomTexts(200)
+    edited = texts[10].split()
+    edited[20], edited[100] = "changed", "words"
+    texts += [" ".join(edited), "<b>" + texts[50].upper() + "</b>"]
+
+    roots = NearDuplicates(threshold = 0.8).Clusters(texts)
+    assert roots[200] == 10
+    assert roots[201] == 50
+    assert roots[:200] == list(range(200))
+
+def test_short_texts_never_cluster():
+    roots = NearDuplicates().Clusters(["Editorial", "Editorial", "Preface", "Preface"])
+    assert roots == [0, 1, 2, 3]
+
+def test_filter_fuses_each_cluster_in_place():
+    text = RandomTexts(1)[0]
+    records = [{"title": "A", "abstract": text, "source": "arXiv", "sources": ["arXiv"], "url": "https://arxiv.org/abs/2501.01234",
+                "doi": "", "date": "2025-01-02"},
+               {"title": "B", "abstract": "something else entirely " * 10, "source": "DBLP", "sources": ["DBLP"]},
+               {"title": "A.", "abstract": text, "source": "Crossref", "sources": ["Crossref", "OpenAlex"], "url": "https://doi.org/10.1000/a",
+                "doi": "10.1000/A", "venue": "Journal of A", "date": "2025"}]
+    kept = NearDuplicates().Filter(records)
+    assert [r["title"] for r in kept] == ["A.", "B"]            # fused record stays at the first copy's position
+    assert kept[0]["sources"] == ["arXiv", "Crossref", "OpenAlex"]
+    assert kept[0]["doi"] == "10.1000/a"                        # fields from the later copy are not lost
+    assert kept[0]["venue"] == "Journal of A"
+    assert kept[0]["url"] == "https://arxiv.org/abs/2501.01234"
+    assert kept[0]["date"] == "2025-01-02"
+    assert kept[1] is records[1]
@@ -0,0 +1,83 @@
+# tests/test_PaperIndex.py
+import os
+import numpy as np
+import pytest
+
+from Sources.PaperIndex import PaperIndex
+
+DIMENSIONS = 32
+DAYS, PER_DAY = 8, 500
+
+def Corpus(seed: int = 0) -> tuple[list[dict], np.ndarray, list[str]]:
+    """DAYS x PER_DAY unit vectors around 40 topic centers, with one record and text per row."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size = (40, DIMENSIONS))
+    vectors = centers[rng.integers(0, 40, size = DAYS * PER_DAY)] + 0.6 * rng.normal(size = (DAYS * PER_DAY, DIMENSIONS))
+    vectors = (vectors / np.linalg.norm(vectors, axis = 1, keepdims = True)).astype(np.float32)
+    records = [{"title": f"Paper {i}", "doi": f"10.1000/{i}", "date": f"2025-10-{1 + i // PER_DAY:02d}", "source": "Crossref"} for i in range(len(vectors))]
+    return records, vectors, [f"paper text {i}" for i in range(len(vectors))]
+
+def Recall(index: PaperIndex, vectors: np.ndarray, queries: np.ndarray, k: int = 10) -> float:
+    exact = np.argsort(-(queries @ vectors.T), axis = 1)[:, :k]
+    found = index.Search(queries, k, nprobe = 8)
+    hits = sum(len({f"10.1000/{i}" for i in truth.tolist()} & {r["doi"] for r in result}) for truth, result in zip(exact, found))
+    return hits / exact.size
+
+@pytest.fixture(scope = "module")
+def built(tmp_path_factory):
+    root = str(tmp_path_factory.mktemp("index"))
+    records, vectors, texts = Corpus()
+    index = PaperIndex(root, model = "fake", dimensions = DIMENSIONS, maxSegments = 3, trainRows = 1000)
+    for day in range(DAYS):
+        rows = slice(day * PER_DAY, (day + 1) * PER_DAY)
+        assert index.Append(records[rows], vectors[rows], texts[rows]) == PER_DAY
+    return root, records, vectors, texts
+
+def Open(root) -> PaperIndex:
+    return PaperIndex(root, model = "fake", dimensions = DIMENSIONS, maxSegments = 3, trainRows = 1000)
+
+def test_append_trains_lists_and_bounds_segments(built):
+    root, records, _, _ = built
+    index = Open(root)
+    assert index.rows == len(records)
+    assert index.nlist > 1
+    assert len(index.segments) <= index.maxSegments
+
+def test_append_skips_indexed_texts(built):
+    root, records, vectors, texts = built
+    index = Open(root)
+    assert index.Append(records[:PER_DAY], vectors[:PER_DAY], texts[:PER_DAY]) == 0
+    assert index.rows == len(records)
+
+def test_recall_survives_compaction(built):
+    root, _, vectors, _ = built
+    queries = vectors[np.random.default_rng(1).choice(len(vectors), size = 50, replace = False)]
+    before = Recall(Open(root), vectors, queries)
+
+    index = Open(root)
+    index.Compact()
+    index = Open(root)
+    assert len(index.segments) == 1
+    after = Recall(index, vectors, queries)
+    assert before >= 0.9 and after >= 0.9
+
+    # compaction leaves only the listed segment and the current centroids behind
+    names = sorted(os.listdir(index.dir))
+    assert [n for n in names if n.startswith("seg-")] == [os.path.basename(index.segments[0].path)]
+    assert [n for n in names if n.startswith("centroids-")] == [f"centroids-{index.generation}.npy"]
+
+def test_search_filters_by_day_and_excludes_dois(built):
+    root, _, vectors, _ = built
+    index = Open(root)
+    [found] = index.Search(vectors[:1], 10, nprobe = 8, before = 20251004, after = 20251002)
+    assert found and all("2025-10-02" <= r["date"] < "2025-10-04" for r in found)
+    [found] = index.Search(vectors[:1], 5, nprobe = 8, exclude = {"10.1000/0"})
+    assert "10.1000/0" not in {r["doi"] for r in found}
+    assert [r["Similarity"] for r in found] == sorted((r["Similarity"] for r in found), reverse = True)
+
+def test_find_doi_returns_record_and_vector(built):
+    root, _, vectors, _ = built
+    record, vector = Open(root).FindDoi("https://doi.org/10.1000/1234")
+    assert record["title"] == "Paper 1234"
+    assert float(vector @ vectors[1234]) > 0.99
+    assert Open(root).FindDoi("10.1000/missing") is None
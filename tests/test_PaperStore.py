@@ -0,0 +1,71 @@
+# tests/test_PaperStore.py
+import numpy as np
+import pytest
+
+from Sources.PaperStore import PaperStore
+
+DIMENSIONS = 8
+
+def Papers(n: int, day: str = "2025-01-02") -> tuple[list[dict], list[str], np.ndarray]:
+    papers = [{"title": f"Paper {i}", "abstract": f"Abstract {i}.", "doi": f"10.1000/{i}", "date": day, "source": "Crossref",
+               "sources": ["Crossref", "OpenAlex"], "ids": {"openalex": f"W{i}"}, "Similarity": 0.5} for i in range(n)]
+    texts = [f'{p["title"]} {p["abstract"]}' for p in papers]
+    vectors = np.random.default_rng(n).normal(size = (n, DIMENSIONS)).astype(np.float32)
+    return papers, texts, vectors
+
+def Unit(X: np.ndarray) -> np.ndarray:
+    return X / np.linalg.norm(X, axis = 1, keepdims = True)
+
+def Store(root, dtype: str = "float16") -> PaperStore:
+    return PaperStore(str(root), model = "fake", dimensions = DIMENSIONS, dtype = dtype)
+
+@pytest.mark.parametrize("dtype, tolerance", [("float32", 1e-6), ("float16", 1e-3), ("int8", 2e-2)])
+def test_days_round_trip_through_a_reopen(tmp_path, dtype, tolerance):
+    papers, texts, vectors = Papers(6)
+    store = Store(tmp_path, dtype)
+    store.PutDay("2025-01-02", papers, texts)
+    assert store.PutVectors(texts, vectors) == 6
+
+    candidates, hit, stored = Store(tmp_path, dtype).Day("2025-01-02")
+    assert [p["title"] for p in candidates] == [p["title"] for p in papers]
+    assert candidates[0]["sources"] == ["Crossref", "OpenAlex"] and candidates[0]["ids"] == {"openalex": "W0"}
+    assert "Similarity" not in candidates[0]                # per-run ranking fields are not archived
+    assert hit.all()
+    assert np.allclose(stored, Unit(vectors), atol = tolerance)
+
+def test_vectors_are_appended_once_and_failures_skipped(tmp_path):
+    papers, texts, vectors = Papers(6)
+    vectors[2] = 0                                          # failed embedding
+    store = Store(tmp_path)
+    store.PutDay("2025-01-02", papers, texts)
+    assert store.PutVectors(texts, vectors) == 5
+    assert store.PutVectors(texts + texts[:3], np.vstack([vectors, vectors[:3]])) == 0
+
+    _, hit, stored = store.Day("2025-01-02")
+    assert np.flatnonzero(~hit).tolist() == [2]
+    assert stored.shape == (5, DIMENSIONS)
+
+def test_papers_shared_by_days_are_stored_once(tmp_path):
+    papers, texts, vectors = Papers(4)
+    store = Store(tmp_path)
+    store.PutDay("2025-01-02", papers, texts)
+    store.PutDay("2025-01-03", papers[2:] + [papers[0]], texts[2:] + [texts[0]])
+    store.PutVectors(texts, vectors)
+    store.PutDay("2025-01-02", papers[:2], texts[:2])       # a re-run replaces the day's pool
+    assert store.Days() == ["2025-01-02", "2025-01-03"]
+    assert [p["doi"] for p in store.Day("2025-01-02")[0]] == ["10.1000/0", "10.1000/1"]
+    assert [p["doi"] for p in store.Day("2025-01-03")[0]] == ["10.1000/2", "10.1000/3", "10.1000/0"]
+    assert store._rows == 4
+
+def test_a_torn_append_is_repaired_on_open(tmp_path):
+    papers, texts, vectors = Papers(3)
+    store = Store(tmp_path)
+    store.PutDay("2025-01-02", papers, texts)
+    store.PutVectors(texts, vectors)
+    with open(store._vectorFile, "ab") as f:
+        f.write(b"\x01\x02\x03")                           # half a row from an interrupted write
+
+    reopened = Store(tmp_path)
+    assert reopened._rows == 3
+    _, hit, stored = reopened.Day("2025-01-02")
+    assert hit.all() and np.allclose(stored, Unit(vectors), atol = 1e-3)
@@ -0,0 +1,62 @@
+# tests/test_Pipeline.py
+import zlib
+from types import SimpleNamespace
+
+import numpy as np
+
+from Sources.Pipeline import Pipeline, _Remap
+from Sources.Embedder import Embedder
+from Sources.EmbeddingBackend import EmbeddingBackend
+from Sources.Profile import ProfileModel, ProfileSet
+
+DIMENSIONS = 16
+
+class NestedBackend(EmbeddingBackend):
+    """Matryoshka-style fake: texts holding "match" point along the first axis in every
+    prefix, the rest are random."""
+    name        = "nested-fake"
+    dimensions  = DIMENSIONS
+    nested      = True
+    concurrency = 1
+
+    def __init__(self):
+        self.embedded: list[str] = []
+
+    def Embed(self, texts):
+        self.embedded += texts
+        rows = []
+        for t in texts:
+            v = np.random.default_rng(zlib.crc32(t.encode("utf-8"))).normal(scale = 0.1, size = DIMENSIONS)
+            if "match" in t:
+                v[0] += 1.0
+            rows.append(v)
+        return np.array(rows, dtype = np.float32)
+
+def Shortlister(tmp_path, *, dimensions: int = 4, topM: int = 2):
+    """Just the state _CoarseShortlist reads, around a real int8-cached Embedder."""
+    embedder = Embedder(backend = NestedBackend(), cacheDir = str(tmp_path), cacheDtype = "int8", retries = 0)
+    config = SimpleNamespace(RANK_COARSE_DIMENSIONS = dimensions, RANK_COARSE_TOP_M = topM, RANK_CHUNK_SIZE = 8)
+    return SimpleNamespace(config = config, embedder = embedder, recipients = [SimpleNamespace(NAME = "", TOP_K = 1)])
+
+def test_remap_spans_onto_a_subset():
+    assert _Remap(np.array([1, 4, 5, 9]), {"a": (0, 5), "b": (5, 10)}) == {"a": (0, 2), "b": (2, 4)}
+
+def test_coarse_pass_ranks_cached_candidates_only(tmp_path):
+    owner = Shortlister(tmp_path)
+    texts = [f"paper {i}" + (" match" if i in (3, 20) else "") for i in range(30)]
+    owner.embedder.Encode(texts[:25])                       # candidates 25..29 are not cached
+    profile = ProfileSet({"": ProfileModel(np.eye(DIMENSIONS, dtype = np.float32)[:1])})
+
+    owner.embedder.backend.embedded.clear()
+    keep, spans = Pipeline._CoarseShortlist(owner, profile, texts, {"day": (0, 30)})
+    assert keep.tolist() == [3, 20, 25, 26, 27, 28, 29]
+    assert spans == {"day": (0, 7)}
+    assert owner.embedder.backend.embedded == []            # the coarse pass embeds nothing
+
+def test_coarse_pass_is_skipped_when_it_cannot_save_anything(tmp_path):
+    texts = [f"paper {i}" for i in range(10)]
+    profile = ProfileSet({"": ProfileModel(np.eye(DIMENSIONS, dtype = np.float32)[:1])})
+    for owner in (Shortlister(tmp_path / "off", dimensions = 0), Shortlister(tmp_path / "few", topM = 20)):
+        owner.embedder.Encode(texts)
+        keep, spans = Pipeline._CoarseShortlist(owner, profile, texts, {"day": (0, 10)})
+        assert keep.tolist() == list(range(10)) and spans == {"day": (0, 10)}
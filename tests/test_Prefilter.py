@@ -0,0 +1,47 @@
+# tests/test_Prefilter.py
+import numpy as np
+
+from Sources.Prefilter import Prefilter, Tokens, VenueKey
+
+LIBRARY = [{"title": "Graph neural networks for molecules", "abstract": "Message passing over molecular graphs.", "venue": "NeurIPS"},
+           {"title": "Equivariant graph networks", "abstract": "Symmetry-aware message passing for molecular property prediction.", "venue": "ICML"},
+           {"title": "Diffusion models for molecule generation", "abstract": "Generating molecular graphs with denoising diffusion.", "venue": "NeurIPS"}]
+
+def Pool() -> list[dict]:
+    """40 off-topic candidates with the on-topic ones at rows 5 and 17."""
+    pool = [{"title": f"Crop yields in region {i}", "abstract": "Rainfall, soil nitrogen and harvest statistics over ten seasons.", "venue": "Agronomy Journal"} for i in range(40)]
+    pool[5]  = {"title": "Message passing graph networks for molecular property prediction", "abstract": "A graph neural network over molecules.", "venue": "arXiv cs.LG"}
+    pool[17] = {"title": "Denoising diffusion over molecular graphs", "abstract": "Molecule generation with equivariant message passing.", "venue": "NeurIPS"}
+    return pool
+
+def test_tokens_and_venue_keys():
+    assert Tokens("A Graph-Neural net, v2") == ["graph", "neural", "net", "v2"]
+    assert VenueKey("  Nature   Communications ") == "nature communications"
+
+def test_library_topics_score_highest():
+    prefilter = Prefilter().Fit(LIBRARY)
+    scores = prefilter.Score(Pool())
+    assert set(np.argsort(-scores)[:2].tolist()) == {5, 17}
+    assert prefilter.Select(Pool(), 2).tolist() == [5, 17]
+
+def test_library_venues_raise_the_score():
+    pool = Pool()
+    pool[30]["venue"] = "NeurIPS"
+    withVenue = Prefilter(venueWeight = 1.0).Fit(LIBRARY).Score(pool)
+    withoutVenue = Prefilter(venueWeight = 0.0).Fit(LIBRARY).Score(pool)
+    assert withVenue[30] - withVenue[31] > withoutVenue[30] - withoutVenue[31]
+
+def test_keep_always_and_venue_rules():
+    pool = Pool()
+    always = np.zeros(len(pool), dtype = bool)
+    always[[0, 1]] = True
+    pool[9]["venue"], pool[17]["venue"] = "Workshop on Crops, NeurIPS", "Predatory Letters"
+    prefilter = Prefilter(allow = ["neurips"], deny = ["predatory"]).Fit(LIBRARY)
+    assert prefilter.Select(pool, 2, always = always).tolist() == [0, 1, 5, 9]
+    assert prefilter.Select(pool, 0).tolist() == [9]
+
+def test_everything_passes_until_fitted():
+    pool = Pool()
+    assert Prefilter().Select(pool, 3).tolist() == list(range(40))
+    assert Prefilter().Fit(LIBRARY).Select(pool, 40).tolist() == list(range(40))
+    assert not Prefilter().Score(pool).any()
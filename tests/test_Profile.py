@@ -0,0 +1,57 @@
+# tests/test_Profile.py
+import numpy as np
+
+from Sources.Profile import SphericalKMeans, ProfileModel, BuildCentroidProfile, Fingerprint
+
+def Unit(X: np.ndarray) -> np.ndarray:
+    return (X / np.linalg.norm(X, axis = -1, keepdims = True)).astype(np.float32)
+
+def Interests(perTopic: int = 30, d: int = 32, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """(three orthogonal topic directions, library papers scattered tightly around them)."""
+    rng = np.random.default_rng(seed)
+    topics = np.eye(d, dtype = np.float32)[:3]
+    papers = np.vstack([Unit(t + 0.1 * rng.normal(size = (perTopic, d))) for t in topics])
+    return topics, papers
+
+def test_kmeans_finds_the_topics():
+    topics, papers = Interests()
+    centroids = SphericalKMeans(papers, 3)
+    assert centroids.shape == (3, 32)
+    assert np.allclose(np.linalg.norm(centroids, axis = 1), 1.0, atol = 1e-5)
+    assert sorted((centroids @ topics.T).argmax(axis = 1).tolist()) == [0, 1, 2]
+    assert (centroids @ topics.T).max(axis = 1).min() > 0.95
+    assert SphericalKMeans(papers[:2], 5).shape == (2, 32)          # never more centroids than papers
+
+def test_max_reduce_scores_the_closest_interest():
+    topics, papers = Interests()
+    multi = ProfileModel(SphericalKMeans(papers, 3))
+    mean = ProfileModel(Unit(papers.sum(axis = 0))[None, :])
+    scores, best = multi.Score(topics)
+    assert np.all(scores > 0.95)                                    # every interest is matched by its own centroid
+    assert len(set(best.tolist())) == 3
+    assert np.all(mean.Score(topics)[0] < 0.7)                      # the mean vector blurs them
+    assert multi.Quotas(best) == {0: 1, 1: 1, 2: 1}
+
+def test_softmax_reduce_lies_between_the_mean_and_the_max():
+    S = np.array([[0.9, 0.1, 0.1], [0.5, 0.5, 0.5]], dtype = np.float32)
+    model = ProfileModel(np.eye(3, dtype = np.float32), reduce = "softmax", temperature = 0.1)
+    scores, best = model.Reduce(S)
+    assert np.all(scores <= S.max(axis = 1) + 1e-6) and np.all(scores >= S.mean(axis = 1) - 1e-6)
+    assert np.isclose(scores[1], 0.5)
+    assert best.tolist()[0] == 0
+
+def test_centroids_are_reused_until_the_fingerprint_changes(tmp_path):
+    _, papers = Interests()
+    path = str(tmp_path / "profile" / "centroids.npz")
+    first = BuildCentroidProfile(papers, k = 3, path = path, fingerprint = Fingerprint("v1", 3))
+    assert first.sizes.tolist() == [30, 30, 30]
+
+    other = Unit(np.random.default_rng(1).normal(size = (10, 32)))
+    assert np.array_equal(BuildCentroidProfile(other, k = 3, path = path, fingerprint = Fingerprint("v1", 3)).centroids, first.centroids)
+    changed = BuildCentroidProfile(other, k = 3, path = path, fingerprint = Fingerprint("v2", 3))
+    assert not np.array_equal(changed.centroids, first.centroids)
+    assert changed.sizes.sum() == 10
+
+def test_an_empty_library_gives_a_zero_profile(tmp_path):
+    model = BuildCentroidProfile(np.zeros((0, 8), dtype = np.float32), k = 3, path = str(tmp_path / "c.npz"), fingerprint = "x")
+    assert model.k == 1 and not model.centroids.any()
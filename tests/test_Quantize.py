@@ -0,0 +1,39 @@
+# tests/test_Quantize.py
+import numpy as np
+import pytest
+
+from Sources.Quantize import Quantize, Dequantize, Truncate, Dot
+
+def Vectors(n: int = 50, d: int = 64, seed: int = 0) -> np.ndarray:
+    X = np.random.default_rng(seed).normal(size = (n, d)).astype(np.float32)
+    return X / np.linalg.norm(X, axis = 1, keepdims = True)
+
+def test_int8_round_trip_is_within_half_a_step():
+    X = Vectors()
+    q = Quantize(X, "int8")
+    assert q.codes.dtype == np.int8 and len(q) == 50
+    assert np.all(np.abs(Dequantize(q) - X) <= q.scales[:, None] / 2 + 1e-7)
+    assert np.abs(q.codes).max() == 127
+
+def test_float_dtypes_keep_unit_scales():
+    X = Vectors()
+    for dtype, tolerance in (("float32", 0.0), ("float16", 1e-3)):
+        q = Quantize(X, dtype)
+        assert np.all(q.scales == 1.0)
+        assert np.allclose(Dequantize(q), X, atol = tolerance)
+    with pytest.raises(ValueError):
+        Quantize(X, "int4")
+
+def test_zero_rows_survive_quantization():
+    q = Quantize(np.zeros((2, 8), dtype = np.float32), "int8")
+    assert not Dequantize(q).any()
+
+def test_dot_scores_prefixes_without_dequantizing():
+    X, profile = Vectors(), Vectors(3, seed = 1)
+    q = Quantize(X, "int8")
+    coarse = Truncate(profile, 16)
+    assert np.allclose(np.linalg.norm(coarse, axis = 1), 1.0, atol = 1e-5)
+    expected = Truncate(Dequantize(q), 16) @ coarse.T
+    assert np.allclose(Dot(q, coarse.T), expected, atol = 1e-5)
+    assert np.allclose(Dot(q, profile.T, normalize = False), Dequantize(q) @ profile.T, atol = 1e-5)
+    assert np.allclose(Dequantize(q, 16), Dequantize(q)[:, :16])
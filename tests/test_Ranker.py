@@ -0,0 +1,28 @@
+# tests/test_Ranker.py
+import numpy as np
+
+from Sources.Ranker import TopKRanker
+
+def Ranked(scores: np.ndarray, k: int, chunk: int) -> np.ndarray:
+    ranker = TopKRanker(k, profile = None)
+    for offset in range(0, len(scores), chunk):
+        part = scores[offset : offset + chunk]
+        ranker.PushScores(part, np.zeros(len(part), dtype = np.int64), offset)
+    return ranker.Result()[0]
+
+def test_matches_a_full_sort_whatever_the_chunking():
+    scores = np.random.default_rng(0).normal(size = 1000).astype(np.float32)
+    for chunk in (1, 7, 64, 1000):
+        assert Ranked(scores, 10, chunk).tolist() == np.argsort(-scores, kind = "stable")[:10].tolist()
+
+def test_ties_go_to_the_earlier_candidate():
+    scores = np.ones(100, dtype = np.float32)
+    scores[50] = 2.0
+    for chunk in (3, 10, 100):
+        assert Ranked(scores, 4, chunk).tolist() == [50, 0, 1, 2]
+
+def test_mask_drops_rows():
+    ranker = TopKRanker(2, profile = None)
+    ranker.PushScores(np.array([3.0, 2.0, 1.0], dtype = np.float32), np.zeros(3, dtype = np.int64), 0, mask = np.array([False, True, True]))
+    assert ranker.Result()[0].tolist() == [1, 2]
+    assert ranker.seen == 3
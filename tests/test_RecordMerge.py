@@ -0,0 +1,59 @@
+# tests/test_RecordMerge.py
+from Sources.FetchPaper.RecordMerge import MergeIndex, RecordKeys, NormalizeDoi, NormalizeArxiv
+
+def Merge(records: list[dict]) -> list[dict]:
+    index = MergeIndex()
+    for record in records:
+        index.Add(record)
+    return index.Merged()
+
+def test_normalizers():
+    assert NormalizeDoi("https://doi.org/10.1000/ABC") == "10.1000/abc"
+    assert NormalizeDoi("doi: 10.1000/abc") == "10.1000/abc"
+    assert NormalizeDoi("not a doi") == ""
+    assert NormalizeArxiv("https://arxiv.org/pdf/2501.01234v2.pdf") == "2501.01234"
+    assert NormalizeArxiv("arXiv:2501.01234v3") == "2501.01234"
+
+def test_arxiv_doi_yields_an_arxiv_key():
+    keys = RecordKeys({"source": "Crossref", "doi": "10.48550/arXiv.2501.01234v1"})
+    assert "doi:10.48550/arxiv.2501.01234v1" in keys
+    assert "arxiv:2501.01234" in keys
+
+def test_bare_number_is_not_an_arxiv_id_outside_arxiv():
+    keys = RecordKeys({"source": "DBLP", "id": "2501.01234", "title": "A paper"})
+    assert not any(key.startswith("arxiv:") for key in keys)
+
+def test_doi_and_arxiv_copies_fuse_into_one_record():
+    arxiv = {"source": "arXiv", "id": "http://arxiv.org/abs/2501.01234v2", "url": "http://arxiv.org/abs/2501.01234v2",
+             "title": "Fast things", "abstract": "Short.", "date": "2025-01-02", "doi": ""}
+    scholar = {"source": "Semantic Scholar", "doi": "10.1000/XYZ", "ids": {"arxiv": "2501.01234"},
+               "title": "Fast Things", "abstract": "A much longer abstract of the paper.", "date": "2025"}
+    crossref = {"source": "Crossref", "doi": "https://doi.org/10.1000/xyz", "url": "https://doi.org/10.1000/xyz",
+                "title": "Fast Things: Journal Version", "venue": "Journal of Things", "date": "2025-03"}
+    other = {"source": "Crossref", "doi": "10.1000/other", "title": "Unrelated", "date": "2025-01-02"}
+
+    # arXiv and Crossref share no key; Semantic Scholar links them, whatever the order
+    for records in ([arxiv, other, crossref, scholar], [crossref, scholar, other, arxiv]):
+        merged = Merge(records)
+        assert len(merged) == 2
+        fused = next(r for r in merged if r["doi"] == "10.1000/xyz")
+        assert sorted(fused["sources"]) == ["Crossref", "Semantic Scholar", "arXiv"]
+        assert fused["title"] == crossref["title"]              # highest-priority source
+        assert fused["venue"] == "Journal of Things"
+        assert fused["url"] == arxiv["url"]                     # url prefers the preprint page
+        assert fused["abstract"] == scholar["abstract"]         # longest abstract
+        assert fused["date"] == "2025-01-02"                    # most precise date
+        assert fused["ids"]["arxiv"] == "2501.01234"
+
+def test_groups_keep_first_seen_order():
+    records = [{"source": "Crossref", "doi": f"10.1000/{i}", "title": f"Paper {i}"} for i in range(5)]
+    records.append({"source": "OpenAlex", "doi": "10.1000/2", "title": "Paper 2 again"})
+    merged = Merge(records)
+    assert [r["doi"] for r in merged] == [f"10.1000/{i}" for i in range(5)]
+    assert merged[2]["sources"] == ["Crossref", "OpenAlex"]
+
+def test_single_records_get_a_normalized_doi():
+    merged = Merge([{"source": "Crossref", "doi": "https://doi.org/10.1000/ABC", "title": "Alone"},
+                    {"source": "DBLP", "doi": "not a doi", "title": "Also alone"}])
+    assert [r["doi"] for r in merged] == ["10.1000/abc", ""]
+    assert merged[0]["sources"] == ["Crossref"]
@@ -0,0 +1,84 @@
+# tests/test_ResponseCache.py
+import os
+import time
+import zlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from Sources.HttpClient import HttpClient
+from Sources.ResponseCache import ResponseCache, NormalizedUrl, WindowTtl, IMMUTABLE
+
+@pytest.fixture
+def server():
+    """Serves `page["body"]` with an ETag derived from it, answering a matching
+    If-None-Match with 304; records each request's headers."""
+    page = {"body": b'{"n": 1}'}
+    seen: list[dict] = []
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            seen.append(dict(self.headers))
+            etag = f'"{zlib.crc32(page["body"]):08x}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", str(len(page["body"])))
+            self.end_headers()
+            self.wfile.write(page["body"])
+        def log_message(self, *args):
+            pass
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target = httpd.serve_forever, daemon = True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/works", page, seen
+    httpd.shutdown()
+
+def test_keys_ignore_parameter_order_and_secrets(tmp_path):
+    assert NormalizedUrl("HTTPS://API.Example.org/works?b=2", {"a": 1, "api_key": "secret"}) == "https://api.example.org/works?a=1&b=2"
+    cache = ResponseCache(str(tmp_path))
+    assert cache.Key("https://x.org/w", {"a": 1, "b": 2, "mailto": "me@x.org"}) == cache.Key("https://x.org/w?b=2&a=1")
+    assert cache.Key("https://x.org/w", {"a": 1}) != cache.Key("https://x.org/w", {"a": 2})
+
+def test_closed_windows_never_expire():
+    assert WindowTtl("2020-01-02", 900.0) == IMMUTABLE
+    assert WindowTtl("9999-01-01", 900.0) == 900.0
+
+def test_fresh_entries_are_served_without_a_request(server, tmp_path):
+    url, page, seen = server
+    client = HttpClient(retries = 0, cacheDir = str(tmp_path))
+    assert client.Get(url, params = {"page": 1}, ttl = 60).json() == {"n": 1}
+    cached = client.Get(url, params = {"page": 1}, ttl = 60)
+    assert len(seen) == 1
+    assert cached.json() == {"n": 1} and cached.headers["Content-Type"] == "application/json"
+    assert (client.cache.hits, client.cache.misses) == (1, 1)
+
+    client.Get(url, params = {"page": 2}, ttl = 60)           # another page is another entry
+    client.Get(url, params = {"page": 1})                     # no ttl: the cache is bypassed
+    assert len(seen) == 3
+
+def test_stale_entries_are_revalidated(server, tmp_path):
+    url, page, seen = server
+    client = HttpClient(retries = 0, cacheDir = str(tmp_path))
+    client.Get(url, ttl = 60)
+    assert client.Get(url, ttl = 0).json() == {"n": 1}
+    assert seen[1].get("If-None-Match") and client.cache.revalidated == 1
+
+    page["body"] = b'{"n": 2}'
+    assert client.Get(url, ttl = 0).json() == {"n": 2}        # changed: the new body replaces the entry
+    assert client.Get(url, ttl = 60).json() == {"n": 2}
+    assert len(seen) == 3
+
+def test_old_entries_are_pruned(server, tmp_path):
+    url, page, seen = server
+    HttpClient(retries = 0, cacheDir = str(tmp_path)).Get(url, ttl = 60)
+    files = [os.path.join(d, f) for d, _, names in os.walk(tmp_path) for f in names]
+    assert len(files) == 1
+    old = time.time() - 30 * 86400
+    os.utime(files[0], (old, old))
+    ResponseCache(str(tmp_path), retentionDays = 14)
+    assert not os.path.exists(files[0])
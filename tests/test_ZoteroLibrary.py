@@ -0,0 +1,185 @@
+# tests/test_ZoteroLibrary.py
+import zlib
+
+import numpy as np
+import pytest
+
+from Sources.ZoteroLibrary import ZoteroLibrary, OpenLibraries, CombinedProfile, PAGE_LIMIT, ITEM_PROJECTION
+
+DIMENSIONS = 8
+
+class FakeResponse:
+    def __init__(self, status_code: int, body = None, headers: dict | None = None):
+        self.status_code, self.body, self.headers = status_code, body, headers or {}
+
+    def json(self):
+        return self.body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+class FakeZotero:
+    """In-memory Zotero Web API: items and deletions stamped with the library version
+    they happened at, answering /items/top and /deleted like the real server."""
+    def __init__(self):
+        self.version = 0
+        self.items: dict[str, tuple[int, dict]] = {}
+        self.deleted: dict[str, int] = {}
+        self.calls: list[tuple[str, dict, dict, dict]] = []
+
+    def Put(self, key: str, title: str, abstract: str = "An abstract.", **extra):
+        self.version += 1
+        self.items[key] = (self.version, {"title": title, "abstractNote": abstract, **extra})
+
+    def Delete(self, key: str):
+        self.version += 1
+        self.items.pop(key)
+        self.deleted[key] = self.version
+
+    def Get(self, url: str, *, params: dict, headers: dict, **kwargs) -> FakeResponse:
+        endpoint = url.split("/", 5)[-1]
+        self.calls.append((endpoint, dict(params), dict(headers), kwargs))
+        since = int(params.get("since", 0))
+        if int(headers.get("If-Modified-Since-Version", -1)) >= self.version:
+            return FakeResponse(304)
+        if endpoint == "deleted":
+            return FakeResponse(200, {"items": [k for k, v in self.deleted.items() if v > since]})
+        keys = sorted(k for k, (v, _) in self.items.items() if v > since)
+        page = keys[params["start"] : params["start"] + params["limit"]]
+        return FakeResponse(200, [{"key": k, "version": self.items[k][0], "data": self.items[k][1]} for k in page],
+                            {"Last-Modified-Version": str(self.version), "Total-Results": str(len(keys))})
+
+class FakeEmbedder:
+    """Deterministic unit vectors per text; texts holding "fail" do not embed."""
+    model      = "fake"
+    dimensions = DIMENSIONS
+
+    def __init__(self):
+        self.embedded: list[str] = []
+
+    def Fit(self, texts):
+        pass
+
+    def EncodeMasked(self, texts):
+        self.embedded += texts
+        vectors = np.stack([Vector(t) for t in texts])
+        return vectors, np.array(["fail" not in t for t in texts])
+
+def Vector(text: str) -> np.ndarray:
+    v = np.random.default_rng(zlib.crc32(text.encode("utf-8"))).normal(size = DIMENSIONS).astype(np.float32)
+    return v / np.linalg.norm(v)
+
+def MeanProfile(texts: list[str]) -> np.ndarray:
+    total = np.sum([Vector(t) for t in texts], axis = 0)
+    return total / np.linalg.norm(total)
+
+@pytest.fixture
+def zotero(monkeypatch):
+    server = FakeZotero()
+    monkeypatch.setattr("Sources.ZoteroLibrary.http", server)
+    return server
+
+def Library(root, **kwargs) -> ZoteroLibrary:
+    return ZoteroLibrary(str(root), libraryId = "42", apiKey = "secret", **kwargs)
+
+def test_sync_pulls_only_changes_since_the_stored_version(zotero, tmp_path):
+    for i in range(3):
+        zotero.Put(f"K{i}", f"Paper {i}")
+    library = Library(tmp_path)
+    assert library.Sync() == (3, 0)
+    assert library.version == 3
+    assert zotero.calls[0][1]["since"] == 0
+
+    zotero.Put("K1", "Paper 1, revised")
+    zotero.Put("K3", "Paper 3")
+    zotero.Delete("K0")
+    zotero.calls.clear()
+    assert library.Sync() == (2, 1)
+    assert [(endpoint, params["since"]) for endpoint, params, _, _ in zotero.calls] == [("items/top", 3), ("deleted", 3)]
+    assert sorted(library.items) == ["K1", "K2", "K3"]
+    assert library.items["K1"]["title"] == "Paper 1, revised"
+
+    reopened = Library(tmp_path)
+    assert (reopened.version, reopened.items) == (library.version, library.items)
+
+def test_sync_requests_bypass_the_response_cache(zotero, tmp_path):
+    zotero.Put("K0", "Paper 0")
+    library = Library(tmp_path)
+    library.Sync()
+    assert "If-Modified-Since-Version" not in zotero.calls[0][2]
+
+    zotero.calls.clear()
+    assert library.Sync() == (0, 0)                           # unchanged library: one 304, no /deleted
+    assert [(endpoint, headers["If-Modified-Since-Version"]) for endpoint, _, headers, _ in zotero.calls] == [("items/top", "1")]
+    assert library.version == 1
+
+    zotero.Put("K1", "Paper 1")
+    assert library.Sync() == (1, 0)                           # a change right after is seen at once
+    assert all("ttl" not in kwargs for _, _, _, kwargs in zotero.calls)
+
+def test_notes_and_trashed_items_leave_the_library(zotero, tmp_path):
+    zotero.Put("K0", "Paper 0", publicationTitle = "Journal of Tests")
+    zotero.Put("K1", "Paper 1")
+    zotero.version += 1
+    zotero.items["N0"] = (zotero.version, {"note": "<p>a note</p>"})
+    library = Library(tmp_path)
+    assert library.Sync() == (2, 0)
+    assert library.items["K0"]["venue"] == "Journal of Tests"
+
+    zotero.Put("K1", "Paper 1", deleted = 1)
+    library.Sync()
+    assert sorted(library.items) == ["K0"]
+
+def test_profile_is_a_running_sum_that_reembeds_only_changed_items(zotero, tmp_path):
+    for i in range(4):
+        zotero.Put(f"K{i}", f"Paper {i}")
+    library, embedder = Library(tmp_path), FakeEmbedder()
+    library.Sync()
+    profile = library.Profile(embedder)
+    assert len(embedder.embedded) == 4
+    assert np.allclose(profile[0], MeanProfile(library.Texts()), atol = 1e-5)
+
+    zotero.Put("K2", "Paper 2, revised")
+    zotero.Delete("K3")
+    library.Sync()
+    embedder.embedded.clear()
+    profile = Library(tmp_path).Profile(embedder)            # stored vectors survive a restart
+    assert embedder.embedded == library.Texts(["K2"])
+    assert np.allclose(profile[0], MeanProfile(library.Texts()), atol = 1e-5)
+
+def test_items_that_fail_to_embed_are_retried_next_run(zotero, tmp_path):
+    zotero.Put("K0", "Paper 0")
+    zotero.Put("K1", "Paper 1 that will fail")
+    library, embedder = Library(tmp_path), FakeEmbedder()
+    library.Sync()
+    assert np.allclose(library.Profile(embedder)[0], MeanProfile(library.Texts(["K0"])), atol = 1e-5)
+
+    embedder.embedded.clear()
+    library.Profile(embedder)
+    assert embedder.embedded == library.Texts(["K1"])
+
+def test_pages_follow_total_results_and_carry_the_projection(zotero, tmp_path):
+    for i in range(2 * PAGE_LIMIT + 5):
+        zotero.Put(f"K{i:04d}", f"Paper {i}")
+    library = Library(tmp_path, workers = 4)
+    assert library.Sync() == (2 * PAGE_LIMIT + 5, 0)
+    assert len(library.items) == 2 * PAGE_LIMIT + 5
+    pages = [params for endpoint, params, _, _ in zotero.calls if endpoint == "items/top"]
+    assert sorted(p["start"] for p in pages) == [0, PAGE_LIMIT, 2 * PAGE_LIMIT]
+    assert all(p["limit"] == PAGE_LIMIT and ITEM_PROJECTION.items() <= p.items() for p in pages)
+    assert all(headers["Zotero-API-Key"] == "secret" for _, _, headers, _ in zotero.calls)
+
+def test_group_libraries_are_opened_and_profiled_together(zotero, tmp_path):
+    libraries = OpenLibraries(str(tmp_path), userId = "42", groupIds = " 7, ,8", apiKey = "secret")
+    assert [(l.libraryType, l.libraryId) for l in libraries] == [("users", "42"), ("groups", "7"), ("groups", "8")]
+    assert len({l.dir for l in libraries}) == 3
+    assert OpenLibraries(str(tmp_path), userId = "", groupIds = "", apiKey = "") == []
+
+    zotero.Put("K0", "Paper 0")
+    zotero.Put("K1", "Paper 1")
+    for library in libraries:
+        library.Sync()
+    assert [call[0] for call in zotero.calls].count("items/top") == 3
+    texts = [t for l in libraries for t in l.Texts()]
+    assert np.allclose(CombinedProfile(libraries, FakeEmbedder())[0], MeanProfile(texts), atol = 1e-5)